@@ -0,0 +1,140 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import posixpath
+from urllib.parse import urlsplit
+
+from image_pipeline import DERIVED_DIR, hash_file, resolve_image_url
+
+# Content-hashed asset URLs and the Cloudflare Pages cache policy that goes with them.
+# Output trees (build.py --out) serve every asset under a name that changes with
+# its bytes, e.g. /images/brand-hero.png -> /assets/static/brand-hero.1a2b3c4d5e.png,
+# so those URLs can be cached for a year without ever going stale.
+# Byte-identical files share one fingerprinted copy (the first path in sort order
+# names it), so a duplicate costs neither disk nor a second download.
+# In-place builds keep the stable names: their output is the next build's source.
+
+FINGERPRINT_DIR = 'assets/static'
+ASSET_DIRS = ['images', 'videos']
+ASSET_FILES = ['favicon.png', 'apple-touch-icon.png']
+HASH_LENGTH = 10
+FINGERPRINT_RE = re.compile(r'/' + re.escape(FINGERPRINT_DIR) + r'/[^\s"\'<>()?#,]+')
+
+# Cloudflare Pages _headers (https://developers.cloudflare.com/pages/configuration/headers/)
+# Rules matching the same path are combined, so the immutable rules detach the
+# default Cache-Control ("! Cache-Control") before setting their own.
+HEADERS_FILE = '_headers'
+HEADERS_START = '# CACHE_HEADERS_START (generated by build.py, edits go outside this block)'
+HEADERS_END = '# CACHE_HEADERS_END'
+HEADERS_BLOCK_RE = re.compile(r'# CACHE_HEADERS_START.*?# CACHE_HEADERS_END\n?', re.S)
+SHORT_CACHE = 'public, max-age=300, must-revalidate'
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Paths whose file names already change with their content
+IMMUTABLE_PATHS = [f'/{FINGERPRINT_DIR}/*', f'/{DERIVED_DIR}/*', '/assets/css/tailwind.*']
+
+def scan_assets(project_root, previous=None):
+    """
+    {url: {"sha", "size", "mtime_ns"}} for every fingerprinted asset source.
+    previous: the table from the last build; files with the same size and mtime
+    are not hashed again.
+    """
+    previous = previous or {}
+    paths = [os.path.join(project_root, name) for name in ASSET_FILES]
+    for asset_dir in ASSET_DIRS:
+        derived_root = os.path.join(project_root, DERIVED_DIR)
+        for dirpath, dirs, files in os.walk(os.path.join(project_root, asset_dir)):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and os.path.join(dirpath, d) != derived_root)
+            paths += [os.path.join(dirpath, name) for name in sorted(files) if not name.startswith('.')]
+    table = {}
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        url = '/' + os.path.relpath(path, project_root).replace('\\', '/')
+        st = os.stat(path)
+        entry = previous.get(url)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            table[url] = entry
+        else:
+            table[url] = {'sha': hash_file(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    return table
+
+def build_asset_table(sources):
+    """
+    Fingerprinted URL of every asset: {url: fingerprinted url}.
+    Returns (table, duplicates) where duplicates is {kept url: [byte-identical urls]}.
+    """
+    by_sha = {}
+    for url in sorted(sources):
+        by_sha.setdefault(sources[url]['sha'], []).append(url)
+    table = {}
+    duplicates = {}
+    for sha, urls in by_sha.items():
+        stem, ext = posixpath.splitext(posixpath.basename(urls[0]))
+        fingerprinted = f'/{FINGERPRINT_DIR}/{stem}.{sha[:HASH_LENGTH]}{ext}'
+        for url in urls:
+            table[url] = fingerprinted
+        if len(urls) > 1:
+            duplicates[urls[0]] = urls[1:]
+    return table, duplicates
+
+def get_asset_groups(table, sources):
+    """
+    {fingerprinted url: digest of the sources behind it}. A page is stale when a
+    URL it shows changes digest: replaced, or a duplicate that stopped being one.
+    """
+    groups = {}
+    for url in sorted(table):
+        groups.setdefault(table[url], []).append([url, sources[url]['sha']])
+    return {fingerprinted: hashlib.sha256(json.dumps(members).encode('utf-8')).hexdigest()[:16]
+            for fingerprinted, members in groups.items()}
+
+def fingerprint_url(value, page_url, table, domain):
+    """
+    The fingerprinted form of a reference (relative, root-relative or on domain),
+    keeping its query and fragment. None when it is not a fingerprinted asset.
+    """
+    on_domain = value.startswith(domain + '/')
+    target = value[len(domain):] if on_domain else value
+    url = resolve_image_url(target, page_url)
+    if url not in table:
+        return None
+    parts = urlsplit(target)
+    suffix = (f'?{parts.query}' if parts.query else '') + (f'#{parts.fragment}' if parts.fragment else '')
+    return (domain if on_domain else '') + table[url] + suffix
+
+def find_fingerprinted(html):
+    """Fingerprinted URLs a built page references."""
+    return set(FINGERPRINT_RE.findall(html))
+
+def write_fingerprinted(table, source_root, out_root):
+    """
+    Puts one file per fingerprinted URL into out_root, hard-linked to the plain
+    copy where possible. Returns the number of files written.
+    """
+    written = 0
+    for url, fingerprinted in sorted(table.items()):
+        dest = os.path.join(out_root, fingerprinted.lstrip('/'))
+        if os.path.exists(dest):
+            continue
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        plain = os.path.join(out_root, url.lstrip('/'))
+        try:
+            os.link(plain, dest)
+        except OSError:
+            shutil.copy2(os.path.join(source_root, url.lstrip('/')), dest)
+        written += 1
+    return written
+
+def render_headers(existing=''):
+    """
+    The _headers file: the generated cache policy, then the hand-written rules
+    of existing (a previously generated block in it is replaced).
+    """
+    lines = [HEADERS_START, '/*', f'  Cache-Control: {SHORT_CACHE}']
+    for path in IMMUTABLE_PATHS:
+        lines += [path, '  ! Cache-Control', f'  Cache-Control: {IMMUTABLE_CACHE}']
+    lines.append(HEADERS_END)
+    custom = HEADERS_BLOCK_RE.sub('', existing or '').strip('\n')
+    return '\n'.join(lines) + '\n' + (f'\n{custom}\n' if custom else '')
@@ -1,18 +1,155 @@
 import os
 import sys
 import re
-import requests
-import concurrent.futures
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
 from urllib.parse import urlparse, unquote, urljoin
 from bs4 import BeautifulSoup
 from colorama import init, Fore, Style
+from link_checker import LinkChecker, is_broken
+from link_graph import LinkGraph, MAX_DEPTH
+from site_index import PRUNE_DIRS, SiteIndex, clean_url
+from audit_findings import RULES, make_finding, render_json, render_sarif
 
 # Initialize colorama
 init(autoreset=True)
 
+# Caches kept between runs. They live next to this script, never in the audited
+# tree: that may be a published build (audit.py dist), which must not ship them.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.audit-cache')
+# External link results (see link_checker.py), shared by every audited tree
+LINK_CACHE_FILE = 'links.json'
+# Layout of extract_page_facts; facts recorded with another one are re-read from the file
+FACTS_VERSION = 2
+# Longest anchor text kept per link
+ANCHOR_LENGTH = 120
+# Page results by content hash (see SEOAuditor.audit), one file per audited tree
+AUDIT_CACHE_FILE = 'pages-{tree}.json'
+AUDIT_CACHE_VERSION = 1
+# Per-tree files in CACHE_DIR are dropped once unused this long, or beyond this many
+# (audited trees come and go: temporary copies, old checkouts...)
+AUDIT_CACHE_MAX_AGE = 30 * 86400
+AUDIT_CACHE_KEEP = 8
+LEVEL_COLORS = {'error': Fore.RED, 'warning': Fore.YELLOW, 'note': Fore.YELLOW}
+
+def prune_audit_caches(keep=None):
+    """
+    Removes the per-tree page caches of CACHE_DIR that were not written for
+    AUDIT_CACHE_MAX_AGE, and all but the AUDIT_CACHE_KEEP most recent ones.
+    keep: cache file never removed (the one just written).
+    """
+    prefix, suffix = AUDIT_CACHE_FILE.split('{tree}')
+    caches = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(suffix) and path != keep:
+            try:
+                caches.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+    caches.sort(reverse=True)
+    cutoff = time.time() - AUDIT_CACHE_MAX_AGE
+    for i, (mtime, path) in enumerate(caches):
+        # keep itself counts towards AUDIT_CACHE_KEEP
+        if mtime < cutoff or i >= AUDIT_CACHE_KEEP - 1:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def extract_page_facts(soup):
+    """
+    What audit_page checks, read from a parsed page: H1 count, schema and
+    breadcrumb presence, and the href/rel/anchor text of every link.
+    Plain data, so a build can extract it from the DOM it already holds
+    (build.py --audit) and keep it in its manifest for unchanged pages.
+    """
+    breadcrumb = soup.find(attrs={"aria-label": "breadcrumb"}) or soup.find(class_=re.compile("breadcrumb"))
+    links = []
+    for a in soup.find_all('a'):
+        rel = a.get('rel', [])
+        if isinstance(rel, str): rel = rel.split()
+        links.append([a.get('href'), list(rel), ' '.join(a.get_text(' ').split())[:ANCHOR_LENGTH]])
+    return {
+        'version': FACTS_VERSION,
+        'h1': len(soup.find_all('h1')),
+        'schema': soup.find('script', type='application/ld+json') is not None,
+        'breadcrumb': breadcrumb is not None,
+        'links': links
+    }
+
+class PageAuditResult:
+    """
+    What auditing one page found, applied to the report by SEOAuditor.merge_page_result.
+    Plain data, so pages can be audited in worker processes and merged in file order.
+    """
+    def __init__(self, file_path, url):
+        self.file_path = file_path
+        self.url = url
+        self.issues = []    # [(rule, message, score penalty)] in the order found (rules: audit_findings.py)
+        self.links = []     # [(target clean URL, anchor text)] for links to audited pages
+        self.external = []  # External URLs, for check_external_links
+        self.lookups = {}   # Link path -> file it resolved to (relative to the root) or None
+
+    def add_issue(self, rule, message, penalty=0):
+        self.issues.append((rule, message, penalty))
+
+    def to_cache(self, sha):
+        return {'sha': sha, 'issues': self.issues, 'links': self.links, 'external': self.external,
+                'lookups': self.lookups}
+
+    @classmethod
+    def from_cache(cls, entry, file_path, url):
+        result = cls(file_path, url)
+        result.issues = [tuple(issue) for issue in entry['issues']]
+        result.links = [tuple(link) for link in entry['links']]
+        result.external = entry['external']
+        result.lookups = entry['lookups']
+        return result
+
+# Auditor of the pool worker processes (see init_audit_worker)
+_WORKER_AUDITOR = None
+
+def init_audit_worker(auditor):
+    """Pool initializer: every worker gets a copy of the auditor's file maps and settings."""
+    global _WORKER_AUDITOR
+    _WORKER_AUDITOR = auditor
+
+def audit_page_task(task):
+    file_path, facts = task
+    return _WORKER_AUDITOR.audit_page(file_path, facts=facts)
+
 class SEOAuditor:
-    def __init__(self, root_dir='.'):
+    def __init__(self, root_dir='.', page_facts=None, link_cache=None, max_depth=MAX_DEPTH, graph_json=None, graph_csv=None,
+                 jobs=1, audit_cache=None, incremental=True, json_out=None, sarif_out=None):
+        """
+        page_facts: {file path: extract_page_facts(...)} for pages already parsed elsewhere.
+        link_cache: external link cache file (default: LINK_CACHE_FILE in CACHE_DIR).
+        max_depth: pages more clicks than this from the homepage are reported.
+        graph_json/graph_csv: files to export the link graph analysis to.
+        jobs: worker processes auditing pages (1: audit in this process).
+        audit_cache: page result cache file (default: AUDIT_CACHE_FILE in CACHE_DIR).
+        incremental: reuse cached results of unchanged pages (False: audit every page, then refresh the cache).
+        json_out/sarif_out: files to write the findings to as JSON / SARIF 2.1.0.
+        """
         self.root_dir = os.path.abspath(root_dir)
+        self.page_facts = page_facts or {}
+        if not (link_cache and audit_cache):
+            os.makedirs(CACHE_DIR, exist_ok=True)
+        self.link_cache = link_cache or os.path.join(CACHE_DIR, LINK_CACHE_FILE)
+        self.max_depth = max_depth
+        self.graph_json = graph_json
+        self.graph_csv = graph_csv
+        self.jobs = jobs
+        # Keyed by the tree's path, not its target: dist keeps its cache across published builds
+        tree = hashlib.sha256(self.root_dir.encode('utf-8')).hexdigest()[:12]
+        self.audit_cache = audit_cache or os.path.join(CACHE_DIR, AUDIT_CACHE_FILE.format(tree=tree))
+        self.incremental = incremental
+        self.json_out = json_out
+        self.sarif_out = sarif_out
         self.base_url = None
         self.keywords = []
         
@@ -21,11 +158,14 @@ class SEOAuditor:
         self.url_map = {}    # Clean URL path (e.g., /blog) -> Local file path
         self.file_map = {}   # Local file path -> Clean URL path
         self.inbound_counts = {} # URL path -> count
+        self.link_graph = None # Internal links with anchor text (see link_graph.py)
+        self.site_index = None # Every file of the tree (see site_index.py)
         self.external_links = set() # Set of external URLs to check
+        self.findings = [] # Everything reported, for --json/--sarif (see audit_findings.py)
         self.score = 100
         
         # Configuration - Ignore Lists
-        self.IGNORE_PATHS = ['.git', 'node_modules', '__pycache__', 'MasterTool']
+        self.IGNORE_PATHS = list(PRUNE_DIRS) + ['MasterTool']
         self.IGNORE_URLS = ['/go/', 'cdn-cgi', 'javascript:', 'mailto:', 'tel:', '#']
         self.IGNORE_FILES = ['404.html', 'zujina.html', '_master_template.html'] # filenames containing 'google' handled in scan
         
@@ -81,49 +221,30 @@ class SEOAuditor:
         return False
 
     def scan_files(self):
-        """Build file system map strictly based on files."""
+        """Snapshot the tree once (see site_index.py) and map its HTML pages to clean URLs."""
         print(f"{Fore.BLUE}Scanning files...")
-        for root, dirs, files in os.walk(self.root_dir):
-            # Prune ignored dirs
-            dirs[:] = [d for d in dirs if d not in self.IGNORE_PATHS]
-            
-            for file in files:
-                if not file.endswith('.html'): continue
-                if self.is_ignored_file(file): continue
-                
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, self.root_dir)
-                
-                # Determine Clean URL
-                # root/index.html -> /
-                # root/blog/index.html -> /blog/
-                # root/blog/post.html -> /blog/post
-                
-                path_parts = rel_path.split(os.sep)
-                if path_parts[-1] == 'index.html':
-                    url_path = '/' + '/'.join(path_parts[:-1])
-                    if not url_path.endswith('/'): url_path += '/'
-                else:
-                    url_path = '/' + '/'.join(path_parts[:-1])
-                    if url_path == '/': url_path = ''
-                    url_path += '/' + path_parts[-1][:-5] # remove .html
-                
-                # Normalize
-                if url_path == '': url_path = '/'
-                if not url_path.startswith('/'): url_path = '/' + url_path
-                
-                self.html_files.append(full_path)
-                self.url_map[url_path] = full_path
-                self.file_map[full_path] = url_path
-                self.inbound_counts[url_path] = 0
+        # Every file can be a link target; IGNORE_PATHS only decides which pages are audited
+        self.site_index = SiteIndex(self.root_dir)
+        for rel_path, full_path in self.site_index.html_files():
+            if self.is_ignored_path(os.path.relpath(full_path, self.root_dir)): continue
+            if self.is_ignored_file(os.path.basename(rel_path)): continue
+
+            # root/index.html -> /, root/blog/index.html -> /blog/, root/blog/post.html -> /blog/post
+            url_path = clean_url(rel_path)
+
+            self.html_files.append(full_path)
+            self.url_map[url_path] = full_path
+            self.file_map[full_path] = url_path
+            self.inbound_counts[url_path] = 0
 
     def resolve_local_path(self, url_path):
         """
-        Check if a URL path exists locally.
+        Check if a URL path exists locally (lookups in the tree snapshot, no disk access).
         Matches:
         1. Exact match in url_map (Clean URL)
         2. url_path + .html
         3. url_path + /index.html
+        4. The file itself (sitemap.xml, images...)
         """
         # Remove query/hash
         url_path = url_path.split('?')[0].split('#')[0]
@@ -135,64 +256,157 @@ class SEOAuditor:
             return self.url_map[url_path]
         if url_path + '/' in self.url_map:
             return self.url_map[url_path + '/']
-            
-        # 2. Construct potential file paths manually (fallback)
-        # e.g. /blog/post -> blog/post.html or blog/post/index.html
-        relative = url_path.lstrip('/')
-        
-        candidate_1 = os.path.join(self.root_dir, relative + '.html')
-        if os.path.exists(candidate_1): return candidate_1
-        
-        candidate_2 = os.path.join(self.root_dir, relative, 'index.html')
-        if os.path.exists(candidate_2): return candidate_2
-        
-        # 3. Check exact file existence (for non-HTML files like sitemap.xml, images)
-        candidate_3 = os.path.join(self.root_dir, relative)
-        if os.path.isfile(candidate_3): return candidate_3
-        
-        return None
+
+        # 2-4. Any other file of the tree (ignored pages, non-HTML files)
+        return self.site_index.resolve(url_path)
+
+    def __getstate__(self):
+        # Pool workers get the facts of each page with its task, not all of them up front
+        return dict(self.__dict__, page_facts={})
+
+    def relative_path(self, file_path):
+        return os.path.relpath(file_path, self.root_dir).replace('\\', '/')
+
+    def cache_config(self):
+        """Settings page results depend on; a cache recorded with others is discarded."""
+        return {'base_url': self.base_url, 'ignore_urls': self.IGNORE_URLS, 'facts_version': FACTS_VERSION}
+
+    def load_audit_cache(self):
+        if not self.incremental or not os.path.exists(self.audit_cache):
+            return {}
+        try:
+            with open(self.audit_cache, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"{Fore.YELLOW}[WARN] Audit cache {self.audit_cache} is unreadable, auditing every page.")
+            return {}
+        if data.get('version') != AUDIT_CACHE_VERSION or data.get('config') != self.cache_config():
+            return {}
+        return data.get('pages', {})
+
+    def save_audit_cache(self, pages):
+        tmp_path = f'{self.audit_cache}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': AUDIT_CACHE_VERSION, 'config': self.cache_config(), 'pages': pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.audit_cache)
+        if os.path.dirname(self.audit_cache) == CACHE_DIR:
+            prune_audit_caches(keep=self.audit_cache)
+
+    def lookups_unchanged(self, lookups, resolved):
+        """
+        True when every link path a cached page checked still resolves to the
+        same file. A page linking to a file that appeared, disappeared or moved
+        between clean URL and plain file is audited again.
+        resolved: {link path: relative file or None} shared across pages.
+        """
+        for path, rel_path in lookups.items():
+            if path not in resolved:
+                local_file = self.resolve_local_path(path)
+                resolved[path] = local_file and self.relative_path(local_file)
+            if resolved[path] != rel_path:
+                return False
+        return True
 
     def audit(self):
         print(f"{Fore.GREEN}Starting Audit on {len(self.html_files)} files...")
-        
+        self.link_graph = LinkGraph(self.url_map)
+
+        # Unchanged pages (same content, every link resolving as before) keep their
+        # cached result. Inbound counts and the link graph are rebuilt from all
+        # results at merge time, so they follow changes in other pages anyway.
+        cache = self.load_audit_cache()
+        resolved = {}
+        digests = {}
+        cached = {}
         for file_path in self.html_files:
-            self.audit_page(file_path)
+            with open(file_path, 'rb') as f:
+                digests[file_path] = hashlib.sha256(f.read()).hexdigest()
+            entry = cache.get(self.relative_path(file_path))
+            if entry and entry['sha'] == digests[file_path] and self.lookups_unchanged(entry['lookups'], resolved):
+                cached[file_path] = PageAuditResult.from_cache(entry, file_path, self.file_map[file_path])
+
+        tasks = [(file_path, self.page_facts.get(file_path)) for file_path in self.html_files if file_path not in cached]
+        pages = {}
+        pool = None
+        if self.jobs > 1 and len(tasks) > 1:
+            jobs = min(self.jobs, len(tasks))
+            pool = multiprocessing.Pool(jobs, initializer=init_audit_worker, initargs=(self,))
+            fresh = pool.imap(audit_page_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+        else:
+            fresh = (self.audit_page(file_path, facts=facts) for file_path, facts in tasks)
+        try:
+            # Merged in file order (imap keeps it), so the report matches a serial run
+            for file_path in self.html_files:
+                result = cached.get(file_path) or next(fresh)
+                self.merge_page_result(result)
+                if not any(rule == 'page-error' for rule, _, _ in result.issues):
+                    pages[self.relative_path(file_path)] = result.to_cache(digests[file_path])
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        self.save_audit_cache(pages)
+        if self.incremental:
+            print(f"{Fore.BLUE}{len(tasks)} pages audited, {len(cached)} unchanged (from {os.path.basename(self.audit_cache)}).")
             
         self.check_external_links()
         self.generate_report()
 
-    def audit_page(self, file_path):
+    def add_finding(self, rule, url, message, penalty=0, file_path=None):
+        """Records a finding for --json/--sarif and applies its score penalty."""
+        self.findings.append(make_finding(rule, url, message, penalty, file_path and self.relative_path(file_path)))
+        self.score -= penalty
+
+    def report_issue(self, rule, url, message, penalty=0, file_path=None):
+        """Prints a finding the way the console report shows it ("[tag] message") and records it."""
+        tag, level, _ = RULES[rule]
+        print(f"{LEVEL_COLORS[level]}[{tag}] {message}")
+        self.add_finding(rule, url, message, penalty, file_path)
+
+    def merge_page_result(self, result):
+        """Prints a page's issues and adds its score penalties and links to the site totals."""
+        for rule, message, penalty in result.issues:
+            self.report_issue(rule, result.url, message, penalty, result.file_path)
+        self.external_links.update(result.external)
+        for target_url, anchor in result.links:
+            self.inbound_counts[target_url] += 1
+            self.link_graph.add_link(result.url, target_url, anchor)
+
+    def audit_page(self, file_path, soup=None, facts=None):
+        """
+        Checks one page and returns a PageAuditResult; the auditor itself is not
+        changed. The file is parsed unless the caller passes its parsed soup, or
+        the facts already extracted from it (see extract_page_facts).
+        """
         current_url = self.file_map.get(file_path, 'unknown')
+        result = PageAuditResult(file_path, current_url)
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                try:
-                    soup = BeautifulSoup(content, 'lxml')
-                except:
-                    soup = BeautifulSoup(content, 'html.parser')
+            if facts is None or facts.get('version') != FACTS_VERSION:
+                if soup is None:
+                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        content = f.read()
+                        try:
+                            soup = BeautifulSoup(content, 'lxml')
+                        except:
+                            soup = BeautifulSoup(content, 'html.parser')
+                facts = extract_page_facts(soup)
                 
             # --- Semantics ---
             # H1 Check
-            h1s = soup.find_all('h1')
-            if len(h1s) != 1:
-                print(f"{Fore.RED}[H1] {current_url}: Found {len(h1s)} H1 tags. Should be exactly 1.")
-                self.score -= 5
+            if facts['h1'] != 1:
+                result.add_issue('h1-count', f"{current_url}: Found {facts['h1']} H1 tags. Should be exactly 1.", 5)
                 
             # Schema Check
-            schema = soup.find('script', type='application/ld+json')
-            if not schema:
-                print(f"{Fore.YELLOW}[Schema] {current_url}: Missing JSON-LD schema.")
-                self.score -= 2
+            if not facts['schema']:
+                result.add_issue('missing-schema', f"{current_url}: Missing JSON-LD schema.", 2)
                 
             # Breadcrumb Check
-            breadcrumb = soup.find(attrs={"aria-label": "breadcrumb"}) or soup.find(class_=re.compile("breadcrumb"))
-            if not breadcrumb and current_url != '/':
-                print(f"{Fore.YELLOW}[Breadcrumb] {current_url}: Missing breadcrumb navigation.")
+            if not facts['breadcrumb'] and current_url != '/':
+                result.add_issue('missing-breadcrumb', f"{current_url}: Missing breadcrumb navigation.")
                 # self.score -= 0 # Not explicitly penalized in prompt, but good to warn
             
             # --- Link Audit ---
-            for a in soup.find_all('a'):
-                href = a.get('href')
+            for href, rel, anchor in facts['links']:
                 if not href: continue
                 
                 # Ignore white-listed prefixes
@@ -203,14 +417,11 @@ class SEOAuditor:
                 if href.startswith('http'):
                     # Check if it's actually internal (absolute path with domain)
                     if self.base_url and href.startswith(self.base_url):
-                        print(f"{Fore.YELLOW}[Link] {current_url} -> {href}: Absolute internal link. Use root-relative.")
-                        self.score -= 2
+                        result.add_issue('absolute-internal-link', f"{current_url} -> {href}: Absolute internal link. Use root-relative.", 2)
                         href = href.replace(self.base_url, '') # Treat as internal for existence check
                     else:
-                        self.external_links.add(href)
+                        result.external.append(href)
                         # Check nofollow/noopener
-                        rel = a.get('rel', [])
-                        if isinstance(rel, str): rel = rel.split()
                         if 'nofollow' not in rel and 'noopener' not in rel:
                              # Simple check: if domain is likely non-authoritative (hard to judge automatically), assume warning
                              # Prompt says "Warning: Missing rel='nofollow' or 'noopener'" generally
@@ -223,16 +434,14 @@ class SEOAuditor:
                 # Internal Links
                 # Warning: Relative Path
                 if not href.startswith('/') and not href.startswith('http'):
-                    print(f"{Fore.YELLOW}[Link] {current_url} -> {href}: Relative path used. Use root-relative.")
-                    self.score -= 2
+                    result.add_issue('relative-link', f"{current_url} -> {href}: Relative path used. Use root-relative.", 2)
                     # Try to resolve relative to current file to check existence
                     # This is complex, so we might just assume it's broken or try best effort
                     # For now, let's treat it as a path to check
                     
                 # Warning: .html suffix
                 if href.endswith('.html'):
-                    print(f"{Fore.YELLOW}[Link] {current_url} -> {href}: Expose .html extension. Use Clean URL.")
-                    self.score -= 2
+                    result.add_issue('html-extension', f"{current_url} -> {href}: Expose .html extension. Use Clean URL.", 2)
                     
                 # Dead Link Check (Filesystem)
                 # Resolve href to absolute path from root for checking
@@ -252,40 +461,33 @@ class SEOAuditor:
                      if os.name == 'nt': target_path_for_check = target_path_for_check.replace('\\', '/')
                 
                 local_file = self.resolve_local_path(target_path_for_check)
+                result.lookups[target_path_for_check] = local_file and self.relative_path(local_file)
                 if not local_file:
-                    print(f"{Fore.RED}[DeadLink] {current_url} -> {href}: Target file not found locally.")
-                    self.score -= 10
+                    result.add_issue('dead-link', f"{current_url} -> {href}: Target file not found locally.", 10)
                 else:
                     # Increment inbound count for the target
                     # We need the canonical clean URL for the target file
                     target_clean_url = self.file_map.get(local_file)
                     if target_clean_url:
-                        self.inbound_counts[target_clean_url] += 1
+                        result.links.append((target_clean_url, anchor))
 
         except Exception as e:
-            print(f"{Fore.RED}[ERROR] Processing {file_path}: {e}")
+            result.add_issue('page-error', f"Processing {file_path}: {e}")
+        return result
 
     def check_external_links(self):
         print(f"\n{Fore.BLUE}Checking {len(self.external_links)} external links...")
-        
-        def check_url(url):
-            try:
-                headers = {'User-Agent': 'Mozilla/5.0 (compatible; SEOAuditBot/1.0)'}
-                r = requests.head(url, headers=headers, timeout=5, allow_redirects=True)
-                if r.status_code >= 400:
-                    return url, r.status_code
-            except:
-                return url, 'Error'
-            return None
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(check_url, url) for url in self.external_links]
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result:
-                    url, status = result
-                    print(f"{Fore.RED}[External] {url}: Broken (Status: {status})")
-                    self.score -= 5
+        checker = LinkChecker(cache_path=self.link_cache)
+        results = checker.check(self.external_links)
+        stats = checker.stats
+        print(f"{Fore.BLUE}{stats['checked']} checked, {stats['revalidated']} revalidated, {stats['cached']} from cache.")
+
+        for url, result in sorted(results.items()):
+            if is_broken(result):
+                self.report_issue('broken-external', url, f"{url}: Broken (Status: {result['status']})", 5)
+            elif result['chain'] and result['chain'][0][1] in (301, 308):
+                # Not penalized: the link works, but the site could point at the target directly
+                self.report_issue('permanent-redirect', url, f"{url}: Moved permanently to {result['final_url']} ({len(result['chain']) - 1} redirects)")
 
     def generate_report(self):
         print(f"\n{Fore.MAGENTA}=== AUDIT REPORT ===")
@@ -302,9 +504,11 @@ class SEOAuditor:
         if orphans:
             for url in orphans:
                 print(f"{Fore.YELLOW}{url}")
-                self.score -= 5
+                self.add_finding('orphan-page', url, f"{url}: No internal links point to this page.", 5, self.url_map.get(url))
         else:
             print(f"{Fore.GREEN}None")
+
+        self.report_link_graph()
             
         # Final Score
         self.score = max(0, self.score)
@@ -314,5 +518,57 @@ class SEOAuditor:
         if self.score < 100:
             print(f"\n{Fore.WHITE}Action Required: Run 'python3 fix_links.py' or check errors above.")
 
+        if self.json_out:
+            with open(self.json_out, 'w', encoding='utf-8') as f:
+                f.write(render_json(self.findings, self.score, len(self.html_files), self.base_url))
+            print(f"{Fore.BLUE}Findings written to {self.json_out}")
+        if self.sarif_out:
+            with open(self.sarif_out, 'w', encoding='utf-8') as f:
+                f.write(render_sarif(self.findings, self.score, self.base_url))
+            print(f"{Fore.BLUE}SARIF log written to {self.sarif_out}")
+
+    def report_link_graph(self):
+        """PageRank, click depth and weakly linked pages (reported, not scored)."""
+        analysis = self.link_graph.freeze().analyze(self.max_depth)
+
+        print(f"\n{Fore.WHITE}Top 10 Pages (Internal PageRank):")
+        for page in sorted(analysis['pages'], key=lambda p: (-p['pagerank'], p['url']))[:10]:
+            depth = '-' if page['depth'] is None else page['depth']
+            print(f"{Fore.CYAN}{page['url']}: {page['pagerank']:.4f} (depth {depth}, {page['inbound']} linking pages)")
+
+        sections = [
+            (f"Deeper than {self.max_depth} Clicks from /", 'deep'),
+            ("Unreachable from /", 'unreachable'),
+            ("Near-Orphan Pages (1 Linking Page)", 'near_orphans'),
+            ("Pages Linking Only to Themselves", 'self_only'),
+        ]
+        for title, key in sections:
+            print(f"\n{Fore.WHITE}{title}:")
+            if analysis[key]:
+                for url in analysis[key]:
+                    print(f"{Fore.YELLOW}{url}")
+            else:
+                print(f"{Fore.GREEN}None")
+
+        if self.graph_json:
+            self.link_graph.to_json(self.graph_json, analysis)
+            print(f"\n{Fore.BLUE}Link graph written to {self.graph_json}")
+        if self.graph_csv:
+            self.link_graph.to_csv(self.graph_csv, analysis)
+            print(f"\n{Fore.BLUE}Link graph written to {self.graph_csv}")
+
 if __name__ == "__main__":
-    SEOAuditor(root_dir='.')
+    parser = argparse.ArgumentParser(description='SEO audit of the built site.')
+    parser.add_argument('root', nargs='?', default='.', help='Site root (default: current directory)')
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH, help=f'Report pages more clicks than this from / (default: {MAX_DEPTH})')
+    parser.add_argument('--graph-json', metavar='FILE', help='Export the internal link graph (pages, metrics, edges with anchor text) as JSON')
+    parser.add_argument('--graph-csv', metavar='FILE', help='Export per-page link graph metrics as CSV')
+    parser.add_argument('--json', metavar='FILE', dest='json_out', help='Write the findings as JSON')
+    parser.add_argument('--sarif', metavar='FILE', dest='sarif_out', help='Write the findings as a SARIF 2.1.0 log')
+    parser.add_argument('--full', action='store_true', help='Audit every page instead of reusing the cached results of unchanged ones')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of worker processes auditing pages (0 = all cores)')
+    args = parser.parse_args()
+    if args.jobs <= 0:
+        args.jobs = multiprocessing.cpu_count()
+    SEOAuditor(root_dir=args.root, max_depth=args.max_depth, graph_json=args.graph_json, graph_csv=args.graph_csv,
+               jobs=args.jobs, incremental=not args.full, json_out=args.json_out, sarif_out=args.sarif_out)
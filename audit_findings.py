@@ -0,0 +1,87 @@
+import json
+import hashlib
+
+# Machine-readable output of the SEO audit (audit.py --json / --sarif).
+# Every finding the console report prints is also recorded as
+# {"rule", "level", "url", "message", "penalty", "file"}, where url is the page
+# (or external link) it is about and file the page's path relative to the site
+# root (None for external links). Each finding gets a fingerprint from its rule,
+# URL and message, so a deploy gate can diff the findings of two builds.
+
+TOOL_NAME = 'seo-audit'
+TOOL_VERSION = '1.0'
+REPORT_VERSION = 1
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+# rule id: (console tag, level, description). Levels are SARIF's: error, warning, note.
+RULES = {
+    'h1-count': ('H1', 'error', 'A page should have exactly one H1 heading.'),
+    'missing-schema': ('Schema', 'warning', 'The page has no JSON-LD structured data.'),
+    'missing-breadcrumb': ('Breadcrumb', 'warning', 'The page has no breadcrumb navigation.'),
+    'absolute-internal-link': ('Link', 'warning', 'Internal link written with the site domain instead of root-relative.'),
+    'relative-link': ('Link', 'warning', 'Internal link with a relative path instead of root-relative.'),
+    'html-extension': ('Link', 'warning', 'Internal link exposing the .html extension instead of the clean URL.'),
+    'dead-link': ('DeadLink', 'error', 'Internal link to a file that does not exist.'),
+    'page-error': ('ERROR', 'error', 'The page could not be audited.'),
+    'broken-external': ('External', 'error', 'External link answering with an error status (or not at all).'),
+    'permanent-redirect': ('External', 'note', 'External link that permanently redirects elsewhere.'),
+    'orphan-page': ('Orphan', 'warning', 'No other page links to this page.'),
+}
+
+def make_finding(rule, url, message, penalty=0, file=None):
+    return {'rule': rule, 'level': RULES[rule][1], 'url': url, 'message': message, 'penalty': penalty, 'file': file}
+
+def fingerprint(finding):
+    key = '\n'.join([finding['rule'], finding['url'], finding['message']])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+def render_json(findings, score, pages, base_url=None):
+    """The audit as JSON: score, page count, per-rule counts and every finding."""
+    counts = {}
+    for finding in findings:
+        counts[finding['rule']] = counts.get(finding['rule'], 0) + 1
+    report = {
+        'version': REPORT_VERSION,
+        'base_url': base_url,
+        'score': score,
+        'pages': pages,
+        'counts': dict(sorted(counts.items())),
+        'findings': [dict(finding, fingerprint=fingerprint(finding)) for finding in findings]
+    }
+    return json.dumps(report, ensure_ascii=False, indent=2)
+
+def render_sarif(findings, score, base_url=None):
+    """The audit as a SARIF 2.1.0 log with a single run."""
+    rule_ids = list(RULES)
+    results = []
+    for finding in findings:
+        if finding['file']:
+            location = {'physicalLocation': {'artifactLocation': {'uri': finding['file'], 'uriBaseId': 'SITEROOT'}}}
+        else:
+            location = {'physicalLocation': {'artifactLocation': {'uri': finding['url']}}}
+        results.append({
+            'ruleId': finding['rule'],
+            'ruleIndex': rule_ids.index(finding['rule']),
+            'level': finding['level'],
+            'message': {'text': finding['message']},
+            'locations': [location],
+            'partialFingerprints': {'auditFinding/v1': fingerprint(finding)},
+            'properties': {'url': finding['url'], 'penalty': finding['penalty']}
+        })
+    log = {
+        '$schema': SARIF_SCHEMA,
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': TOOL_NAME,
+                'version': TOOL_VERSION,
+                'rules': [{'id': rule, 'name': tag, 'shortDescription': {'text': description},
+                           'defaultConfiguration': {'level': level}}
+                          for rule, (tag, level, description) in RULES.items()]
+            }},
+            'originalUriBaseIds': {'SITEROOT': {'description': {'text': 'Root of the audited site'}}},
+            'results': results,
+            'properties': {'score': score, 'baseUrl': base_url}
+        }]
+    }
+    return json.dumps(log, ensure_ascii=False, indent=2)
@@ -0,0 +1,307 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import platform
+import contextlib
+import subprocess
+import multiprocessing
+from datetime import date, datetime, timedelta
+
+# Benchmark for the build pipeline on synthetic sites.
+# A corpus of N articles is generated from the real articles/*.html pages
+# (titles, dates and categories varied), then each target runs in a fresh
+# process so its wall time and peak RSS are measured in isolation.
+# Results are appended to .benchmarks/results.jsonl for comparison across runs.
+
+SOURCE_ROOT = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(SOURCE_ROOT, '.benchmarks', 'results.jsonl')
+
+DEFAULT_SIZES = [16, 200, 2000]
+MAX_SIZE = 20000
+TARGETS = ['build', 'articles_index', 'sitemap', 'audit', 'sync_layout']
+
+# Heavy or generated directories that the pipeline does not need
+CORPUS_IGNORE = ['.git', '.benchmarks', 'node_modules', '__pycache__', 'dist', '.dist-builds', 'videos']
+
+CATEGORIES = ['开户教程', '充值提现', '订阅支付', '费用说明', '风控安全', '常见问题']
+TITLE_SUFFIXES = ['完整教程', '最新版', '避坑指南', '常见问题', '实测', '详细步骤', '新手必看', '进阶技巧']
+
+# ==========================================
+# Corpus
+# ==========================================
+
+def load_templates():
+    """Returns [(filename, html)] for every article in the source tree."""
+    articles_dir = os.path.join(SOURCE_ROOT, 'articles')
+    templates = []
+    for filename in sorted(os.listdir(articles_dir)):
+        if filename.endswith('.html') and filename != 'index.html':
+            with open(os.path.join(articles_dir, filename), 'r', encoding='utf-8') as f:
+                templates.append((filename, f.read()))
+    return templates
+
+def vary_article(html, title_suffix, date_str, category):
+    """Gives a template article a new title, date and category."""
+    # Title: <title>, <h1> and JSON-LD headline
+    html = re.sub(r'(<title>)(.*?)(</title>)', lambda m: f"{m.group(1)}{m.group(2)}｜{title_suffix}{m.group(3)}", html, count=1, flags=re.S)
+    html = re.sub(r'(<h1[^>]*>)(.*?)(</h1>)', lambda m: f"{m.group(1)}{m.group(2)} {title_suffix}{m.group(3)}", html, count=1, flags=re.S)
+    html = re.sub(r'("headline"\s*:\s*")([^"]*)(")', lambda m: f"{m.group(1)}{m.group(2)} {title_suffix}{m.group(3)}", html)
+
+    # Dates: JSON-LD, meta tags and <time datetime>
+    html = re.sub(r'("date(?:Published|Modified)"\s*:\s*")\d{4}-\d{2}-\d{2}', lambda m: m.group(1) + date_str, html)
+    html = re.sub(r'(datetime=")\d{4}-\d{2}-\d{2}', lambda m: m.group(1) + date_str, html)
+
+    # Category meta (read by build.extract_article_meta)
+    html = re.sub(r'<meta name="category"[^>]*>\s*', '', html)
+    html = re.sub(r'(<meta charset="[^"]*"\s*/?>)', lambda m: f'{m.group(1)}\n<meta name="category" content="{category}">', html, count=1, flags=re.I)
+    return html
+
+def make_corpus(size, seed=0):
+    """
+    Creates a temporary copy of the site with `size` articles.
+    The original articles are kept (so existing internal links resolve);
+    the rest are variants of them named <template>-bNNNNN.html.
+    Returns (root, html_file_count).
+    """
+    rng = random.Random(seed)
+    root = tempfile.mkdtemp(prefix=f'pokepay-bench-{size}-')
+    site = os.path.join(root, 'site')
+    shutil.copytree(SOURCE_ROOT, site, ignore=shutil.ignore_patterns(*CORPUS_IGNORE))
+
+    templates = load_templates()
+    articles_dir = os.path.join(site, 'articles')
+    start = date(2024, 1, 1)
+    for i in range(max(0, size - len(templates))):
+        filename, html = templates[i % len(templates)]
+        date_str = (start + timedelta(days=rng.randrange(900))).isoformat()
+        html = vary_article(html, f"{rng.choice(TITLE_SUFFIXES)} {i + 1}", date_str, rng.choice(CATEGORIES))
+        name = f"{filename[:-5]}-b{i + 1:05d}.html"
+        with open(os.path.join(articles_dir, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    html_files = 0
+    for dirpath, dirs, files in os.walk(site):
+        html_files += sum(1 for f in files if f.endswith('.html'))
+    return site, html_files
+
+# ==========================================
+# Targets (run in a child process)
+# ==========================================
+
+def peak_rss_mb():
+    import resource
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return usage / (1048576 if sys.platform == 'darwin' else 1024)
+
+def run_target(target, site, jobs):
+    """
+    Runs one target against the corpus at site.
+    POKEPAY_ROOT is set by the parent before this process starts, so the
+    modules pick up the corpus as their PROJECT_ROOT on import.
+    Returns (seconds, pages, peak_rss_mb).
+    """
+    import build
+    import generate_sitemap
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if target == 'build':
+            start = time.perf_counter()
+            build.run_build(force=True, jobs=jobs)
+            seconds = time.perf_counter() - start
+            pages = len(build.find_source_files())
+        elif target == 'articles_index':
+            start = time.perf_counter()
+            articles_data = build.collect_articles_data()
+            build.generate_articles_index(articles_data)
+            seconds = time.perf_counter() - start
+            pages = len(articles_data)
+        elif target == 'sitemap':
+            start = time.perf_counter()
+            generate_sitemap.main(root=site)
+            seconds = time.perf_counter() - start
+            pages = len(build.find_source_files())
+        elif target == 'audit':
+            from audit import SEOAuditor
+
+            class OfflineAuditor(SEOAuditor):
+                # External URLs measure the network, not the pipeline
+                def check_external_links(self):
+                    pass
+
+            # A full audit each run, with its caches in the corpus' temp directory
+            # (removed with it) rather than in the repository's .audit-cache
+            work_dir = os.path.dirname(site)
+            start = time.perf_counter()
+            auditor = OfflineAuditor(root_dir=site, incremental=False,
+                                     link_cache=os.path.join(work_dir, 'links.json'),
+                                     audit_cache=os.path.join(work_dir, 'audit-cache.json'))
+            seconds = time.perf_counter() - start
+            pages = len(auditor.html_files)
+        elif target == 'sync_layout':
+            import sync_layout
+            start = time.perf_counter()
+            sync_layout.sync_layout()
+            seconds = time.perf_counter() - start
+            pages = sum(1 for f in os.listdir(sync_layout.ARTICLES_DIR) if f.endswith('.html'))
+        else:
+            raise ValueError(f"Unknown target: {target}")
+
+    return seconds, pages, peak_rss_mb()
+
+def run_target_process(conn, target, site, jobs):
+    """Process entry point: sends run_target's result, or its error message, through conn."""
+    try:
+        conn.send(('ok', run_target(target, site, jobs)))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+def measure(target, site, jobs):
+    """
+    Runs target in a fresh (spawned) interpreter so RSS is not shared between targets.
+    A plain Process rather than a Pool worker: those are daemonic and may not
+    start processes of their own, which run_build(jobs > 1) does.
+    """
+    os.environ['POKEPAY_ROOT'] = site
+    ctx = multiprocessing.get_context('spawn')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=run_target_process, args=(sender, target, site, jobs))
+    process.start()
+    sender.close()
+    try:
+        status, value = receiver.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"process exited with code {process.exitcode}")
+    finally:
+        receiver.close()
+    process.join()
+    if status == 'error':
+        raise RuntimeError(value)
+    return value
+
+# ==========================================
+# Results
+# ==========================================
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=SOURCE_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_results(path=RESULTS_PATH):
+    if not os.path.exists(path):
+        return []
+    results = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                results.append(json.loads(line))
+    return results
+
+def save_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+def find_baseline(history, result, against=None):
+    """Latest earlier result for the same size/target/jobs (optionally from a given label or commit)."""
+    for previous in reversed(history):
+        if (previous['size'], previous['target'], previous['jobs']) != (result['size'], result['target'], result['jobs']):
+            continue
+        if against and against not in (previous.get('label'), previous.get('commit')):
+            continue
+        return previous
+    return None
+
+def print_results(results, history, against=None):
+    print(f"\n{'Size':>6} {'Target':<16}{'Seconds':>10}{'Pages/s':>10}{'RSS MB':>9}  {'vs baseline':<24}")
+    for result in results:
+        baseline = find_baseline(history, result, against)
+        delta = ''
+        if baseline and baseline['seconds'] > 0:
+            change = (result['seconds'] - baseline['seconds']) / baseline['seconds'] * 100
+            delta = f"{change:+.1f}% ({baseline.get('label') or baseline.get('commit') or baseline['run']})"
+        print(f"{result['size']:>6} {result['target']:<16}{result['seconds']:>10.3f}{result['pages_per_s']:>10.1f}"
+              f"{result['peak_rss_mb']:>9.1f}  {delta:<24}")
+
+# ==========================================
+# Main
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the build pipeline on synthetic sites.')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help=f'Comma-separated article counts (16-{MAX_SIZE})')
+    parser.add_argument('--targets', default=','.join(TARGETS), help=f"Comma-separated targets: {', '.join(TARGETS)}")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Worker processes for run_build')
+    parser.add_argument('--label', help='Name for this run (e.g. a branch or experiment)')
+    parser.add_argument('--against', metavar='LABEL_OR_COMMIT', help='Compare with this label/commit instead of the previous run')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated corpora')
+    parser.add_argument('--no-save', action='store_true', help='Do not append results to .benchmarks/results.jsonl')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    for size in sizes:
+        if not 16 <= size <= MAX_SIZE:
+            parser.error(f"size {size} out of range (16-{MAX_SIZE})")
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    for target in targets:
+        if target not in TARGETS:
+            parser.error(f"unknown target {target}")
+
+    history = load_results()
+    run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+    meta = {
+        'run': run_id,
+        'label': args.label,
+        'commit': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+    results = []
+    for size in sizes:
+        print(f"Generating corpus with {size} articles...")
+        site, html_files = make_corpus(size)
+        print(f"  {site} ({html_files} HTML files)")
+        try:
+            # build runs first: the later targets see the built site, as they would in practice
+            for target in targets:
+                print(f"  Running {target}...")
+                try:
+                    seconds, pages, rss = measure(target, site, args.jobs)
+                except Exception as e:
+                    print(f"  [SKIP] {target}: {e}")
+                    continue
+                result = dict(meta, size=size, html_files=html_files, target=target,
+                              jobs=args.jobs if target == 'build' else 1,
+                              seconds=round(seconds, 4), pages=pages,
+                              pages_per_s=round(pages / seconds, 1) if seconds else 0.0,
+                              peak_rss_mb=round(rss, 1))
+                results.append(result)
+        finally:
+            if not args.keep:
+                shutil.rmtree(os.path.dirname(site), ignore_errors=True)
+
+    print_results(results, history, args.against)
+    if results and not args.no_save:
+        save_results(results)
+        print(f"\nResults appended to {RESULTS_PATH}")
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,106 @@
 import os
 import re
 import json
-import random
+import html as html_lib
+import hashlib
+import argparse
+import multiprocessing
+import copy
+import difflib
+import shutil
+import functools
+import contextlib
+import time
+import tracemalloc
 from datetime import datetime
-from bs4 import BeautifulSoup, Tag, Comment
+from bs4 import BeautifulSoup, Tag, Comment, NavigableString, FeatureNotFound
 import generate_sitemap
+from build_profiler import BuildProfiler, PageClock
+from recommend import RecommendationEngine, article_features, article_tokens
+from output_writer import OutputWriter, clean_control_chars
+from search_index import SEARCH_DIR, build_search_index, render_search_widget
+from tailwind_css import (find_tailwind_config, find_tailwind_plugins, extract_classes, link_stylesheet,
+                          get_stylesheet_key, get_stylesheet_href, find_tailwind_cli, compile_stylesheet,
+                          missing_plugin_rules)
+from minify_html import minify_html
+from image_pipeline import (DERIVED_DIR, DEFAULT_SIZES, available_formats, scan_images, resolve_image_url,
+                            is_source_image, find_image_refs, picture_sources, variant_tasks, ensure_variants,
+                            prune_variants)
+from asset_fingerprint import (FINGERPRINT_DIR, HEADERS_FILE, scan_assets, build_asset_table, get_asset_groups,
+                               fingerprint_url, find_fingerprinted, write_fingerprinted, render_headers)
+from site_index import PRUNE_DIRS, clean_url
+from site_text import clean_title
 
 # Configuration
-PROJECT_ROOT = '/Users/xiaxingyu/Desktop/网站项目/PokePay'
+# POKEPAY_ROOT overrides the site location (used by benchmark.py for synthetic corpora)
+PROJECT_ROOT = os.environ.get('POKEPAY_ROOT', '/Users/xiaxingyu/Desktop/网站项目/PokePay')
 DOMAIN = 'https://pokepayguide.top'
 MASTER_LAYOUT_PATH = os.path.join(PROJECT_ROOT, 'index.html')
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, '.build_manifest.json')
+MANIFEST_VERSION = 4
+
+# Separate output tree (run_build(out_dir=...)): never read back as source
+DEFAULT_OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'dist')
+BUILD_EXCLUDE_DIRS = list(PRUNE_DIRS)
+# Build tooling that is not copied into the output tree
+STATIC_EXCLUDE_EXTS = ('.py', '.pyc', '.md', '.jsonl')
+STATIC_EXCLUDE_FILES = ['.gitignore', '.DS_Store', '.build_manifest.json', '.link_cache.json', '.audit_cache.json']
+
+# Watch mode / incremental tail stages
+# Pages that the listing stage rewrites from the article metadata (relative to the root)
+LISTING_PAGES = ['index.html', 'articles/index.html']
+SITEMAP_FILES = ['sitemap.xml', 'sitemap_index.xml']
+WATCH_INTERVAL = 1.0
+
+# Static article listings (see generate_articles_index)
+LISTING_PAGE_SIZE = 6
+# Generated listing directories, never read back as sources
+LISTING_DIRS = ['articles/page', 'articles/category']
+GENERATED_DIRS = LISTING_DIRS + [SEARCH_DIR, DERIVED_DIR, FINGERPRINT_DIR]
+CATEGORY_SLUGS = {
+    '新手入门': 'beginner',
+    '充值指南': 'recharge',
+    '高阶玩法': 'advanced',
+    '故障排查': 'troubleshooting',
+    '评测': 'reviews',
+    '其他': 'other'
+}
+
+# Link resolution memo: bounded per (directory, href) cache plus a table of known routes
+LINK_CACHE_SIZE = 16384
+ROUTE_TABLE = {}
+
+# Recommended reading: clean article URL -> [(url, title, desc)] (see build_recommendations)
+RECOMMENDATION_COUNT = 4
+RECOMMENDATIONS = {}
+# Modules besides build.py whose changes alter page output
+PIPELINE_MODULES = ['recommend.py', 'site_text.py', 'search_index.py', 'tailwind_css.py', 'minify_html.py',
+                    'image_pipeline.py', 'asset_fingerprint.py', 'site_index.py']
+
+# Compiled Tailwind stylesheet the pages link instead of the CDN runtime
+# (see tailwind_css.py). None: pages keep what they have.
+STYLESHEET_HREF = None
+# Minify every page written (--minify, output trees only: see minify_html.py)
+MINIFY_HTML = False
+# Responsive images (see image_pipeline.py): source images by site path, and the
+# variant formats Pillow can encode. No formats: <img> tags stay as they are.
+IMAGE_TABLE = {}
+IMAGE_FORMATS = []
+# Content-hashed asset URLs, output trees only (see asset_fingerprint.py):
+# source URL -> fingerprinted URL, and fingerprinted URL -> the source URL naming it
+ASSET_TABLE = {}
+ASSET_SOURCES = {}
+# Attributes that can hold an asset URL
+ASSET_ATTRS = ['src', 'href', 'poster', 'content', 'srcset']
+# Extract the audit facts of every page built (--audit, see audit.extract_page_facts)
+AUDIT_PAGES = False
+
+# HTML parser backend for page documents (see set_parser_backend)
+# html.parser: pure Python, the reference backend
+# lxml: C (libxml2) tree builder, several times faster
+# html5lib: pure Python, browser-grade error recovery (slowest)
+PARSER_BACKENDS = ['html.parser', 'lxml', 'html5lib']
+PARSER_BACKEND = 'html.parser'
 
 def read_file(path):
     with open(path, 'r', encoding='utf-8', errors='replace') as f:
@@ -18,55 +109,258 @@ def read_file(path):
 def write_file(path, content):
     # Remove control characters that might cause issues (like \x01)
     # Keep newlines (\n, \r) and tabs (\t)
-    if content:
-        content = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', content)
+    content = clean_control_chars(content)
     
-    if os.path.exists(path):
+    # Only read the old file back when the size says it may be identical
+    # (run_build pages go through OutputWriter, which needs no read at all)
+    if os.path.exists(path) and os.path.getsize(path) == len(content.encode('utf-8', errors='replace')):
         with open(path, 'r', encoding='utf-8', errors='replace') as f:
             old_content = f.read()
         if old_content == content:
-            return
+            return content
 
     with open(path, 'w', encoding='utf-8') as f:
         f.write(content)
+    return content
 
-def get_clean_url(file_path):
+def set_parser_backend(name):
     """
-    Returns the clean URL path (relative to domain root) for a given file path.
-    Example: /.../articles/foo.html -> /articles/foo
+    Selects the BeautifulSoup tree builder used for page documents.
+    Falls back to html.parser if the backend is not installed.
+    Returns the backend actually in use.
+    """
+    global PARSER_BACKEND
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}' (choose from {', '.join(PARSER_BACKENDS)})")
+    try:
+        BeautifulSoup('', name)
+    except FeatureNotFound:
+        print(f"Warning: Parser backend '{name}' is not installed, using html.parser.")
+        name = 'html.parser'
+    PARSER_BACKEND = name
+    return name
+
+def hash_content(content):
+    return hashlib.sha256(content.encode('utf-8', errors='replace')).hexdigest()
+
+def get_pipeline_hash():
+    """
+    Hash of the build script and the modules it renders with. Any change to the
+    transforms invalidates every page recorded in the manifest.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = [read_file(os.path.abspath(__file__))]
+    sources += [read_file(os.path.join(script_dir, name)) for name in PIPELINE_MODULES]
+    return hash_content(''.join(sources))
+
+def load_manifest(path=None):
+    """
+    Loads the incremental build manifest.
+    Structure:
+    {
+        "version": 4,
+        "pipeline": <hash of build.py>,
+        "parser": <parser backend>,
+        "minify": <pages were minified>,
+        "fragments": {"header": <hash>, "footer": <hash>, "mobile_nav": <hash>},
+        "articles": <digest of all article metadata, see get_articles_digest>,
+        "listing": {<listing page path>: <digest of its slice, see generate_articles_index>},
+        "outputs": {<path>: {"sha": <sha256>, "size": <bytes>, "mtime_ns": <mtime>}} (in-place builds, see OutputWriter),
+        "tailwind": {"key": <config + plugins + class set digest>, "href": <stylesheet URL>, "classes": [<class names in use>],
+                     "plugins": [<plugins the pages ask for, e.g. typography>]},
+        "images": {"formats": [<variant formats>], "sources": {<image URL>: {"sha", "size", "mtime_ns", "width", "height"}}},
+        "assets": {"sources": {<asset URL>: {"sha", "size", "mtime_ns"}}} (output trees, see asset_fingerprint.py),
+        "pages": {<path relative to PROJECT_ROOT>: {"hash": <hash of built file>, "meta": <article metadata>,
+                                                    "rec": <recommendation features, see recommend.article_features>,
+                                                    "deps": <digest of the recommendations the page was built with>,
+                                                    "images": {<image URL>: <sha256 the page was built with, or null>},
+                                                    "assets": {<fingerprinted URL>: <digest of its sources>},
+                                                    "audit": <audit facts of the built page, see audit.extract_page_facts>}}
+    }
+    """
+    path = path or MANIFEST_PATH
+    empty = {'version': MANIFEST_VERSION, 'pipeline': None, 'fragments': {}, 'listing': {}, 'outputs': {},
+             'tailwind': {}, 'images': {}, 'assets': {}, 'pages': {}}
+    if not os.path.exists(path):
+        return empty
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print("Warning: Build manifest is unreadable, doing a full build.")
+        return empty
+    if manifest.get('version') != MANIFEST_VERSION:
+        return empty
+    manifest.setdefault('fragments', {})
+    manifest.setdefault('pages', {})
+    manifest.setdefault('outputs', {})
+    manifest.setdefault('listing', {})
+    manifest.setdefault('tailwind', {})
+    manifest.setdefault('images', {})
+    manifest.setdefault('assets', {})
+    return manifest
+
+def save_manifest(manifest, path=None):
+    path = path or MANIFEST_PATH
+    write_file(path, json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True))
+
+def get_fragment_hashes(master_header, master_footer, master_mobile_nav):
+    """Hashes of the master components every page is synced against."""
+    return {
+        'header': hash_content(str(master_header)) if master_header else None,
+        'footer': hash_content(str(master_footer)) if master_footer else None,
+        'mobile_nav': hash_content(str(master_mobile_nav)) if master_mobile_nav else None,
+    }
+
+def refresh_manifest_entries(manifest, paths):
+    """
+    Re-hashes files that later build stages rewrote (articles index, homepage cards),
+    so the next build does not treat them as edited.
     """
-    rel_path = os.path.relpath(file_path, PROJECT_ROOT)
-    rel_path = rel_path.replace('\\', '/')
+    for path in paths:
+        if os.path.exists(path):
+            rel_path = os.path.relpath(path, PROJECT_ROOT).replace('\\', '/')
+            manifest['pages'][rel_path] = {'hash': hash_content(read_file(path))}
+
+def get_rel_path(file_path):
+    """Manifest key of a page: its path relative to PROJECT_ROOT, with forward slashes."""
+    return os.path.relpath(file_path, PROJECT_ROOT).replace('\\', '/')
+
+def get_articles_digest(pages):
+    """
+    Digest of the listing metadata (title/desc/date/category) of every article in
+    a manifest's pages. The listing pages embed all of them and are regenerated
+    when it changes.
+    """
+    metas = [(rel_path, entry['meta']) for rel_path, entry in sorted(pages.items()) if entry.get('meta')]
+    return hash_content(json.dumps(metas, sort_keys=True, ensure_ascii=False))
+
+class Document:
+    """
+    An HTML file loaded once for the whole build.
+    The raw content, the parsed tree and the extracted article metadata travel
+    together through check/fix, the page pipeline and the articles index.
+    """
+    def __init__(self, path, content=None):
+        self.path = path
+        self.content = read_file(path) if content is None else content
+        self.soup = None
+        self.meta = None
+        self.facts = None
+
+    def parse(self, parser=None):
+        if self.soup is None:
+            self.soup = BeautifulSoup(self.content, parser or PARSER_BACKEND)
+        return self.soup
+
+    @property
+    def is_article(self):
+        return is_article_path(self.path)
+
+def is_article_path(file_path):
+    """True for articles/*.html, except the articles index itself."""
+    parent = os.path.basename(os.path.dirname(file_path))
+    return parent == 'articles' and file_path.endswith('.html') and os.path.basename(file_path) != 'index.html'
+
+def extract_article_meta(soup, html, file_path):
+    """
+    Extracts the listing metadata (title/desc/date/category/url) of an article.
+    html is the serialized document, used for the JSON-LD date lookup.
+    """
+    filename = os.path.basename(file_path)
+
+    # Title
+    title_tag = soup.find('h1')
+    # Clean title (collapse whitespace, remove leading numbers like "1. ", "2. "),
+    # the same as the recommended reading (see site_text.extract_article_parts)
+    title = clean_title(title_tag.get_text() if title_tag else filename)
     
-    if rel_path == 'index.html':
-        return '/'
+    # Desc
+    desc_tag = soup.find('meta', attrs={'name': 'description'})
+    desc = desc_tag['content'] if desc_tag else ""
     
-    if rel_path.endswith('index.html'):
-        return '/' + os.path.dirname(rel_path) + '/'
+    # Date
+    # Try dateModified first, then datePublished, then lastmod logic
+    date_str = "2026-01-01" # Default
+    date_mod = re.search(r'["\']dateModified["\']\s*:\s*["\'](\d{4}-\d{2}-\d{2})["\']', html)
+    date_pub = re.search(r'["\']datePublished["\']\s*:\s*["\'](\d{4}-\d{2}-\d{2})["\']', html)
+    if date_mod:
+        date_str = date_mod.group(1)
+    elif date_pub:
+        date_str = date_pub.group(1)
         
-    base, ext = os.path.splitext(rel_path)
-    if ext == '.html':
-        return '/' + base
-    return '/' + rel_path
+    # Category
+    cat_tag = soup.find('meta', attrs={'name': 'category'})
+    category = cat_tag['content'] if cat_tag else "其他"
+    
+    # URL
+    url = "/articles/" + filename.replace('.html', '')
+    
+    return {
+        'title': title,
+        'desc': desc,
+        'date': date_str,
+        'category': category,
+        'url': url
+    }
+
+def collect_articles_data():
+    """Parses every article on disk for its metadata (used outside of run_build)."""
+    articles_data = []
+    articles_dir = os.path.join(PROJECT_ROOT, 'articles')
+    
+    for filename in sorted(os.listdir(articles_dir)):
+        if not filename.endswith('.html') or filename == 'index.html':
+            continue
+        doc = Document(os.path.join(articles_dir, filename))
+        try:
+            doc.parse()
+        except Exception:
+            continue
+        articles_data.append(extract_article_meta(doc.soup, doc.content, doc.path))
+    return articles_data
+
+def get_clean_url(file_path, root=None):
+    """
+    Returns the clean URL path (relative to domain root) for a given file path.
+    Example: /.../articles/foo.html -> /articles/foo
+    root defaults to PROJECT_ROOT.
+    """
+    return _get_clean_url(file_path, root or PROJECT_ROOT)
+
+@functools.lru_cache(maxsize=LINK_CACHE_SIZE)
+def _get_clean_url(file_path, root):
+    return clean_url(os.path.relpath(file_path, root))
 
 def resolve_to_absolute(url, current_file_path):
     """
     Resolves a link to an absolute path (starting with /) based on the current file's location.
     Also cleans .html suffix.
+    The same header/footer/sidebar hrefs repeat on every page, so known routes are
+    a table lookup and everything else is memoized per directory.
     """
     if not url:
         return url
-        
+
+    route = ROUTE_TABLE.get(url)
+    if route is not None:
+        return route
+
+    # Only anchors depend on the page itself, everything else on its directory
+    is_home = url.startswith('#') and get_clean_url(current_file_path) == '/'
+    return _resolve_link(url, os.path.dirname(current_file_path), is_home, PROJECT_ROOT)
+
+@functools.lru_cache(maxsize=LINK_CACHE_SIZE)
+def _resolve_link(url, current_dir, is_home, project_root):
     # Skip special links
     if url.startswith(('http:', 'https:', '//', 'mailto:', 'tel:', 'javascript:', '#')):
         # Special handling for anchor links on non-index pages
         if url.startswith('#'):
-            current_clean = get_clean_url(current_file_path)
             # If we are NOT on the home page (or effective home page), 
             # and the link is a known home-page anchor section, prepend /
             # Known sections from index.html: #features, #tutorial, #okx-tutorial, #faq
             known_home_anchors = ['#features', '#tutorial', '#okx-tutorial', '#faq', '#reviews']
-            if current_clean != '/' and url in known_home_anchors:
+            if not is_home and url in known_home_anchors:
                 return '/' + url
         return url
         
@@ -86,14 +380,13 @@ def resolve_to_absolute(url, current_file_path):
     if url.startswith('/'):
         abs_path = url
     else:
-        current_dir = os.path.dirname(current_file_path)
         combined = os.path.join(current_dir, url)
         normalized = os.path.normpath(combined)
         
-        if not normalized.startswith(PROJECT_ROOT):
+        if not normalized.startswith(project_root):
              abs_path = '/' + url.lstrip('/')
         else:
-             rel_to_root = os.path.relpath(normalized, PROJECT_ROOT)
+             rel_to_root = os.path.relpath(normalized, project_root)
              rel_to_root = rel_to_root.replace('\\', '/')
              if rel_to_root == '.':
                  abs_path = '/'
@@ -115,6 +408,87 @@ def resolve_to_absolute(url, current_file_path):
         
     return abs_path + query + anchor
 
+def build_route_table(page_paths):
+    """
+    Precomputes the resolved form of every root-relative way of linking to a known
+    page (/articles/foo, /articles/foo.html, /articles/, /articles/index.html...).
+    Root-relative hrefs do not depend on the current page, so these are plain lookups.
+    """
+    table = {}
+    for path in page_paths:
+        clean = get_clean_url(path)
+        rel_path = '/' + os.path.relpath(path, PROJECT_ROOT).replace('\\', '/')
+        variants = {rel_path, clean}
+        if rel_path.endswith('/index.html'):
+            variants.update([rel_path[:-len('index.html')], rel_path[:-len('.html')], clean.rstrip('/') or '/'])
+        elif rel_path.endswith('.html'):
+            variants.add(rel_path[:-len('.html')])
+        for variant in variants:
+            table[variant] = _resolve_link(variant, PROJECT_ROOT, False, PROJECT_ROOT)
+    return table
+
+def set_route_table(table):
+    global ROUTE_TABLE
+    ROUTE_TABLE = table
+
+def build_recommendations(page_paths, docs=None, cached=None):
+    """
+    Computes the recommended reading of every article from the whole article set.
+    docs: {path: Document} already read this build (used instead of reading again).
+    cached: {path: features} from the manifest for pages known to be unchanged.
+    Returns (recommendations by clean URL, features by path).
+    """
+    docs = docs or {}
+    cached = cached or {}
+    features = {}
+    for path in page_paths:
+        if not is_article_path(path):
+            continue
+        if path in docs:
+            features[path] = article_features(docs[path].content, get_clean_url(path))
+        elif path in cached:
+            features[path] = cached[path]
+        else:
+            features[path] = article_features(read_file(path), get_clean_url(path))
+    engine = RecommendationEngine(features.values())
+    return engine.recommend_all(RECOMMENDATION_COUNT), features
+
+def set_recommendations(table):
+    global RECOMMENDATIONS
+    RECOMMENDATIONS = table
+
+def set_stylesheet(href):
+    global STYLESHEET_HREF
+    STYLESHEET_HREF = href
+
+def set_minify(enabled):
+    global MINIFY_HTML
+    MINIFY_HTML = enabled
+
+def set_images(table, formats):
+    global IMAGE_TABLE, IMAGE_FORMATS
+    IMAGE_TABLE = table
+    IMAGE_FORMATS = formats
+
+def set_assets(table):
+    global ASSET_TABLE, ASSET_SOURCES
+    ASSET_TABLE = table
+    ASSET_SOURCES = {}
+    for url in sorted(table):
+        ASSET_SOURCES.setdefault(table[url], url)
+
+def set_audit(enabled):
+    global AUDIT_PAGES
+    AUDIT_PAGES = enabled
+
+def finalize_html(html):
+    """Last step for every page the build writes: stylesheet link, then minification."""
+    if STYLESHEET_HREF:
+        html = link_stylesheet(html, STYLESHEET_HREF)
+    if MINIFY_HTML:
+        html = minify_html(html)
+    return html
+
 def process_links_in_soup(soup, file_path):
     """
     Traverses soup and converts all links to absolute, clean URLs.
@@ -152,226 +526,256 @@ def process_links_in_soup(soup, file_path):
         else:
              link['href'] = resolve_to_absolute(href, file_path)
 
-def reorganize_head(soup, file_path, clean_path):
+def inject_responsive_images(soup, file_path):
     """
-    Reorganizes the <head> section for Global SEO.
+    Serves local images through <picture>: one <source> per variant format with
+    a width-based srcset, the original <img> as fallback. Adds the intrinsic
+    width/height so the browser reserves the space before the image loads.
+    Sources from an earlier build are replaced, so the step is idempotent.
     """
-    # 1. Extract existing data (Priority: Head > Body/Global)
-    title_text = ""
-    desc_content = ""
-    kw_content = ""
-    cat_content = ""
-    
-    # Try finding in head first
-    if soup.head:
-        t = soup.head.find('title')
-        if t and t.string: title_text = t.string
-        
-        d = soup.head.find('meta', attrs={'name': 'description'})
-        if d: desc_content = d.get('content', '')
-        
-        k = soup.head.find('meta', attrs={'name': 'keywords'})
-        if k: kw_content = k.get('content', '')
+    page_url = get_clean_url(file_path)
+    for img in soup.find_all('img', src=True):
+        url = resolve_image_url(img['src'], page_url)
+        # Byte-identical copies share the variants of the one that is fingerprinted
+        url = ASSET_SOURCES.get(ASSET_TABLE.get(url), url)
+        entry = IMAGE_TABLE.get(url) if is_source_image(url) else None
+        picture = img.parent if img.parent is not None and img.parent.name == 'picture' else None
+        if picture:
+            for source in picture.find_all('source', recursive=False):
+                if source.get('srcset', '').startswith(f'/{DERIVED_DIR}/'):
+                    source.decompose()
+        if not entry or not IMAGE_FORMATS:
+            # Image gone or no encoder: unwrap a picture the build created
+            if picture and not picture.find('source', recursive=False) and not picture.attrs:
+                picture.replace_with(img.extract())
+            continue
 
-        c = soup.head.find('meta', attrs={'name': 'category'})
-        if c: cat_content = c.get('content', '')
+        if not img.has_attr('width') and not img.has_attr('height'):
+            img['width'] = str(entry['width'])
+            img['height'] = str(entry['height'])
+        if not picture:
+            picture = soup.new_tag('picture')
+            img.replace_with(picture)
+            picture.append(img)
+        for mime, srcset in picture_sources(url, entry, IMAGE_FORMATS):
+            source = soup.new_tag('source', attrs={'type': mime, 'srcset': srcset,
+                                                   'sizes': img.get('sizes', DEFAULT_SIZES)})
+            img.insert_before(source)
+
+def fingerprint_assets_in_soup(soup, file_path):
+    """
+    Points every asset reference at its content-hashed URL: element attributes
+    (img/source/video/link/a, og:image...) and the image URLs of JSON-LD blocks.
+    """
+    if not ASSET_TABLE:
+        return
+    page_url = get_clean_url(file_path)
+    for tag in soup.find_all(lambda t: any(t.has_attr(attr) for attr in ASSET_ATTRS)):
+        for attr in ASSET_ATTRS:
+            value = tag.get(attr)
+            if not isinstance(value, str) or (attr == 'content' and tag.name != 'meta'):
+                continue
+            if attr == 'srcset':
+                candidates = []
+                for candidate in value.split(','):
+                    parts = candidate.split()
+                    if parts:
+                        parts[0] = fingerprint_url(parts[0], page_url, ASSET_TABLE, DOMAIN) or parts[0]
+                    candidates.append(' '.join(parts))
+                tag[attr] = ', '.join(candidates)
+                continue
+            fingerprinted = fingerprint_url(value, page_url, ASSET_TABLE, DOMAIN)
+            if fingerprinted:
+                tag[attr] = fingerprinted
 
-    # Fallback: Find anywhere (in case structure is broken)
-    if not title_text:
-        t = soup.find('title')
-        if t and t.string: title_text = t.string
-        
-    if not desc_content:
-        d = soup.find('meta', attrs={'name': 'description'})
-        if d: desc_content = d.get('content', '')
-        
-    if not kw_content:
-        k = soup.find('meta', attrs={'name': 'keywords'})
-        if k: kw_content = k.get('content', '')
-
-    if not cat_content:
-        c = soup.find('meta', attrs={'name': 'category'})
-        if c: cat_content = c.get('content', '')
-
-    # Extract Resources from HEAD (we only want to preserve what was originally in head)
-    # If structure is broken and scripts are in body, we generally leave them in body, 
-    # unless we are sure they belong in head.
-    resources = []
-    icons = []
-    schemas = []
-    
-    # Enhanced extraction: Scan global for Link/Style/Schema/Tailwind, and Head for other Scripts
-    for tag in soup.find_all(['link', 'style', 'script']):
-        # Check if tag is inside head
-        is_in_head = False
-        parent = tag.parent
-        while parent:
-            if parent.name == 'head':
-                is_in_head = True
-                break
-            parent = parent.parent
-            
-        should_extract = False
-        
-        if tag.name == 'link':
+    for script in soup.find_all('script', type='application/ld+json'):
+        if not script.string:
+            continue
+        content = re.sub(re.escape(DOMAIN) + r'/[^"\\\s]+',
+                         lambda m: fingerprint_url(m.group(0), page_url, ASSET_TABLE, DOMAIN) or m.group(0),
+                         script.string)
+        if content != script.string:
+            script.string = content
+
+HEAD_TAGS = ['title', 'meta', 'link', 'style', 'script']
+SEO_META_NAMES = ['description', 'keywords', 'category']
+
+def collect_head_data(soup):
+    """
+    Collects everything reorganize_head needs in a single traversal.
+    Title/meta values prefer the first occurrence inside <head>, then anywhere
+    (in case structure is broken and they spilled into body).
+    Resources (link/style, Tailwind, scripts that were in head), icons and schemas
+    are extracted; title/meta and canonical/alternate links are removed.
+    """
+    data = {'icons': [], 'resources': [], 'schemas': []}
+    head_first = {}
+    global_first = {}
+
+    # Tags inside <head> (the head is small, this is not a document walk)
+    head_ids = set(id(t) for t in soup.head.find_all(HEAD_TAGS)) if soup.head else set()
+
+    to_remove = []
+    for tag in soup.find_all(HEAD_TAGS):
+        is_in_head = id(tag) in head_ids
+
+        if tag.name in ('title', 'meta'):
+            if tag.name == 'title':
+                key = 'title'
+            else:
+                key = tag.get('name')
+                if key not in SEO_META_NAMES:
+                    key = None
+            if key:
+                global_first.setdefault(key, tag)
+                if is_in_head:
+                    head_first.setdefault(key, tag)
+            # SEO tags are regenerated, remove them from the ENTIRE document
+            to_remove.append(tag)
+
+        elif tag.name == 'link':
             rel = tag.get('rel')
             if isinstance(rel, list): rel = rel[0]
-            
-            # SEO links will be deleted later, don't extract them
             if rel in ['canonical', 'alternate']:
-                continue
-                
-            if 'icon' in str(rel):
-                icons.append(tag)
-                should_extract = True
+                to_remove.append(tag)
+            elif 'icon' in str(rel):
+                data['icons'].append(tag.extract())
             else:
                 # Stylesheets, preconnect, etc.
-                resources.append(tag)
-                should_extract = True
-                
+                data['resources'].append(tag.extract())
+
         elif tag.name == 'style':
-            resources.append(tag)
-            should_extract = True
-            
+            data['resources'].append(tag.extract())
+
         elif tag.name == 'script':
             if tag.get('type') == 'application/ld+json':
-                schemas.append(tag)
-                should_extract = True
+                data['schemas'].append(tag.extract())
             elif tag.get('src') and 'tailwindcss' in tag.get('src'):
-                resources.append(tag)
-                should_extract = True
+                data['resources'].append(tag.extract())
             elif is_in_head:
-                resources.append(tag)
-                should_extract = True
-        
-        if should_extract:
-            tag.extract()
+                # Scripts in body stay where they are
+                data['resources'].append(tag.extract())
 
-    # 2. GLOBAL CLEANUP: Remove all SEO tags from the ENTIRE document
-    # This fixes the issue where meta tags spilled into body
-    for tag in soup.find_all(['title', 'meta']):
-        tag.decompose()
-        
-    for tag in soup.find_all('link'):
-        rel = tag.get('rel')
-        if isinstance(rel, list): rel = rel[0]
-        if rel in ['canonical', 'alternate']:
-            tag.decompose()
+    def value_of(tag, key):
+        if tag is None:
+            return ""
+        if key == 'title':
+            return tag.string or ""
+        return tag.get('content', '')
 
-    # 3. Ensure Head Exists and is Clean
-    if not soup.head:
-        head = soup.new_tag('head')
-        soup.insert(0, head)
-    else:
-        head = soup.head
-        head.clear()
-    
-    # 4. Insert Charset & Viewport
-    head.append(BeautifulSoup('<meta charset="utf-8">', 'html.parser'))
-    head.append(BeautifulSoup('\n  ', 'html.parser'))
-    head.append(BeautifulSoup('<meta name="viewport" content="width=device-width, initial-scale=1">', 'html.parser'))
-    head.append(BeautifulSoup('\n  ', 'html.parser'))
+    for key in ['title'] + SEO_META_NAMES:
+        data[key] = value_of(head_first.get(key), key) or value_of(global_first.get(key), key)
+
+    for tag in to_remove:
+        tag.decompose()
+    return data
+
+def get_default_schema(clean_path):
+    """Default JSON-LD for standard pages that do not carry their own."""
+    if clean_path == '/privacy-policy':
+        return {
+            "@context": "https://schema.org",
+            "@type": "WebPage",
+            "name": "隐私政策",
+            "url": DOMAIN + "/privacy-policy",
+            "description": "Pokepay 隐私政策说明"
+        }
+    if clean_path == '/terms-of-service':
+        return {
+            "@context": "https://schema.org",
+            "@type": "WebPage",
+            "name": "服务条款",
+            "url": DOMAIN + "/terms-of-service",
+            "description": "Pokepay 服务条款说明"
+        }
+    return None
+
+def clean_schema_content(schema_content):
+    # Clean .html extensions in schema
+    schema_content = re.sub(r'"([^"]*?)\.html"', r'"\1"', schema_content)
+    schema_content = schema_content.replace('"/index"', '"/"')
+    schema_content = schema_content.replace('/index"', '/"')
+    schema_content = schema_content.replace('/articles/index"', '/articles"')
+    return schema_content
+
+def render_head(soup, data, clean_path):
+    """Builds the node list of the new <head> from collected data."""
+    # Separator nodes are single newlines: that is what the former
+    # BeautifulSoup('\n  ', 'html.parser') whitespace parses produced.
+    nodes = []
+    def add(node):
+        nodes.append(node)
+        nodes.append(soup.new_string('\n'))
+
+    # 4. Charset & Viewport
+    add(soup.new_tag('meta', attrs={'charset': 'utf-8'}))
+    add(soup.new_tag('meta', attrs={'name': 'viewport', 'content': 'width=device-width, initial-scale=1'}))
 
     # 5. Group A: Basic SEO
-    if title_text:
+    if data['title']:
         new_title = soup.new_tag('title')
-        new_title.string = title_text
-        head.append(new_title)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
-    
-    if desc_content:
-        new_desc = soup.new_tag('meta', attrs={'name': 'description', 'content': desc_content})
-        head.append(new_desc)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
-
-    if kw_content:
-        new_kw = soup.new_tag('meta', attrs={'name': 'keywords', 'content': kw_content})
-        head.append(new_kw)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
-
-    if cat_content:
-        new_cat = soup.new_tag('meta', attrs={'name': 'category', 'content': cat_content})
-        head.append(new_cat)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
+        new_title.string = data['title']
+        add(new_title)
+    for name in SEO_META_NAMES:
+        if data[name]:
+            add(soup.new_tag('meta', attrs={'name': name, 'content': data[name]}))
 
     # Canonical
     canonical_url = DOMAIN + clean_path
-    new_canonical = soup.new_tag('link', rel='canonical', href=canonical_url)
-    head.append(new_canonical)
-    head.append(BeautifulSoup('\n\n  ', 'html.parser')) 
+    add(soup.new_tag('link', rel='canonical', href=canonical_url))
 
     # 6. Group B: Indexing & Geo (Global Targeting)
-    head.append(BeautifulSoup('<meta name="robots" content="index, follow, max-image-preview:large">', 'html.parser'))
-    head.append(BeautifulSoup('\n  ', 'html.parser'))
-    head.append(BeautifulSoup('<meta name="distribution" content="global">', 'html.parser'))
-    head.append(BeautifulSoup('\n  ', 'html.parser'))
-    head.append(BeautifulSoup('<meta http-equiv="content-language" content="zh-CN">', 'html.parser'))
-    head.append(BeautifulSoup('\n  ', 'html.parser'))
-    
+    add(soup.new_tag('meta', attrs={'name': 'robots', 'content': 'index, follow, max-image-preview:large'}))
+    add(soup.new_tag('meta', attrs={'name': 'distribution', 'content': 'global'}))
+    add(soup.new_tag('meta', attrs={'http-equiv': 'content-language', 'content': 'zh-CN'}))
+
     # Hreflang Matrix
-    hreflangs = [
-        ('zh', canonical_url),
-        ('zh-CN', canonical_url),
-        ('x-default', canonical_url)
-    ]
-    for lang, url in hreflangs:
-        link = soup.new_tag('link', rel='alternate', href=url, hreflang=lang)
-        head.append(link)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
-    head.append(BeautifulSoup('\n', 'html.parser'))
+    for lang in ['zh', 'zh-CN', 'x-default']:
+        add(soup.new_tag('link', rel='alternate', href=canonical_url, hreflang=lang))
+    nodes.append(soup.new_string('\n'))
 
     # 7. Group C: Schema
     # Preserve existing schemas but clean their content
     has_schema = False
-    for schema in schemas:
-        schema_content = schema.string
-        if schema_content:
+    for schema in data['schemas']:
+        if schema.string:
             has_schema = True
-            # Clean .html extensions in schema
-            schema_content = re.sub(r'"([^"]*?)\.html"', r'"\1"', schema_content)
-            schema_content = schema_content.replace('"/index"', '"/"')
-            schema_content = schema_content.replace('/index"', '/"')
-            schema_content = schema_content.replace('/articles/index"', '/articles"')
-            schema.string = schema_content
-        head.append(schema)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
-    
+            schema.string = clean_schema_content(schema.string)
+        add(schema)
+
     # Generate default schema if missing for standard pages
     if not has_schema:
-        schema_data = None
-        if clean_path == '/privacy-policy':
-            schema_data = {
-                "@context": "https://schema.org",
-                "@type": "WebPage",
-                "name": "隐私政策",
-                "url": DOMAIN + "/privacy-policy",
-                "description": "Pokepay 隐私政策说明"
-            }
-        elif clean_path == '/terms-of-service':
-            schema_data = {
-                "@context": "https://schema.org",
-                "@type": "WebPage",
-                "name": "服务条款",
-                "url": DOMAIN + "/terms-of-service",
-                "description": "Pokepay 服务条款说明"
-            }
-            
+        schema_data = get_default_schema(clean_path)
         if schema_data:
             new_schema = soup.new_tag('script', type='application/ld+json')
             new_schema.string = json.dumps(schema_data, indent=2, ensure_ascii=False)
-            head.append(new_schema)
-            head.append(BeautifulSoup('\n  ', 'html.parser'))
+            add(new_schema)
 
-    head.append(BeautifulSoup('\n  ', 'html.parser')) 
+    nodes.append(soup.new_string('\n'))
 
     # 8. Group D: Resources
-    for icon in icons:
-        head.append(icon)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
+    for tag in data['icons'] + data['resources']:
+        add(tag)
+    return nodes
+
+def reorganize_head(soup, file_path, clean_path):
+    """
+    Reorganizes the <head> section for Global SEO.
+    Collects head data in one traversal, then renders the new head in one step.
+    """
+    # 1-2. Extract existing data and clean up SEO tags globally
+    data = collect_head_data(soup)
+
+    # 3. Ensure Head Exists and is Clean
+    if not soup.head:
+        head = soup.new_tag('head')
+        soup.insert(0, head)
+    else:
+        head = soup.head
+        head.clear()
 
-    for res in resources:
-        head.append(res)
-        head.append(BeautifulSoup('\n  ', 'html.parser'))
+    # 4-8. Render
+    head.extend(render_head(soup, data, clean_path))
 
 def inject_breadcrumb(soup, file_path):
     """Injects breadcrumb navigation for SEO."""
@@ -541,58 +945,8 @@ def inject_recommended_reading(soup, file_path):
     if not article_tag:
         return
 
-    recommendations = [
-        (
-            "/articles/pokepay-recharge-guide",
-            "PokePay 充值全能教程",
-            "2026最新：USDT、银行转账、Wise三种方式全覆盖。"
-        ),
-        (
-            "/articles/how-to-bind-pokepay-to-alipay",
-            "绑定支付宝教程",
-            "国内消费神器，支持淘宝、美团、线下扫码。"
-        ),
-        (
-            "/articles/pokepay-virtual-card-guide",
-            "虚拟卡开卡全流程",
-            "手把手教你注册、KYC认证、开卡。新手入门第一课。"
-        ),
-        (
-            "/articles/pokepay-bind-paypal-chatgpt",
-            "绑定 PayPal 订阅 ChatGPT",
-            "解决 Plus 订阅支付失败问题，成功率 99%。"
-        ),
-        (
-            "/articles/subscription-failure-checklist",
-            "支付被拒？排查清单",
-            "遇到 Card Declined 怎么办？余额、IP、地址全方位排查。"
-        ),
-        (
-            "/articles/pokepay-withdrawal-guide",
-            "PokePay 提现全攻略",
-            "USDT、ATM取现、Wise汇款三种提现方式详解。"
-        ),
-        (
-            "/articles/pokepay-paolu-fengkong",
-            "Pokepay 跑路了吗？风控解读",
-            "账户被封/停用怎么办？2026最新退款与解封指南。"
-        ),
-        (
-            "/articles/pokepay-kaopu-ma",
-            "Pokepay 靠谱吗？(2026评测)",
-            "深度解析美国MSB牌照、资金隔离与潜在风险。"
-        )
-    ]
-
-    current_clean = get_clean_url(file_path)
-    valid_recs = [r for r in recommendations if r[0] != current_clean]
-    
-    # Randomize recommendations to ensure better internal link coverage across the site
-    # This helps SEO by distributing link equity more evenly
-    random.shuffle(valid_recs)
-    
-    selected = valid_recs[:4]
-    
+    # Most similar articles, computed once per build over the whole article set
+    selected = RECOMMENDATIONS.get(clean_path, [])
     if not selected:
         return
 
@@ -600,8 +954,8 @@ def inject_recommended_reading(soup, file_path):
     for url, title, desc in selected:
         items_html += f'''
             <a href="{url}" class="block group bg-slate-50 p-4 rounded-xl border border-slate-100 hover:border-emerald-500 transition no-underline">
-                <div class="font-bold text-slate-900 group-hover:text-emerald-600 mb-2">{title}</div>
-                <p class="text-xs text-slate-500">{desc}</p>
+                <div class="font-bold text-slate-900 group-hover:text-emerald-600 mb-2">{html_lib.escape(title)}</div>
+                <p class="text-xs text-slate-500">{html_lib.escape(desc)}</p>
             </a>
         '''
 
@@ -818,150 +1172,158 @@ def inject_sidebar(soup, file_path):
     return
 
 
+def get_file_date(file_path):
+    """Last modification date of a file (YYYY-MM-DD): stable from one build to the next."""
+    return datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d')
+
+def fix_article_soup(soup, published=None):
+    """
+    Checks an article for missing time, author, and removes title numbers.
+    Injects default values if missing. Returns True if the soup was changed.
+    published: datePublished given to articles without one (default: today).
+    """
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    changed = False
+    
+    # 1. Check Title Numbering (H1, H2, H3, H4)
+    for tag_name in ['h1', 'h2', 'h3', 'h4']:
+        tags = soup.find_all(tag_name)
+        for tag in tags:
+            if not tag.contents:
+                continue
+                
+            # Iterate to find the first text node to clean
+            for child in tag.contents:
+                if isinstance(child, Comment):
+                    continue
+                
+                if isinstance(child, Tag):
+                    # If we hit a tag before finding text, we stop.
+                    # Assuming number is at the very start of the heading.
+                    break
+                
+                if isinstance(child, str):
+                    text = str(child)
+                    # Remove leading numbers (e.g., "1. ", " 2. ")
+                    new_text = re.sub(r'^\s*\d+\.?\s*', '', text)
+                    if new_text != text:
+                        child.replace_with(new_text)
+                        changed = True
+                    
+                    if text.strip():
+                        break
+
+    # 2. Check JSON-LD for Date and Author
+    schema_script = soup.find('script', type='application/ld+json')
+    article_date = today_str
+    article_author = "PokepayGuide"
+    
+    if schema_script:
+        try:
+            data = json.loads(schema_script.string)
+            
+            # Check Author
+            if 'author' not in data:
+                data['author'] = {"@type": "Organization", "name": "PokepayGuide"}
+                changed = True
+            else:
+                if isinstance(data['author'], dict):
+                    article_author = data['author'].get('name', 'PokepayGuide')
+                elif isinstance(data['author'], str):
+                    article_author = data['author']
+            
+            # Check Date
+            if 'datePublished' not in data:
+                data['datePublished'] = published or today_str
+                article_date = data['datePublished']
+                changed = True
+            else:
+                article_date = data['datePublished']
+
+            # Fix: Do not force dateModified to today if not present
+            # Also, revert if dateModified is today but datePublished is different (likely added by previous script run)
+            if 'dateModified' in data:
+                if data['dateModified'] == today_str and data.get('datePublished') != today_str:
+                    del data['dateModified']
+                    changed = True
+                else:
+                    # Update article_date to modified date if it exists and is valid
+                    article_date = data['dateModified']
+                
+            if changed:
+                schema_script.string = json.dumps(data, indent=2, ensure_ascii=False)
+        except:
+            pass
+    
+    # 3. Inject Visible Metadata (Time/Author) after H1
+    # Check if already exists
+    h1 = soup.find('h1')
+    meta_exists = False
+    if h1:
+        next_sibling = h1.find_next_sibling()
+        if next_sibling and next_sibling.name == 'div' and 'text-slate-500' in next_sibling.get('class', []):
+            # Simple heuristic: check if it looks like our metadata block
+            if next_sibling.find('time') or 'PokepayGuide' in next_sibling.get_text():
+                meta_exists = True
+    
+    if h1 and not meta_exists:
+        # Create metadata block
+        meta_div = soup.new_tag('div', **{'class': 'flex items-center gap-4 text-sm text-slate-500 mb-8 font-medium'})
+        
+        # Author badge
+        author_div = soup.new_tag('div', **{'class': 'flex items-center gap-2'})
+        author_span = soup.new_tag('span', **{'class': 'bg-emerald-50 text-emerald-600 px-2 py-0.5 rounded text-xs font-bold'})
+        author_span.string = article_author
+        author_div.append(author_span)
+        meta_div.append(author_div)
+        
+        # Dot separator
+        dot = soup.new_tag('div', **{'class': 'w-1 h-1 rounded-full bg-slate-300'})
+        meta_div.append(dot)
+        
+        # Time
+        time_tag = soup.new_tag('time', datetime=article_date)
+        # Format date to YYYY年MM月DD日 if possible
+        try:
+            dt = datetime.strptime(article_date, '%Y-%m-%d')
+            time_str = dt.strftime('%Y年%m月%d日')
+        except:
+            time_str = article_date
+        time_tag.string = time_str
+        meta_div.append(time_tag)
+        
+        h1.insert_after(meta_div)
+        changed = True
+
+    return changed
+
 def check_and_fix_articles():
     """
     Checks all article files for missing time, author, and removes title numbers.
     Injects default values if missing.
+    run_build applies the same fixes inside build_page, this is the standalone version.
     """
     print("Checking and fixing articles...")
     articles_dir = os.path.join(PROJECT_ROOT, 'articles')
     if not os.path.exists(articles_dir):
         return
 
-    today_str = datetime.now().strftime('%Y-%m-%d')
-    
     for filename in os.listdir(articles_dir):
         if not filename.endswith('.html') or filename == 'index.html':
             continue
-            
-        file_path = os.path.join(articles_dir, filename)
-        content = read_file(file_path)
-        try:
-            soup = BeautifulSoup(content, 'html.parser')
-        except:
-            continue
-            
-        changed = False
-        
-        # 1. Check Title Numbering (H1, H2, H3, H4)
-        for tag_name in ['h1', 'h2', 'h3', 'h4']:
-            tags = soup.find_all(tag_name)
-            for tag in tags:
-                if not tag.contents:
-                    continue
-                    
-                # Iterate to find the first text node to clean
-                for child in tag.contents:
-                    if isinstance(child, Comment):
-                        continue
-                    
-                    if isinstance(child, Tag):
-                        # If we hit a tag before finding text, we stop.
-                        # Assuming number is at the very start of the heading.
-                        break
-                    
-                    if isinstance(child, str):
-                        text = str(child)
-                        # Remove leading numbers (e.g., "1. ", " 2. ")
-                        new_text = re.sub(r'^\s*\d+\.?\s*', '', text)
-                        if new_text != text:
-                            child.replace_with(new_text)
-                            changed = True
-                        
-                        if text.strip():
-                            break
-
-        # 2. Check JSON-LD for Date and Author
-        schema_script = soup.find('script', type='application/ld+json')
-        article_date = today_str
-        article_author = "PokepayGuide"
-        
-        if schema_script:
-            try:
-                data = json.loads(schema_script.string)
-                
-                # Check Author
-                if 'author' not in data:
-                    data['author'] = {"@type": "Organization", "name": "PokepayGuide"}
-                    changed = True
-                else:
-                    if isinstance(data['author'], dict):
-                        article_author = data['author'].get('name', 'PokepayGuide')
-                    elif isinstance(data['author'], str):
-                        article_author = data['author']
-                
-                # Check Date
-                if 'datePublished' not in data:
-                    data['datePublished'] = today_str
-                    changed = True
-                else:
-                    article_date = data['datePublished']
-
-                # Fix: Do not force dateModified to today if not present
-                # Also, revert if dateModified is today but datePublished is different (likely added by previous script run)
-                if 'dateModified' in data:
-                    if data['dateModified'] == today_str and data.get('datePublished') != today_str:
-                        del data['dateModified']
-                        changed = True
-                    else:
-                        # Update article_date to modified date if it exists and is valid
-                        article_date = data['dateModified']
-                    
-                if changed:
-                    schema_script.string = json.dumps(data, indent=2, ensure_ascii=False)
-            except:
-                pass
-        
-        # 3. Inject Visible Metadata (Time/Author) after H1
-        # Check if already exists
-        h1 = soup.find('h1')
-        meta_exists = False
-        if h1:
-            next_sibling = h1.find_next_sibling()
-            if next_sibling and next_sibling.name == 'div' and 'text-slate-500' in next_sibling.get('class', []):
-                # Simple heuristic: check if it looks like our metadata block
-                if next_sibling.find('time') or 'PokepayGuide' in next_sibling.get_text():
-                    meta_exists = True
-        
-        if h1 and not meta_exists:
-            # Create metadata block
-            meta_div = soup.new_tag('div', **{'class': 'flex items-center gap-4 text-sm text-slate-500 mb-8 font-medium'})
-            
-            # Author badge
-            author_div = soup.new_tag('div', **{'class': 'flex items-center gap-2'})
-            author_span = soup.new_tag('span', **{'class': 'bg-emerald-50 text-emerald-600 px-2 py-0.5 rounded text-xs font-bold'})
-            author_span.string = article_author
-            author_div.append(author_span)
-            meta_div.append(author_div)
-            
-            # Dot separator
-            dot = soup.new_tag('div', **{'class': 'w-1 h-1 rounded-full bg-slate-300'})
-            meta_div.append(dot)
-            
-            # Time
-            time_tag = soup.new_tag('time', datetime=article_date)
-            # Format date to YYYY年MM月DD日 if possible
-            try:
-                dt = datetime.strptime(article_date, '%Y-%m-%d')
-                time_str = dt.strftime('%Y年%m月%d日')
-            except:
-                time_str = article_date
-            time_tag.string = time_str
-            meta_div.append(time_tag)
-            
-            h1.insert_after(meta_div)
-            changed = True
 
-        if changed:
+        doc = Document(os.path.join(articles_dir, filename))
+        if fix_article_soup(doc.parse()):
             print(f"Fixed metadata/title for {filename}")
-            write_file(file_path, str(soup))
+            write_file(doc.path, str(doc.soup))
 
-def update_homepage_articles(articles_data):
+def update_homepage_articles(articles_data, root=None):
     """
     Updates the 'Latest Guides' section in index.html with the top 3 latest articles.
+    root: tree holding the built index.html (defaults to PROJECT_ROOT).
     """
     print("Updating homepage articles...")
-    index_path = os.path.join(PROJECT_ROOT, 'index.html')
+    index_path = os.path.join(root or PROJECT_ROOT, 'index.html')
     if not os.path.exists(index_path):
         return
 
@@ -1043,311 +1405,652 @@ def update_homepage_articles(articles_data):
         '''
         grid_container.append(BeautifulSoup(card_html, 'html.parser'))
 
-    write_file(index_path, str(soup))
+    write_file(index_path, finalize_html(str(collapse_blank_lines(soup))))
 
-def generate_articles_index():
-    """
-    Generates the articles aggregation page (articles/index.html) with:
-    1. Pagination (if needed)
-    2. Classification (Tabs)
-    3. Auto-populated list of articles sorted by date
-    """
-    articles_index_path = os.path.join(PROJECT_ROOT, 'articles', 'index.html')
-    if not os.path.exists(articles_index_path):
-        print(f"Warning: Articles index not found at {articles_index_path}")
-        return
-        
-    print("Generating articles/index.html...")
-    content = read_file(articles_index_path)
-    try:
-        soup = BeautifulSoup(content, 'lxml')
-    except:
-        soup = BeautifulSoup(content, 'html.parser')
+def get_category_slug(category):
+    """URL slug of a category: CATEGORY_SLUGS, else its ASCII words, else a short hash."""
+    if category in CATEGORY_SLUGS:
+        return CATEGORY_SLUGS[category]
+    slug = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-')
+    return slug or 'c-' + hashlib.md5(category.encode('utf-8')).hexdigest()[:8]
 
-    # 1. Gather all articles metadata
-    articles_data = []
-    articles_dir = os.path.join(PROJECT_ROOT, 'articles')
+def get_listing_location(slug, page):
+    """(path relative to the site root, clean URL) of one listing page."""
+    base = f'articles/category/{slug}' if slug else 'articles'
+    if page == 1:
+        return f'{base}/index.html', f'/{base}/'
+    return f'{base}/page/{page}.html', f'/{base}/page/{page}'
+
+def render_article_card(art):
+    cat_display = html_lib.escape(art['category'])
     
-    for filename in os.listdir(articles_dir):
-        if not filename.endswith('.html') or filename == 'index.html':
+    # Category styling map
+    cat_color = "bg-slate-100 text-slate-600"
+    if "新手" in cat_display: cat_color = "bg-emerald-50 text-emerald-700"
+    elif "充值" in cat_display: cat_color = "bg-blue-50 text-blue-700"
+    elif "高阶" in cat_display: cat_color = "bg-purple-50 text-purple-700"
+    elif "故障" in cat_display: cat_color = "bg-red-50 text-red-700"
+    elif "评测" in cat_display: cat_color = "bg-orange-50 text-orange-700"
+    
+    return f'''
+            <article class="h-full article-item">
+                <a href="{art['url']}" class="block bg-white p-6 rounded-2xl border border-slate-200 transition article-card group hover:shadow-lg hover:-translate-y-1">
+                    <div class="flex items-center justify-between mb-4">
+                        <span class="px-2 py-1 {cat_color} text-xs font-bold rounded flex items-center gap-1">
+                            {cat_display}
+                        </span>
+                        <span class="text-xs text-slate-400 font-mono">{art['date'].replace('-', '.')}</span>
+                    </div>
+                    <h3 class="text-xl font-bold text-slate-900 mb-2 group-hover:text-emerald-600 transition line-clamp-2">{html_lib.escape(art['title'])}</h3>
+                    <p class="text-sm text-slate-500 line-clamp-2 leading-relaxed">{html_lib.escape(art['desc'])}</p>
+                </a>
+            </article>
+            '''
+
+def render_listing_tabs(categories, active):
+    """Category tabs as plain links (categories: [(name, slug)], active: slug or None)."""
+    tabs = [('全部', None)] + categories
+    links = []
+    for name, slug in tabs:
+        url = get_listing_location(slug, 1)[1]
+        if slug == active:
+            links.append(f'<a href="{url}" aria-current="page" class="px-4 py-2 rounded-full bg-slate-900 text-white text-sm font-bold transition hover:opacity-90">{html_lib.escape(name)}</a>')
+        else:
+            links.append(f'<a href="{url}" class="px-4 py-2 rounded-full bg-white border border-slate-200 text-slate-600 text-sm font-bold transition hover:border-emerald-500 hover:text-emerald-600">{html_lib.escape(name)}</a>')
+    return f'''
+        <nav id="article-filters" aria-label="文章分类" class="flex flex-wrap justify-center gap-2 mb-10">
+            {''.join(links)}
+        </nav>
+        '''
+
+def render_listing_pagination(slug, page, total_pages):
+    """Prev / page numbers / next as plain links."""
+    idle = 'px-3 py-1 rounded border'
+    disabled = f'{idle} text-slate-300 border-slate-100 cursor-not-allowed'
+    items = []
+    if page > 1:
+        items.append(f'<a href="{get_listing_location(slug, page - 1)[1]}" rel="prev" class="{idle} text-slate-600 border-slate-200 hover:border-emerald-500">←</a>')
+    else:
+        items.append(f'<span class="{disabled}">←</span>')
+    for n in range(1, total_pages + 1):
+        if n == page:
+            items.append(f'<span aria-current="page" class="{idle} font-bold bg-emerald-600 text-white border-emerald-600">{n}</span>')
+        else:
+            items.append(f'<a href="{get_listing_location(slug, n)[1]}" class="{idle} font-bold bg-white text-slate-600 border-slate-200 hover:border-emerald-500">{n}</a>')
+    if page < total_pages:
+        items.append(f'<a href="{get_listing_location(slug, page + 1)[1]}" rel="next" class="{idle} text-slate-600 border-slate-200 hover:border-emerald-500">→</a>')
+    else:
+        items.append(f'<span class="{disabled}">→</span>')
+    return f'''
+        <nav id="article-pagination" aria-label="分页" class="mt-12 flex justify-center gap-2">
+            {''.join(items)}
+        </nav>
+        '''
+
+# Elements whose whitespace is content
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea', 'script', 'style'}
+
+def collapse_blank_lines(soup):
+    """
+    Merges whitespace-only text nodes left next to each other by removed tags
+    and drops the blank lines in them. Without this the newlines around the
+    nodes a listing page replaces pile up or drift from one build to the next.
+    """
+    for text in soup.find_all(string=True):
+        if type(text) is not NavigableString or text.strip() or text.parent is None:
             continue
-            
-        file_path = os.path.join(articles_dir, filename)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            f_content = f.read()
-            
-        # Parse minimal info
+        if text.parent.name in PRESERVE_WHITESPACE_TAGS or text.find_parent(['pre', 'textarea']):
+            continue
+        whitespace = str(text)
+        following = text.next_sibling
+        while type(following) is NavigableString and not following.strip():
+            whitespace += str(following)
+            following.extract()
+            following = text.next_sibling
+        collapsed = re.sub(r'\n\s*\n', '\n', whitespace)
+        if collapsed != str(text):
+            text.replace_with(collapsed)
+    return soup
+
+def get_listing_template(soup):
+    """
+    Strips everything a listing page fills in from the articles index, leaving the
+    shared shell. The result is the same whichever listing page it was taken from,
+    so its hash tells whether the layout around the lists changed.
+    """
+    for tag in soup.find_all(['div', 'nav'], id=['article-filters', 'article-pagination', 'article-search']):
+        tag.decompose()
+    # Client-side tabs/pagination from older builds, search widget script
+    for script in soup.find_all('script', id=['articles-logic', 'search-logic']):
+        script.decompose()
+    if soup.head:
+        for link in soup.head.find_all('link', rel=['prev', 'next']):
+            link.decompose()
+
+    grid_container = soup.find('div', role='list')
+    if not grid_container:
+        # Try to find by class if role missing
+        grid_container = soup.find('div', class_='grid md:grid-cols-2 gap-6')
+    if grid_container:
+        grid_container.clear()
+
+    header_p = soup.find('header', class_='text-center mb-16')
+    if header_p and header_p.find('p', class_='text-slate-500'):
+        header_p.find('p', class_='text-slate-500').string = ''
+
+    schema_script = soup.find('script', type='application/ld+json')
+    if schema_script:
         try:
-            f_soup = BeautifulSoup(f_content, 'html.parser')
+            data = json.loads(schema_script.string)
+            for item in data.get('@graph', []):
+                if item.get('@type') == 'CollectionPage' and 'mainEntity' in item:
+                    item['mainEntity']['numberOfItems'] = 0
+                    item['mainEntity']['itemListElement'] = []
+            schema_script.string = json.dumps(data, indent=2, ensure_ascii=False)
         except:
-            continue
-            
-        # Title
-        title_tag = f_soup.find('h1')
-        raw_title = title_tag.get_text().strip() if title_tag else filename
-        # Clean title (remove leading numbers like "1. ", "2. ")
-        title = re.sub(r'^\d+\.?\s*', '', raw_title)
-        
-        # Desc
-        desc_tag = f_soup.find('meta', attrs={'name': 'description'})
-        desc = desc_tag['content'] if desc_tag else ""
-        
-        # Date
-        # Try dateModified first, then datePublished, then lastmod logic
-        date_str = "2026-01-01" # Default
-        date_mod = re.search(r'["\']dateModified["\']\s*:\s*["\'](\d{4}-\d{2}-\d{2})["\']', f_content)
-        date_pub = re.search(r'["\']datePublished["\']\s*:\s*["\'](\d{4}-\d{2}-\d{2})["\']', f_content)
-        if date_mod:
-            date_str = date_mod.group(1)
-        elif date_pub:
-            date_str = date_pub.group(1)
-            
-        # Category
-        cat_tag = f_soup.find('meta', attrs={'name': 'category'})
-        category = cat_tag['content'] if cat_tag else "其他"
-        
-        # URL
-        url = "/articles/" + filename.replace('.html', '')
-        
-        articles_data.append({
-            'title': title,
-            'desc': desc,
-            'date': date_str,
-            'category': category,
-            'url': url
-        })
-        
-    # Sort by date desc
-    articles_data.sort(key=lambda x: x['date'], reverse=True)
-    
-    # 2. Update Homepage Articles (Top 3)
-    update_homepage_articles(articles_data)
-    
-    # 2.1 Update Header Count
+            pass
+    return soup
+
+def prune_walk_dirs(root, dirs, excluded):
+    """os.walk pruning: excluded names anywhere, generated directories by path."""
+    rel_root = os.path.relpath(root, PROJECT_ROOT).replace('\\', '/')
+    dirs[:] = [d for d in dirs if d not in excluded
+               and (d if rel_root == '.' else f'{rel_root}/{d}') not in GENERATED_DIRS]
+
+def render_listing_page(template, articles, collection, page, total_pages, categories, total_count, offset):
+    """
+    Fills one listing page into a copy of the template.
+    collection: (category name, slug), both None for the all-articles list.
+    """
+    soup = copy.copy(template)
+    name, slug = collection
+    url = get_listing_location(slug, page)[1]
+    absolute_url = DOMAIN + url
+
+    # Head: unique title, self-referencing canonical/hreflang/og:url, prev/next
+    title_tag = soup.find('title')
+    if title_tag and title_tag.string:
+        title = title_tag.string
+        if name:
+            title = f"{name}｜{title}"
+        if page > 1:
+            title = f"第{page}页｜{title}"
+        title_tag.string = title
+    for link in soup.find_all('link', rel=['canonical', 'alternate']):
+        if link.get('hreflang') or 'canonical' in link.get('rel', []):
+            link['href'] = absolute_url
+    og_url = soup.find('meta', property='og:url')
+    if og_url:
+        og_url['content'] = absolute_url
+    canonical = soup.find('link', rel='canonical')
+    if canonical:
+        for rel, target in (('next', page + 1), ('prev', page - 1)):
+            if 1 <= target <= total_pages:
+                canonical.insert_after(soup.new_tag('link', rel=rel, href=DOMAIN + get_listing_location(slug, target)[1]))
+                canonical.insert_after('\n')
+
+    # Header Count
     header_p = soup.find('header', class_='text-center mb-16')
     if header_p:
         p_tag = header_p.find('p', class_='text-slate-500')
         if p_tag:
-            p_tag.string = f"共收录 {len(articles_data)} 篇实战文章，助你玩转全球支付"
+            if name:
+                p_tag.string = f"「{name}」共 {len(articles)} 篇实战文章"
+            else:
+                p_tag.string = f"共收录 {total_count} 篇实战文章，助你玩转全球支付"
 
-    # 2.2 Update JSON-LD List
+    # JSON-LD: only this page's slice of the list
     schema_script = soup.find('script', type='application/ld+json')
     if schema_script:
         try:
             data = json.loads(schema_script.string)
-            # Find CollectionPage or ItemList
             graph = data.get('@graph', [])
             for item in graph:
-                if item.get('@type') == 'CollectionPage' and 'mainEntity' in item:
-                    item_list = item['mainEntity']
-                    item_list['numberOfItems'] = len(articles_data)
-                    
-                    new_items = []
-                    for i, art in enumerate(articles_data):
-                        new_items.append({
+                if item.get('@type') == 'CollectionPage':
+                    item['url'] = absolute_url
+                    if 'mainEntity' in item:
+                        item_list = item['mainEntity']
+                        item_list['numberOfItems'] = len(articles)
+                        item_list['itemListElement'] = [{
                             "@type": "ListItem",
-                            "position": i + 1,
+                            "position": offset + i + 1,
                             "url": DOMAIN + art['url'],
                             "name": art['title']
-                        })
-                    item_list['itemListElement'] = new_items
-                    break
-            
+                        } for i, art in enumerate(articles)]
+                elif item.get('@type') == 'BreadcrumbList' and name:
+                    crumbs = item.get('itemListElement', [])
+                    crumbs.append({
+                        "@type": "ListItem",
+                        "position": len(crumbs) + 1,
+                        "name": name,
+                        "item": DOMAIN + get_listing_location(slug, 1)[1]
+                    })
             schema_script.string = json.dumps(data, indent=2, ensure_ascii=False)
         except:
             pass
 
-    # 3. Build HTML Grid
-    # Find container
-    grid_container = soup.find('div', role='list')
-    if not grid_container:
-        # Try to find by class if role missing
-        grid_container = soup.find('div', class_='grid md:grid-cols-2 gap-6')
-        
+    # Tabs, Grid, Pagination
+    grid_container = soup.find('div', role='list') or soup.find('div', class_='grid md:grid-cols-2 gap-6')
     if grid_container:
-        grid_container.clear()
-        
-        for art in articles_data:
-            cat_display = art['category']
-            
-            # Category styling map
-            cat_color = "bg-slate-100 text-slate-600"
-            if "新手" in cat_display: cat_color = "bg-emerald-50 text-emerald-700"
-            elif "充值" in cat_display: cat_color = "bg-blue-50 text-blue-700"
-            elif "高阶" in cat_display: cat_color = "bg-purple-50 text-purple-700"
-            elif "故障" in cat_display: cat_color = "bg-red-50 text-red-700"
-            elif "评测" in cat_display: cat_color = "bg-orange-50 text-orange-700"
-            
-            card_html = f'''
-            <article class="h-full article-item" data-category="{cat_display}">
-                <a href="{art['url']}" class="block bg-white p-6 rounded-2xl border border-slate-200 transition article-card group hover:shadow-lg hover:-translate-y-1">
-                    <div class="flex items-center justify-between mb-4">
-                        <span class="px-2 py-1 {cat_color} text-xs font-bold rounded flex items-center gap-1">
-                            {cat_display}
-                        </span>
-                        <span class="text-xs text-slate-400 font-mono">{art['date'].replace('-', '.')}</span>
-                    </div>
-                    <h3 class="text-xl font-bold text-slate-900 mb-2 group-hover:text-emerald-600 transition line-clamp-2">{art['title']}</h3>
-                    <p class="text-sm text-slate-500 line-clamp-2 leading-relaxed">{art['desc']}</p>
-                </a>
-            </article>
-            '''
-            grid_container.append(BeautifulSoup(card_html, 'html.parser'))
-            
-    # 3. Add Filter Tabs (Insert before grid)
-    # Check if already exists
-    filter_container = soup.find('div', id='article-filters')
-    if not filter_container:
-        # Collect all unique categories
-        all_cats = sorted(list(set(d['category'] for d in articles_data)))
+        for art in articles:
+            grid_container.append(BeautifulSoup(render_article_card(art), 'html.parser'))
+        if not slug and page == 1:
+            # Search box on /articles/ (index built by generate_search_index)
+            widget_html, widget_script = render_search_widget()
+            grid_container.insert_before(BeautifulSoup(widget_html.strip(), 'html.parser'))
+            if soup.body:
+                script = soup.new_tag('script', id='search-logic')
+                script.string = widget_script
+                soup.body.append(script)
+        grid_container.insert_before(BeautifulSoup(render_listing_tabs(categories, slug).strip(), 'html.parser'))
+        if total_pages > 1:
+            grid_container.insert_after(BeautifulSoup(render_listing_pagination(slug, page, total_pages).strip(), 'html.parser'))
+
+    return str(collapse_blank_lines(soup))
+
+def generate_articles_index(articles_data=None, root=None, digests=None, previous_root=None):
+    """
+    Generates the static article listings from the articles index template (articles/index.html):
+    1. All articles by date: /articles/, /articles/page/N
+    2. One list per category: /articles/category/<slug>/, /articles/category/<slug>/page/N
+    Every page holds LISTING_PAGE_SIZE articles, links its neighbours (rel=prev/next)
+    and lists only its own slice in the JSON-LD.
+    articles_data: metadata dicts as returned by extract_article_meta.
+    If omitted, every article is parsed from disk.
+    root: tree holding the built articles/index.html (defaults to PROJECT_ROOT).
+    digests: {rel_path: digest} returned by the previous call. Pages whose digest is
+    unchanged are kept (copied from previous_root, when given); pages that no longer
+    exist are removed. Returns the new digests.
+    """
+    root = root or PROJECT_ROOT
+    digests = digests or {}
+    articles_index_path = os.path.join(root, 'articles', 'index.html')
+    if not os.path.exists(articles_index_path):
+        print(f"Warning: Articles index not found at {articles_index_path}")
+        return digests
         
-        tabs_html = f'''
-        <div id="article-filters" class="flex flex-wrap justify-center gap-2 mb-10">
-            <button class="filter-btn active px-4 py-2 rounded-full bg-slate-900 text-white text-sm font-bold transition hover:opacity-90" data-filter="all">全部</button>
-            {''.join([f'<button class="filter-btn px-4 py-2 rounded-full bg-white border border-slate-200 text-slate-600 text-sm font-bold transition hover:border-emerald-500 hover:text-emerald-600" data-filter="{c}">{c}</button>' for c in all_cats])}
-        </div>
-        '''
+    print("Generating articles/index.html...")
+    content = read_file(articles_index_path)
+    try:
+        soup = BeautifulSoup(content, 'lxml')
+    except:
+        soup = BeautifulSoup(content, 'html.parser')
+    template = get_listing_template(soup)
+    # Whitespace left around the removed parts differs between the source page and a generated one
+    template_hash = hash_content(re.sub(r'\s+', ' ', str(template)))
+
+    # 1. Gather all articles metadata
+    # run_build passes the metadata it extracted while building each article
+    if articles_data is None:
+        articles_data = collect_articles_data()
+    else:
+        articles_data = list(articles_data)
         
-        # Insert before grid
-        if grid_container:
-            grid_container.insert_before(BeautifulSoup(tabs_html, 'html.parser'))
-            
-    # 4. Add Pagination Controls (Insert after grid)
-    pagination_container = soup.find('div', id='article-pagination')
-    if not pagination_container:
-        pag_html = f'''
-        <div id="article-pagination" class="mt-12 flex justify-center gap-2">
-            <!-- JS will populate this -->
-        </div>
-        '''
-        if grid_container:
-            grid_container.insert_after(BeautifulSoup(pag_html, 'html.parser'))
-
-    # 5. Inject JS logic
-    script_id = "articles-logic"
-    existing_script = soup.find('script', id=script_id)
-    if not existing_script:
-        js_code = '''
-        <script id="articles-logic">
-        document.addEventListener('DOMContentLoaded', () => {
-            const items = document.querySelectorAll('.article-item');
-            const filters = document.querySelectorAll('.filter-btn');
-            const paginationContainer = document.getElementById('article-pagination');
-            const itemsPerPage = 6; // Pagination limit
-            let currentPage = 1;
-            let currentFilter = 'all';
-            let visibleItems = [];
-
-            function filterItems(category) {
-                currentFilter = category;
-                visibleItems = [];
-                items.forEach(item => {
-                    const itemCat = item.getAttribute('data-category');
-                    if (category === 'all' || itemCat === category) {
-                        item.style.display = 'none'; // Hide initially, show by pagination
-                        visibleItems.push(item);
-                    } else {
-                        item.style.display = 'none';
-                    }
-                });
-                currentPage = 1;
-                renderPagination();
-                showPage(1);
-            }
-
-            function showPage(page) {
-                currentPage = page;
-                const start = (page - 1) * itemsPerPage;
-                const end = start + itemsPerPage;
-                
-                // Hide all first (already done in filter, but ensure)
-                items.forEach(i => i.style.display = 'none');
-                
-                // Show current page items
-                visibleItems.slice(start, end).forEach(item => {
-                    item.style.display = 'block';
-                    // Add fade-in animation
-                    item.style.opacity = '0';
-                    item.style.transform = 'translateY(10px)';
-                    setTimeout(() => {
-                        item.style.transition = 'all 0.3s ease';
-                        item.style.opacity = '1';
-                        item.style.transform = 'translateY(0)';
-                    }, 50);
-                });
-                
-                renderPagination();
-                
-                // Scroll to top of list if needed
-                // const listTop = document.querySelector('#article-filters').offsetTop;
-                // window.scrollTo({top: listTop - 100, behavior: 'smooth'});
-            }
-
-            function renderPagination() {
-                paginationContainer.innerHTML = '';
-                const totalPages = Math.ceil(visibleItems.length / itemsPerPage);
-                
-                if (totalPages <= 1) return;
-
-                // Prev
-                const prevBtn = document.createElement('button');
-                prevBtn.className = `px-3 py-1 rounded border ${currentPage === 1 ? 'text-slate-300 border-slate-100 cursor-not-allowed' : 'text-slate-600 border-slate-200 hover:border-emerald-500'}`;
-                prevBtn.innerHTML = '←';
-                prevBtn.disabled = currentPage === 1;
-                prevBtn.onclick = () => showPage(currentPage - 1);
-                paginationContainer.appendChild(prevBtn);
-
-                // Pages
-                for (let i = 1; i <= totalPages; i++) {
-                    const btn = document.createElement('button');
-                    btn.className = `px-3 py-1 rounded border font-bold ${currentPage === i ? 'bg-emerald-600 text-white border-emerald-600' : 'bg-white text-slate-600 border-slate-200 hover:border-emerald-500'}`;
-                    btn.innerText = i;
-                    btn.onclick = () => showPage(i);
-                    paginationContainer.appendChild(btn);
-                }
-
-                // Next
-                const nextBtn = document.createElement('button');
-                nextBtn.className = `px-3 py-1 rounded border ${currentPage === totalPages ? 'text-slate-300 border-slate-100 cursor-not-allowed' : 'text-slate-600 border-slate-200 hover:border-emerald-500'}`;
-                nextBtn.innerHTML = '→';
-                nextBtn.disabled = currentPage === totalPages;
-                nextBtn.onclick = () => showPage(currentPage + 1);
-                paginationContainer.appendChild(nextBtn);
-            }
-
-            // Init Filters
-            filters.forEach(btn => {
-                btn.addEventListener('click', () => {
-                    filters.forEach(b => {
-                        b.classList.remove('bg-slate-900', 'text-white');
-                        b.classList.add('bg-white', 'text-slate-600');
-                    });
-                    btn.classList.remove('bg-white', 'text-slate-600');
-                    btn.classList.add('bg-slate-900', 'text-white');
-                    filterItems(btn.getAttribute('data-filter'));
-                });
-            });
-
-            // Initial Load
-            filterItems('all');
-        });
-        </script>
-        '''
-        if soup.body:
-            soup.body.append(BeautifulSoup(js_code, 'html.parser'))
+    # Sort by date desc (URL keeps equal dates in a stable order)
+    articles_data.sort(key=lambda x: (x['date'], x['url']), reverse=True)
+    
+    # 2. Update Homepage Articles (Top 3)
+    update_homepage_articles(articles_data, root=root)
+
+    # 3. Collections: all articles, then one per category
+    by_category = {}
+    for art in articles_data:
+        by_category.setdefault(art['category'], []).append(art)
+    categories = [(name, get_category_slug(name)) for name in sorted(by_category)]
+    collections = [((None, None), articles_data)] + [((name, slug), by_category[name]) for name, slug in categories]
+
+    # 4. Render the pages whose slice (or the shared template) changed
+    new_digests = {}
+    rendered = kept = 0
+    for collection, items in collections:
+        total_pages = max(1, -(-len(items) // LISTING_PAGE_SIZE))
+        for page in range(1, total_pages + 1):
+            offset = (page - 1) * LISTING_PAGE_SIZE
+            page_items = items[offset:offset + LISTING_PAGE_SIZE]
+            rel_path, _ = get_listing_location(collection[1], page)
+            digest = hash_content(json.dumps([template_hash, collection, page, total_pages, categories,
+                                              len(articles_data), page_items], ensure_ascii=False, sort_keys=True))
+            new_digests[rel_path] = digest
+            target = os.path.join(root, rel_path)
+
+            # articles/index.html is rebuilt as a plain page first, so it is always filled in
+            if rel_path != 'articles/index.html' and digests.get(rel_path) == digest:
+                previous = os.path.join(previous_root or root, rel_path)
+                if os.path.exists(previous):
+                    if previous != target:
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        shutil.copy2(previous, target)
+                    kept += 1
+                    continue
 
-    write_file(articles_index_path, str(soup))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            write_file(target, finalize_html(render_listing_page(template, page_items, collection, page, total_pages,
+                                                                 categories, len(articles_data), offset)))
+            rendered += 1
+
+    # 5. Remove pages of lists that got shorter or categories that disappeared
+    removed = 0
+    for rel_path in set(digests) - set(new_digests):
+        stale_path = os.path.join(root, rel_path)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+            removed += 1
+            try:
+                # Drop the directories it leaves empty (stops at the first non-empty one)
+                os.removedirs(os.path.dirname(stale_path))
+            except OSError:
+                pass
 
-def run_build():
-    print("Starting build process...")
+    print(f"Listing pages: {rendered} generated, {kept} unchanged, {removed} removed.")
+    return new_digests
+
+def generate_search_index(articles_data, features, root=None, docs=None):
+    """
+    Writes the client-side search index (see search_index.py) under root/SEARCH_DIR.
+    articles_data: listing metadata dicts, as for generate_articles_index.
+    features: {path: article_features()} from the recommendations stage.
+    docs: {path: Document} already read this build; other articles are read again
+    (the manifest only keeps a digest of their tokens).
+    Shards left over from a larger index are removed.
+    """
+    root = root or PROJECT_ROOT
+    docs = docs or {}
+    search_dir = os.path.join(root, SEARCH_DIR)
+    tokens = {f['url']: article_tokens(docs[path].content if path in docs else read_file(path))
+              for path, f in features.items()}
+    files = build_search_index(articles_data, tokens)
+    os.makedirs(search_dir, exist_ok=True)
+    for name, content in files.items():
+        write_file(os.path.join(search_dir, name), content)
+    for name in os.listdir(search_dir):
+        if name.endswith('.json') and name not in files:
+            os.remove(os.path.join(search_dir, name))
+    total = sum(len(content.encode('utf-8')) for content in files.values())
+    print(f"Search index: {len(articles_data)} articles, {len(files)} files ({total / 1024:.1f} KB).")
+
+def generate_stylesheet(classes, plugins, previous, root=None):
+    """
+    Compiles the Tailwind stylesheet for the classes in use (see tailwind_css.py),
+    unless the previous one was compiled from the same config, plugins and
+    classes and is still in root.
+    plugins: plugins the pages load from the CDN (?plugins=typography).
+    previous: the manifest's "tailwind" entry from the last build.
+    Returns the new entry; its href is None while no stylesheet could be built.
+    """
+    root = root or PROJECT_ROOT
+    config = find_tailwind_config(read_file(MASTER_LAYOUT_PATH))
+    key = get_stylesheet_key(config, classes, plugins)
+    href = previous.get('href')
+    if href and not os.path.exists(os.path.join(root, href.lstrip('/'))):
+        href = None
+    if href and previous.get('key') == key:
+        print("Tailwind classes unchanged, keeping the stylesheet.")
+        return {'key': key, 'href': href, 'classes': sorted(classes), 'plugins': sorted(plugins)}
+
+    # Without a fresh compile the key stays unset, so the next build tries again
+    entry = {'key': None, 'href': href, 'classes': sorted(classes), 'plugins': sorted(plugins)}
+    cli = find_tailwind_cli(PROJECT_ROOT)
+    if not cli:
+        print("Warning: Tailwind CLI not found (install tailwindcss or set TAILWINDCSS), keeping the current stylesheet.")
+        return entry
+    print(f"Compiling Tailwind stylesheet ({len(classes)} classes, plugins: {', '.join(sorted(plugins)) or 'none'})...")
+    try:
+        css = compile_stylesheet(cli, config, classes, plugins, project_root=PROJECT_ROOT)
+    except RuntimeError as e:
+        print(f"Warning: Tailwind CLI failed, keeping the current stylesheet: {e}")
+        return entry
+    # A plugin the CLI silently left out would unstyle every page relying on it
+    missing = missing_plugin_rules(css, plugins, classes)
+    if missing:
+        print(f"Warning: Tailwind stylesheet lacks the rules of plugin(s) {', '.join(missing)}, keeping the current stylesheet.")
+        return entry
+
+    href = get_stylesheet_href(css)
+    css_path = os.path.join(root, href.lstrip('/'))
+    os.makedirs(os.path.dirname(css_path), exist_ok=True)
+    write_file(css_path, css)
+    # Older builds of the stylesheet
+    for name in os.listdir(os.path.dirname(css_path)):
+        if name.startswith('tailwind.') and name.endswith('.css') and name != os.path.basename(css_path):
+            os.remove(os.path.join(os.path.dirname(css_path), name))
+    print(f"Tailwind stylesheet: {href} ({len(css.encode('utf-8')) / 1024:.1f} KB)")
+    return {'key': key, 'href': href, 'classes': sorted(classes), 'plugins': sorted(plugins)}
+
+def build_page(doc, master, timings=None):
+    """
+    Runs the per-page pipeline on one Document, syncing layout from master (a FragmentCache).
+    Returns (output_html, article_meta); article_meta is None for non-article pages.
+    Pages are independent of each other once the master components are extracted.
+    timings: optional dict that receives per-step timings (see build_profiler.PageClock).
+    """
+    clock = PageClock(timings)
+    file_path = doc.path
+    # Backend is html.parser unless configured otherwise (see set_parser_backend)
+    soup = doc.parse()
+    clock.mark('parse')
+
+    # --- 0. Check and Fix Articles Metadata ---
+    # A missing datePublished comes from the source file's date, not today: --out
+    # builds never write it back, so every rebuild would otherwise stamp a new one.
+    if doc.is_article:
+        schema_script = soup.find('script', type='application/ld+json')
+        undated = schema_script is not None and 'datePublished' not in (schema_script.string or '')
+        if fix_article_soup(soup, published=get_file_date(file_path)):
+            print(f"Fixed metadata/title for {os.path.basename(file_path)}")
+            if undated:
+                print(f"Warning: {os.path.basename(file_path)} has no datePublished, using its file date. Add one to the source.")
+    clock.mark('check_and_fix')
     
-    # 0. Check and Fix Articles Metadata
-    check_and_fix_articles()
+    # --- A. Clean URLs & Absolute Paths ---
+    process_links_in_soup(soup, file_path)
+    clock.mark('process_links')
+
+    # --- A1. Responsive Images ---
+    inject_responsive_images(soup, file_path)
+    clock.mark('responsive_images')
+
+    # --- B. Layout Sync ---
+    # 1. Sync Header
+    if master.header and 'SEO_Dashboard.html' not in file_path:
+        # Try to find existing header to replace
+        target_header = soup.select_one('header.fixed.top-0')
+        if not target_header:
+            # Fallback: try finding ANY header
+            target_header = soup.find('header')
+        
+        if target_header:
+            # Check if it is INSIDE main (which implies it's a page title header, not site header)
+            # But our site header is usually fixed top-0.
+            if 'fixed' in target_header.get('class', []) and 'top-0' in target_header.get('class', []):
+                 # Safe to replace
+                 new_header = master.clone('header')
+                 target_header.replace_with(new_header)
+            else:
+                 # If the found header is NOT the fixed top nav, we might need to inject the nav BEFORE it
+                 # Or check if there is a separate <nav class="fixed top-0">
+                 target_nav = soup.find('nav', class_='fixed top-0')
+                 if target_nav:
+                     # This is likely the "old" header masquerading as nav
+                     new_header = master.clone('header')
+                     target_nav.replace_with(new_header)
+                 else:
+                     # Insert at top of body
+                     if soup.body:
+                         new_header = master.clone('header')
+                         soup.body.insert(0, new_header)
+        else:
+            # No header found, check for nav acting as header
+            target_nav = soup.find('nav', class_='fixed top-0')
+            if target_nav:
+                 new_header = master.clone('header')
+                 target_nav.replace_with(new_header)
+            elif soup.body:
+                 new_header = master.clone('header')
+                 soup.body.insert(0, new_header)
+
+    # Cleanup: Remove duplicate fixed headers/navs if any
+    # Find all fixed top-0 elements
+    fixed_tops = soup.find_all(lambda tag: tag.has_attr('class') and 'fixed' in tag['class'] and 'top-0' in tag['class'])
+    if len(fixed_tops) > 1:
+        # Keep the first one (which should be the one we just injected/replaced at the top), remove others
+        # But wait, make sure we don't remove something else.
+        # Usually we only want one site header.
+        for i in range(1, len(fixed_tops)):
+            fixed_tops[i].decompose()
+
+    # 2. Sync Footer
+    if master.footer and 'SEO_Dashboard.html' not in file_path:
+        target_footer = soup.find('footer')
+        if target_footer:
+            new_footer = master.clone('footer')
+            target_footer.replace_with(new_footer)
+        else:
+            # Append to body
+            if soup.body:
+                new_footer = master.clone('footer')
+                soup.body.append(new_footer)
+
+    # 3. Sync Mobile Nav
+    if master.mobile_nav and 'SEO_Dashboard.html' not in file_path:
+        # Look for existing mobile nav
+        # It usually has aria-label="Mobile Navigation" OR class="fixed bottom-0"
+        target_mobile_nav = soup.find('nav', attrs={'aria-label': 'Mobile Navigation'})
+        if not target_mobile_nav:
+            # Try finding by class
+            target_mobile_nav = soup.find(lambda tag: tag.name in ['nav', 'div'] and tag.has_attr('class') and 'fixed' in tag['class'] and 'bottom-0' in tag['class'] and 'z-50' in tag['class'])
+        
+        new_mobile_nav = master.clone('mobile_nav')
+        
+        if target_mobile_nav:
+            target_mobile_nav.replace_with(new_mobile_nav)
+        else:
+            # Append to body (before script tags)
+            if soup.body:
+                scripts = soup.body.find_all('script')
+                if scripts:
+                    scripts[0].insert_before(new_mobile_nav)
+                else:
+                    soup.body.append(new_mobile_nav)
+    clock.mark('layout_sync')
+
+    # --- C. Head Reorganization ---
+    clean_path = get_clean_url(file_path)
+    reorganize_head(soup, file_path, clean_path)
+    clock.mark('reorganize_head')
     
-    # 1. Load Master Layout & Prepare Header/Footer/MobileNav
+    # --- C0. Ensure Layout (Body Padding) ---
+    ensure_body_padding(soup)
+
+    # --- C1. Inject Sidebar ---
+    inject_sidebar(soup, file_path)
+    clock.mark('inject_sidebar')
+
+    # --- C2. Breadcrumbs ---
+    if 'SEO_Dashboard.html' not in file_path:
+        inject_breadcrumb(soup, file_path)
+    clock.mark('inject_breadcrumb')
+
+    # --- D. Recommended Reading ---
+    inject_recommended_reading(soup, file_path)
+    clock.mark('inject_recommended_reading')
+
+    # --- E. Fingerprinted Asset URLs (after every step that adds markup) ---
+    fingerprint_assets_in_soup(soup, file_path)
+    clock.mark('fingerprint_assets')
+
+    # --- F. Audit Facts (the audit reads the final DOM instead of parsing the file again) ---
+    if AUDIT_PAGES:
+        from audit import extract_page_facts
+        doc.facts = extract_page_facts(soup)
+        clock.mark('audit_facts')
+
+    if clock.enabled:
+        clock.set('nodes', sum(1 for _ in soup.descendants))
+        clock.skip()
+
+    # --- Save ---
+    output_html = str(collapse_blank_lines(soup))
+    if not output_html.startswith('<!DOCTYPE html>'):
+         output_html = '<!DOCTYPE html>\n' + output_html
+    clock.mark('serialize')
+    output_html = finalize_html(output_html)
+    clock.mark('finalize')
+    clock.set('bytes', len(output_html.encode('utf-8')))
+
+    # --- Metadata for the articles index ---
+    if doc.is_article:
+        doc.meta = extract_article_meta(soup, output_html, file_path)
+        clock.mark('extract_meta')
+
+    return output_html, doc.meta
+
+class FragmentCache:
+    """
+    The master header, footer and mobile nav, parsed once per process.
+    Pages receive deep copies of the cached trees instead of re-parsing
+    the serialized fragment for every insertion.
+    """
+    TAG_NAMES = {'header': 'header', 'footer': 'footer', 'mobile_nav': 'nav'}
+
+    def __init__(self, header_html=None, footer_html=None, mobile_nav_html=None):
+        self.html = {'header': header_html, 'footer': footer_html, 'mobile_nav': mobile_nav_html}
+        self.header = self._parse('header')
+        self.footer = self._parse('footer')
+        self.mobile_nav = self._parse('mobile_nav')
+
+    @classmethod
+    def from_tags(cls, header, footer, mobile_nav):
+        return cls(*(str(tag) if tag else None for tag in (header, footer, mobile_nav)))
+
+    def _parse(self, name):
+        html = self.html[name]
+        if not html:
+            return None
+        return BeautifulSoup(html, 'html.parser').find(self.TAG_NAMES[name])
+
+    def clone(self, name):
+        """Returns a detached deep copy of a master component."""
+        fragment = getattr(self, name)
+        return copy.copy(fragment) if fragment is not None else None
+
+    def init_args(self):
+        return (self.html['header'], self.html['footer'], self.html['mobile_nav'])
+
+# Master components of the current worker process (see init_build_worker)
+_WORKER_MASTER = None
+
+_WORKER_PROFILE = False
+
+def init_build_worker(parser, route_table, recommendations, stylesheet, minify, images, image_formats, assets, audit,
+                      profile, header_html, footer_html, mobile_nav_html):
+    """Pool initializer: parse the master components once per worker process."""
+    global _WORKER_MASTER, _WORKER_PROFILE, PARSER_BACKEND
+    # A forked worker inherits the parent's memory tracing (see build_profiler.py)
+    tracemalloc.stop()
+    PARSER_BACKEND = parser
+    _WORKER_PROFILE = profile
+    set_route_table(route_table)
+    set_recommendations(recommendations)
+    set_stylesheet(stylesheet)
+    set_minify(minify)
+    set_images(images, image_formats)
+    set_assets(assets)
+    set_audit(audit)
+    _WORKER_MASTER = FragmentCache(header_html, footer_html, mobile_nav_html)
+
+def build_page_task(doc):
+    timings = {} if _WORKER_PROFILE else None
+    output_html, meta = build_page(doc, _WORKER_MASTER, timings)
+    return doc.path, output_html, meta, doc.facts, timings
+
+def load_master_layout():
+    """
+    Loads index.html and extracts the master header, footer and mobile nav.
+    Returns (header, footer, mobile_nav), or None if the master layout is missing.
+    """
     if not os.path.exists(MASTER_LAYOUT_PATH):
         print(f"Error: Master layout not found at {MASTER_LAYOUT_PATH}")
-        return
+        return None
 
     master_content = read_file(MASTER_LAYOUT_PATH)
     try:
@@ -1377,140 +2080,634 @@ def run_build():
     if not master_mobile_nav:
         print("Warning: Master mobile nav not found")
 
-    # 2. Traverse Files
+    return master_header, master_footer, master_mobile_nav
+
+def find_source_files(exclude_dirs=()):
+    """Lists the HTML pages the build processes."""
+    excluded = set(BUILD_EXCLUDE_DIRS) | set(exclude_dirs)
     files_to_process = []
     for root, dirs, files in os.walk(PROJECT_ROOT):
-        dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__']]
+        prune_walk_dirs(root, dirs, excluded)
         for file in files:
             if file.endswith('.html') and not file.startswith('_') and file != 'zujina.html' and 'google' not in file:
                 files_to_process.append(os.path.join(root, file))
+    return files_to_process
 
-    print(f"Found {len(files_to_process)} HTML files.")
-
+def verify_parser_backends(backend_a, backend_b, max_diff_lines=40):
+    """
+    Builds every page in memory with two parser backends and reports pages whose
+    output differs. Nothing is written. Returns the list of differing paths.
+    """
+    for backend in (backend_a, backend_b):
+        if set_parser_backend(backend) != backend:
+            print(f"Error: Cannot verify, backend '{backend}' is unavailable.")
+            return None
+
+    master_tags = load_master_layout()
+    if master_tags is None:
+        return None
+    master = FragmentCache.from_tags(*master_tags)
+
+    files_to_process = find_source_files()
+    set_route_table(build_route_table(files_to_process))
+    set_recommendations(build_recommendations(files_to_process)[0])
+    print(f"Verifying {backend_a} vs {backend_b} on {len(files_to_process)} HTML files...")
+    differing = []
     for file_path in files_to_process:
-        print(f"Processing {os.path.basename(file_path)}...")
+        rel_path = os.path.relpath(file_path, PROJECT_ROOT).replace('\\', '/')
         content = read_file(file_path)
-        # Always use html.parser for consistency and to avoid lxml/encoding issues
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # --- A. Clean URLs & Absolute Paths ---
-        process_links_in_soup(soup, file_path)
-
-        # --- B. Layout Sync ---
-        # 1. Sync Header
-        if master_header and 'SEO_Dashboard.html' not in file_path:
-            # Try to find existing header to replace
-            target_header = soup.select_one('header.fixed.top-0')
-            if not target_header:
-                # Fallback: try finding ANY header
-                target_header = soup.find('header')
-            
-            if target_header:
-                # Check if it is INSIDE main (which implies it's a page title header, not site header)
-                # But our site header is usually fixed top-0.
-                if 'fixed' in target_header.get('class', []) and 'top-0' in target_header.get('class', []):
-                     # Safe to replace
-                     new_header = BeautifulSoup(str(master_header), 'html.parser').find('header')
-                     target_header.replace_with(new_header)
-                else:
-                     # If the found header is NOT the fixed top nav, we might need to inject the nav BEFORE it
-                     # Or check if there is a separate <nav class="fixed top-0">
-                     target_nav = soup.find('nav', class_='fixed top-0')
-                     if target_nav:
-                         # This is likely the "old" header masquerading as nav
-                         new_header = BeautifulSoup(str(master_header), 'html.parser').find('header')
-                         target_nav.replace_with(new_header)
-                     else:
-                         # Insert at top of body
-                         if soup.body:
-                             new_header = BeautifulSoup(str(master_header), 'html.parser').find('header')
-                             soup.body.insert(0, new_header)
-            else:
-                # No header found, check for nav acting as header
-                target_nav = soup.find('nav', class_='fixed top-0')
-                if target_nav:
-                     new_header = BeautifulSoup(str(master_header), 'html.parser').find('header')
-                     target_nav.replace_with(new_header)
-                elif soup.body:
-                     new_header = BeautifulSoup(str(master_header), 'html.parser').find('header')
-                     soup.body.insert(0, new_header)
-
-        # Cleanup: Remove duplicate fixed headers/navs if any
-        # Find all fixed top-0 elements
-        fixed_tops = soup.find_all(lambda tag: tag.has_attr('class') and 'fixed' in tag['class'] and 'top-0' in tag['class'])
-        if len(fixed_tops) > 1:
-            # Keep the first one (which should be the one we just injected/replaced at the top), remove others
-            # But wait, make sure we don't remove something else.
-            # Usually we only want one site header.
-            for i in range(1, len(fixed_tops)):
-                fixed_tops[i].decompose()
-
-        # 2. Sync Footer
-        if master_footer and 'SEO_Dashboard.html' not in file_path:
-            target_footer = soup.find('footer')
-            if target_footer:
-                new_footer = BeautifulSoup(str(master_footer), 'html.parser').find('footer')
-                target_footer.replace_with(new_footer)
-            else:
-                # Append to body
-                if soup.body:
-                    new_footer = BeautifulSoup(str(master_footer), 'html.parser').find('footer')
-                    soup.body.append(new_footer)
-
-        # 3. Sync Mobile Nav
-        if master_mobile_nav and 'SEO_Dashboard.html' not in file_path:
-            # Look for existing mobile nav
-            # It usually has aria-label="Mobile Navigation" OR class="fixed bottom-0"
-            target_mobile_nav = soup.find('nav', attrs={'aria-label': 'Mobile Navigation'})
-            if not target_mobile_nav:
-                # Try finding by class
-                target_mobile_nav = soup.find(lambda tag: tag.name in ['nav', 'div'] and tag.has_attr('class') and 'fixed' in tag['class'] and 'bottom-0' in tag['class'] and 'z-50' in tag['class'])
-            
-            new_mobile_nav = BeautifulSoup(str(master_mobile_nav), 'html.parser').find('nav')
-            
-            if target_mobile_nav:
-                target_mobile_nav.replace_with(new_mobile_nav)
-            else:
-                # Append to body (before script tags)
-                if soup.body:
-                    scripts = soup.body.find_all('script')
-                    if scripts:
-                        scripts[0].insert_before(new_mobile_nav)
-                    else:
-                        soup.body.append(new_mobile_nav)
-
-        # --- C. Head Reorganization ---
-        clean_path = get_clean_url(file_path)
-        reorganize_head(soup, file_path, clean_path)
-        
-        # --- C0. Ensure Layout (Body Padding) ---
-        ensure_body_padding(soup)
+        outputs = []
+        for backend in (backend_a, backend_b):
+            set_parser_backend(backend)
+            output_html, _ = build_page(Document(file_path, content), master)
+            outputs.append(output_html)
+
+        if outputs[0] != outputs[1]:
+            differing.append(file_path)
+            diff = list(difflib.unified_diff(
+                outputs[0].splitlines(), outputs[1].splitlines(),
+                fromfile=f'{rel_path} ({backend_a})', tofile=f'{rel_path} ({backend_b})', lineterm=''))
+            print(f"\n[DIFF] {rel_path}: {len(diff)} diff lines")
+            for line in diff[:max_diff_lines]:
+                print(line)
+            if len(diff) > max_diff_lines:
+                print(f"... ({len(diff) - max_diff_lines} more lines)")
+
+    set_parser_backend(backend_a)
+    if differing:
+        print(f"\n{len(differing)}/{len(files_to_process)} pages differ between {backend_a} and {backend_b}.")
+    else:
+        print(f"\nAll {len(files_to_process)} pages are identical with {backend_a} and {backend_b}.")
+    return differing
 
-        # --- C1. Inject Sidebar ---
-        inject_sidebar(soup, file_path)
+def get_builds_dir(out_dir):
+    """Directory holding the immutable build trees that out_dir points to."""
+    out_dir = os.path.abspath(out_dir)
+    return os.path.join(os.path.dirname(out_dir), '.' + os.path.basename(out_dir) + '-builds')
 
-        # --- C2. Breadcrumbs ---
-        if 'SEO_Dashboard.html' not in file_path:
-            inject_breadcrumb(soup, file_path)
+def copy_static_files(dest_root, page_paths, exclude_dirs=()):
+    """
+    Copies everything that is not a processed page (assets, verification files,
+    _redirects, robots.txt...) into the output tree.
+    """
+    excluded = set(BUILD_EXCLUDE_DIRS) | set(exclude_dirs)
+    pages = set(page_paths)
+    copied = 0
+    for root, dirs, files in os.walk(PROJECT_ROOT):
+        prune_walk_dirs(root, dirs, excluded)
+        for file in files:
+            src = os.path.join(root, file)
+            if src in pages or file in STATIC_EXCLUDE_FILES or file.endswith(STATIC_EXCLUDE_EXTS):
+                continue
+            dest = os.path.join(dest_root, os.path.relpath(src, PROJECT_ROOT))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copy2(src, dest)
+            copied += 1
+    return copied
 
-        # --- D. Recommended Reading ---
-        inject_recommended_reading(soup, file_path)
+def publish_build(build_dir, out_dir):
+    """
+    Atomically swaps out_dir to the finished build.
+    out_dir is a symlink into the builds directory; a new link is created next to it
+    and renamed over it, so readers see either the old or the new tree, never a mix.
+    Once swapped, every other tree in the builds directory (the previous build,
+    leftovers of failed ones) is removed: only the published build is kept.
+    """
+    builds_dir = get_builds_dir(out_dir)
+    if os.path.isdir(out_dir) and not os.path.islink(out_dir):
+        # Migrate a plain directory from an older layout (one-off, not atomic)
+        os.replace(out_dir, os.path.join(builds_dir, 'legacy-' + datetime.now().strftime('%Y%m%d%H%M%S')))
+
+    tmp_link = out_dir + '.new'
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(build_dir, tmp_link)
+    os.replace(tmp_link, out_dir)
+
+    published = os.path.realpath(build_dir)
+    for name in os.listdir(builds_dir):
+        path = os.path.join(builds_dir, name)
+        if os.path.isdir(path) and os.path.realpath(path) != published:
+            shutil.rmtree(path, ignore_errors=True)
+    print(f"Published {build_dir} -> {out_dir}")
+
+def run_build(force=False, jobs=1, parser=None, out_dir=None, profile=None, changed=None, minify=False, audit=False):
+    """
+    Builds the site.
+    By default pages are rewritten in place. With out_dir, pages are read from
+    PROJECT_ROOT and the complete site is written to a fresh build tree that is
+    published to out_dir atomically once everything succeeded.
+    With profile (a file path), stage and per-page timings are written there as
+    a Chrome trace and summarized on the console.
+    changed: source paths known to have changed since the last build (watch mode).
+    Other pages in the manifest are trusted to be unchanged without being read.
+    minify: minify every page written (out_dir builds only, sources stay readable).
+    audit: run the SEO audit (audit.py) on the result, from the DOMs built in this pass.
+    Returns the set of files written into PROJECT_ROOT (in-place builds only).
+    """
+    print("Starting build process...")
+    written = set()
+    if parser:
+        set_parser_backend(parser)
+    if minify and not out_dir:
+        print("Warning: Minification only applies to output trees (--out), building without it.")
+        minify = False
+    set_minify(minify)
+    if audit:
+        try:
+            from audit import SEOAuditor
+        except ImportError as e:
+            print(f"Warning: Cannot audit ({e}), building without it.")
+            audit = False
+    set_audit(audit)
+    profiler = BuildProfiler(profile) if profile else None
+    stage = profiler.stage if profiler else contextlib.nullcontext
+    
+    # 1. Load Master Layout & Prepare Header/Footer/MobileNav
+    with stage('load master layout'):
+        master_tags = load_master_layout()
+    if master_tags is None:
+        return written
+    master_header, master_footer, master_mobile_nav = master_tags
+
+    # 1.0 Output Tree
+    # In-place: the output of a build is the source of the next one.
+    # out_dir: sources stay untouched, output goes to a new build tree.
+    out_root = PROJECT_ROOT
+    manifest_path = MANIFEST_PATH
+    exclude_dirs = []
+    previous_build = None
+    if out_dir:
+        out_dir = os.path.abspath(out_dir)
+        builds_dir = get_builds_dir(out_dir)
+        out_root = os.path.join(builds_dir, datetime.now().strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}')
+        os.makedirs(out_root)
+        manifest_path = os.path.join(builds_dir, 'manifest.json')
+        exclude_dirs = [os.path.basename(out_dir), os.path.basename(builds_dir)]
+        if os.path.isdir(out_dir):
+            previous_build = os.path.realpath(out_dir)
+        print(f"Building into {out_root}")
+
+    def output_path(file_path):
+        return os.path.join(out_root, os.path.relpath(file_path, PROJECT_ROOT))
+
+    # 1.1 Incremental Build: compare inputs against the last build
+    manifest = load_manifest(manifest_path)
+    pipeline_hash = get_pipeline_hash()
+    fragment_hashes = get_fragment_hashes(master_header, master_footer, master_mobile_nav)
+    master = FragmentCache.from_tags(master_header, master_footer, master_mobile_nav)
+    image_formats = available_formats()
+    format_names = [ext for ext, _, _ in image_formats]
+    full_build = (force or manifest['pipeline'] != pipeline_hash
+                  or manifest.get('parser') != PARSER_BACKEND
+                  or manifest.get('minify', False) != minify
+                  or manifest['images'].get('formats', []) != format_names
+                  or manifest['fragments'] != fragment_hashes)
+    if full_build and manifest['pages']:
+        print("Master layout, parser, image encoders or build script changed, rebuilding all pages.")
+    new_manifest = {
+        'version': MANIFEST_VERSION,
+        'pipeline': pipeline_hash,
+        'parser': PARSER_BACKEND,
+        'minify': minify,
+        'fragments': fragment_hashes,
+        'articles': None,
+        'listing': {},
+        'outputs': {},
+        'tailwind': {},
+        'images': {'formats': format_names, 'sources': {}},
+        'assets': {},
+        'pages': {}
+    }
+
+    # 1.2 Stylesheet: pages link the last compiled Tailwind stylesheet while it exists
+    stylesheet = manifest['tailwind'].get('href')
+    stylesheet_root = previous_build if out_dir else out_root
+    if stylesheet and stylesheet_root and os.path.exists(os.path.join(stylesheet_root, stylesheet.lstrip('/'))):
+        if out_dir:
+            target = os.path.join(out_root, stylesheet.lstrip('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(stylesheet_root, stylesheet.lstrip('/')), target)
+    else:
+        stylesheet = None
+    set_stylesheet(stylesheet)
+    # Classes in use: the last build's, plus those of every page built now
+    page_classes = set()
+    page_plugins = set()
+
+    # 1.3 Images: dimensions and content hashes of the source images
+    # Unchanged files (same size and mtime) keep their entry from the last build
+    if image_formats:
+        with stage('scan images'):
+            new_manifest['images']['sources'] = scan_images(PROJECT_ROOT, manifest['images'].get('sources'))
+    elif os.path.isdir(os.path.join(PROJECT_ROOT, 'images')):
+        print("Warning: Pillow with WebP/AVIF support not found, images are served as they are.")
+    set_images(new_manifest['images']['sources'], image_formats)
+
+    # 1.4 Assets: content-hashed URLs in output trees (in place, sources keep stable names)
+    asset_groups = {}
+    if out_dir:
+        with stage('scan assets'):
+            asset_sources = scan_assets(PROJECT_ROOT, manifest['assets'].get('sources'))
+        asset_table, duplicates = build_asset_table(asset_sources)
+        for url, copies in sorted(duplicates.items()):
+            print(f"Duplicate assets: {', '.join(copies)} identical to {url}, served as one file.")
+        asset_groups = get_asset_groups(asset_table, asset_sources)
+        new_manifest['assets'] = {'sources': asset_sources}
+        set_assets(asset_table)
+    else:
+        set_assets({})
 
-        # --- Save ---
-        output_html = str(soup)
-        if not output_html.startswith('<!DOCTYPE html>'):
-             output_html = '<!DOCTYPE html>\n' + output_html
-             
-        write_file(file_path, output_html)
+    # 2. Traverse Files
+    with stage('scan sources'):
+        files_to_process = find_source_files(exclude_dirs)
+        set_route_table(build_route_table(files_to_process))
 
-    print("Build completed.")
+    print(f"Found {len(files_to_process)} HTML files.")
+    if out_dir:
+        with stage('copy static files'):
+            copied = copy_static_files(out_root, files_to_process, exclude_dirs)
+        print(f"Copied {copied} static files.")
+
+    built = set()
+    # Digests only help when the next build writes over the same files
+    writer = OutputWriter(out_root, None if out_dir else manifest['outputs'])
+
+    def save_page(doc, output_html, meta, timings=None):
+        rel_path = get_rel_path(doc.path)
+        if timings is not None:
+            profiler.add_page(rel_path, timings)
+        target = output_path(doc.path)
+        if out_dir:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+        else:
+            written.add(target)
+        _, output_hash = writer.write(target, output_html, None if out_dir else doc.content)
+        page_classes.update(extract_classes(output_html))
+        page_plugins.update(find_tailwind_plugins(output_html))
+        images = find_image_refs(output_html, get_clean_url(doc.path), ASSET_SOURCES)
+        # Record what the next build will read for this page:
+        # the written file in place, the untouched source otherwise
+        entry = {'hash': hash_content(doc.content) if out_dir else output_hash}
+        if meta:
+            entry['meta'] = meta
+        if images:
+            entry['images'] = {url: IMAGE_TABLE.get(url, {}).get('sha') for url in sorted(images)}
+        if doc.facts is not None:
+            entry['audit'] = doc.facts
+        if ASSET_TABLE:
+            fingerprinted = find_fingerprinted(output_html)
+            if fingerprinted:
+                entry['assets'] = {url: asset_groups.get(url) for url in sorted(fingerprinted)}
+        new_manifest['pages'][rel_path] = entry
+        built.add(rel_path)
+
+    def build_pages(docs):
+        if jobs > 1 and len(docs) > 1:
+            # Spread the per-page pipeline over worker processes.
+            # imap keeps results in input order, so writes stay deterministic.
+            print(f"Processing {len(docs)} pages with {jobs} workers...")
+            initargs = (PARSER_BACKEND, ROUTE_TABLE, RECOMMENDATIONS, STYLESHEET_HREF, MINIFY_HTML, IMAGE_TABLE,
+                        IMAGE_FORMATS, ASSET_TABLE, AUDIT_PAGES, profiler is not None) + master.init_args()
+            with multiprocessing.Pool(jobs, initializer=init_build_worker, initargs=initargs) as pool:
+                chunksize = max(1, len(docs) // (jobs * 4))
+                for doc, (file_path, output_html, meta, facts, timings) in zip(docs, pool.imap(build_page_task, docs, chunksize=chunksize)):
+                    print(f"Processed {os.path.basename(file_path)}")
+                    doc.facts = facts
+                    save_page(doc, output_html, meta, timings)
+        else:
+            for doc in docs:
+                print(f"Processing {os.path.basename(doc.path)}...")
+                timings = {} if profiler else None
+                output_html, meta = build_page(doc, master, timings)
+                save_page(doc, output_html, meta, timings)
+                # Drop the tree once written to keep memory flat on large sites
+                doc.soup = None
+
+    # Each file is read and parsed once; check/fix, the page pipeline and the
+    # articles index all work from the same Document.
+    skipped = 0
+    pending = []
+    with stage('read and diff sources'):
+        for file_path in files_to_process:
+            rel_path = get_rel_path(file_path)
+            previous = manifest['pages'].get(rel_path)
+            doc = None
+            if full_build or not previous:
+                unchanged = False
+            elif changed is not None and file_path not in changed:
+                unchanged = True
+            else:
+                doc = Document(file_path)
+                unchanged = previous.get('hash') == hash_content(doc.content)
+            if unchanged:
+                # Unchanged since the last build and the master layout is the same
+                if out_dir:
+                    # Carry the previous output over into the new build tree
+                    previous_output = os.path.join(previous_build, rel_path) if previous_build else None
+                    if not previous_output or not os.path.exists(previous_output):
+                        pending.append(doc or Document(file_path))
+                        continue
+                    os.makedirs(os.path.dirname(output_path(file_path)), exist_ok=True)
+                    shutil.copy2(previous_output, output_path(file_path))
+                new_manifest['pages'][rel_path] = previous
+                skipped += 1
+                continue
+
+            pending.append(doc or Document(file_path))
+
+    # 2.1 Recommended Reading
+    # Needs the whole article set, so it is computed before any page is built.
+    # Pages read above are featurized from their content, the rest come from the manifest.
+    with stage('recommendations'):
+        cached = {}
+        if not full_build:
+            for file_path in files_to_process:
+                entry = manifest['pages'].get(get_rel_path(file_path))
+                if entry and entry.get('rec'):
+                    cached[file_path] = entry['rec']
+        recommendations, rec_features = build_recommendations(files_to_process, {doc.path: doc for doc in pending}, cached)
+        set_recommendations(recommendations)
+
+    def rec_digest(file_path):
+        return hash_content(json.dumps(RECOMMENDATIONS.get(get_clean_url(file_path), []), ensure_ascii=False))
+
+    with stage('pages'):
+        build_pages(pending)
+
+        # 3. Dependency Graph
+        # - master header/footer/nav changed: everything was rebuilt above (full_build)
+        # - article body changed: that article was rebuilt above
+        # - another article's recommendation block changed (an article's title or
+        #   description changed, or its content moved it in or out of the top picks):
+        #   rebuilt here
+        # - an image or asset a page shows was replaced, added or removed: rebuilt
+        #   here (its variant and fingerprinted URLs carry the content hash)
+        # - article title/date/category/description changed: the listing pages and
+        #   the sitemap follow below
+        stale = [file_path for file_path in rec_features
+                 if get_rel_path(file_path) not in built
+                 and new_manifest['pages'][get_rel_path(file_path)].get('deps') != rec_digest(file_path)]
+        if stale:
+            print(f"Recommendations changed, rebuilding {len(stale)} dependent articles...")
+        def assets_changed(entry):
+            return (any(IMAGE_TABLE.get(url, {}).get('sha') != sha for url, sha in entry.get('images', {}).items())
+                    or any(asset_groups.get(url) != digest for url, digest in entry.get('assets', {}).items()))
+        asset_stale = [file_path for file_path in files_to_process
+                       if file_path not in stale and get_rel_path(file_path) not in built
+                       and assets_changed(new_manifest['pages'][get_rel_path(file_path)])]
+        if asset_stale:
+            print(f"Images or assets changed, rebuilding {len(asset_stale)} pages that show them...")
+            stale += asset_stale
+        if stale:
+            skipped -= len(stale)
+            build_pages([Document(file_path) for file_path in stale])
+        for file_path, features in rec_features.items():
+            entry = new_manifest['pages'][get_rel_path(file_path)]
+            entry['rec'] = features
+            entry['deps'] = rec_digest(file_path)
+        articles_digest = get_articles_digest(new_manifest['pages'])
+        new_manifest['articles'] = articles_digest
+        # The stages below read the built pages back
+        writer.flush()
+
+    print(f"Build completed. ({len(files_to_process) - skipped} rebuilt, {skipped} unchanged)")
+    writer.report()
+
+    page_set_changed = set(new_manifest['pages']) != set(manifest['pages'])
+    listing_dirty = (full_build or page_set_changed or articles_digest != manifest.get('articles')
+                     or any(rel_path in built for rel_path in LISTING_PAGES))
+    # Sitemap lastmod comes from the articles' metadata and the other pages' JSON-LD
+    sitemap_dirty = listing_dirty or any(not new_manifest['pages'][rel_path].get('meta') for rel_path in built)
     
     # Auto-generate Articles Index (Pagination & Classification)
-    generate_articles_index()
+    # Metadata comes from the manifest: freshly built pages and unchanged ones alike
+    if listing_dirty:
+        articles_data = [entry['meta'] for entry in new_manifest['pages'].values() if entry.get('meta')]
+        with stage('generate_articles_index'):
+            new_manifest['listing'] = generate_articles_index(
+                articles_data, root=out_root, digests=None if full_build else manifest['listing'],
+                previous_root=previous_build)
+        if not out_dir:
+            written.update(os.path.join(PROJECT_ROOT, rel_path) for rel_path in LISTING_PAGES)
+    else:
+        print("Article metadata unchanged, keeping the articles index and homepage cards.")
+        new_manifest['listing'] = manifest['listing']
+        if out_dir and previous_build:
+            # Listing pages are not sources, carry the built ones over
+            for rel_path in manifest['listing']:
+                previous_output = os.path.join(previous_build, rel_path)
+                if rel_path not in LISTING_PAGES and os.path.exists(previous_output):
+                    target = os.path.join(out_root, rel_path)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copy2(previous_output, target)
     
+    # Search Index
+    # The recommendation features carry a digest of every article's tokens, so
+    # only a changed article (or listing metadata) changes it
+    search_root = previous_build if out_dir else out_root
+    search_dirty = (listing_dirty or not search_root
+                    or not os.path.exists(os.path.join(search_root, SEARCH_DIR, 'index.json'))
+                    or any(rec_features[file_path] != manifest['pages'].get(get_rel_path(file_path), {}).get('rec')
+                           for file_path in rec_features if get_rel_path(file_path) in built))
+    if search_dirty:
+        articles_data = [entry['meta'] for entry in new_manifest['pages'].values() if entry.get('meta')]
+        with stage('generate_search_index'):
+            generate_search_index(articles_data, rec_features, root=out_root,
+                                  docs={doc.path: doc for doc in pending})
+    else:
+        print("Article text unchanged, keeping the search index.")
+        if out_dir:
+            shutil.copytree(os.path.join(previous_build, SEARCH_DIR), os.path.join(out_root, SEARCH_DIR))
+
+    # Tailwind Stylesheet
+    # The class set grows with the pages built; a full build recollects it from scratch
+    with stage('tailwind'):
+        if not full_build:
+            page_classes.update(manifest['tailwind'].get('classes', []))
+            page_plugins.update(manifest['tailwind'].get('plugins', []))
+        if listing_dirty:
+            for rel_path in set(LISTING_PAGES) | set(new_manifest['listing']):
+                if os.path.exists(os.path.join(out_root, rel_path)):
+                    listing_html = read_file(os.path.join(out_root, rel_path))
+                    page_classes.update(extract_classes(listing_html))
+                    page_plugins.update(find_tailwind_plugins(listing_html))
+        new_manifest['tailwind'] = generate_stylesheet(page_classes, page_plugins, manifest['tailwind'], root=out_root)
+        stylesheet = new_manifest['tailwind']['href']
+        if stylesheet and stylesheet != STYLESHEET_HREF:
+            # New stylesheet: point every built page at it
+            set_stylesheet(stylesheet)
+            relinked = 0
+            for rel_path in sorted(set(new_manifest['pages']) | set(new_manifest['listing'])):
+                target = os.path.join(out_root, rel_path)
+                if not os.path.exists(target):
+                    continue
+                html = read_file(target)
+                linked_html = finalize_html(html)
+                if linked_html == html:
+                    continue
+                _, output_hash = writer.write(target, linked_html, html)
+                relinked += 1
+                if not out_dir:
+                    written.add(target)
+                    if rel_path in new_manifest['pages']:
+                        new_manifest['pages'][rel_path]['hash'] = output_hash
+            writer.flush()
+            print(f"Linked {relinked} pages to {stylesheet}.")
+
+    # Responsive Image Variants
+    # Named by source hash, so a variant that exists is current: only new or
+    # replaced images are encoded. Output trees start from the last build's variants.
+    if image_formats:
+        with stage('image variants'):
+            shown = {url for entry in new_manifest['pages'].values() for url, sha in entry.get('images', {}).items() if sha}
+            tasks = variant_tasks(shown, IMAGE_TABLE, image_formats)
+            derived_dir = os.path.join(out_root, DERIVED_DIR)
+            previous_derived = os.path.join(previous_build, DERIVED_DIR) if previous_build else None
+            if previous_derived and os.path.isdir(previous_derived):
+                shutil.copytree(previous_derived, derived_dir)
+            encoded = ensure_variants(tasks, PROJECT_ROOT, derived_dir, jobs)
+            removed = prune_variants(derived_dir, tasks)
+        if tasks or removed:
+            print(f"Image variants: {len(tasks)} for {len(shown)} images ({encoded} encoded, {removed} removed).")
+
+    # Fingerprinted Assets & Cache Headers
+    # _headers goes next to _redirects; hand-written rules in it are kept
+    if ASSET_TABLE:
+        with stage('fingerprint assets'):
+            linked = write_fingerprinted(ASSET_TABLE, PROJECT_ROOT, out_root)
+        print(f"Fingerprinted {len(set(ASSET_TABLE.values()))} assets ({linked} files written).")
+    headers_path = os.path.join(out_root, HEADERS_FILE)
+    existing_headers = read_file(headers_path) if os.path.exists(headers_path) else ''
+    headers = render_headers(existing_headers)
+    if headers != existing_headers:
+        write_file(headers_path, headers)
+        if not out_dir:
+            written.add(headers_path)
+
     # Auto-generate Sitemap
-    print("Generating sitemap...")
-    generate_sitemap.main()
+    if sitemap_dirty:
+        print("Generating sitemap...")
+        with stage('generate_sitemap'):
+            generate_sitemap.main(root=out_root)
+        if not out_dir:
+            written.update(os.path.join(PROJECT_ROOT, name) for name in SITEMAP_FILES)
+    else:
+        print("Sitemap inputs unchanged, keeping sitemap.")
+        if out_dir and previous_build:
+            # The static copy holds the source version, carry the built one over
+            for name in SITEMAP_FILES:
+                if os.path.exists(os.path.join(previous_build, name)):
+                    shutil.copy2(os.path.join(previous_build, name), os.path.join(out_root, name))
+
+    with stage('save manifest'):
+        if out_dir:
+            save_manifest(new_manifest, manifest_path)
+            publish_build(out_root, out_dir)
+        else:
+            # Index pages were rewritten by the steps above
+            if listing_dirty:
+                refresh_manifest_entries(new_manifest, [os.path.join(PROJECT_ROOT, rel_path) for rel_path in LISTING_PAGES])
+            new_manifest['outputs'] = {rel_path: digest for rel_path, digest in writer.digests.items()
+                                       if rel_path in new_manifest['pages']}
+            save_manifest(new_manifest, manifest_path)
+
+    # SEO Audit
+    # Pages built now, or unchanged since a build that recorded them, are audited
+    # from their facts; the listing pages (rewritten after the page stage) and
+    # anything else are parsed as audit.py would.
+    if audit:
+        page_facts = {output_path(os.path.join(PROJECT_ROOT, rel_path)): entry['audit']
+                      for rel_path, entry in new_manifest['pages'].items()
+                      if entry.get('audit') and rel_path not in LISTING_PAGES}
+        print(f"\nAuditing {out_root} ({len(page_facts)} pages from the build)...")
+        with stage('audit'):
+            # The link and audit caches outlive the build trees, like the manifest
+            link_cache = os.path.join(os.path.dirname(manifest_path), 'link-cache.json') if out_dir else None
+            audit_cache = os.path.join(os.path.dirname(manifest_path), 'audit-cache.json') if out_dir else None
+            SEOAuditor(root_dir=out_root, page_facts=page_facts, link_cache=link_cache, jobs=jobs,
+                       audit_cache=audit_cache, incremental=not force)
+
+    if profiler:
+        profiler.finish()
+    return written
+
+def snapshot_sources(exclude_dirs=()):
+    """(mtime, size) of every source page, for change polling."""
+    snapshot = {}
+    for file_path in find_source_files(exclude_dirs):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        snapshot[file_path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+def watch(interval=WATCH_INTERVAL, **build_options):
+    """
+    Builds once, then polls the sources and rebuilds whenever a file changes.
+    Only the changed files are read; run_build works out the dirty set from the
+    manifest (see the dependency graph step). Stops on Ctrl+C.
+    """
+    exclude_dirs = []
+    if build_options.get('out_dir'):
+        out_dir = os.path.abspath(build_options['out_dir'])
+        exclude_dirs = [os.path.basename(out_dir), os.path.basename(get_builds_dir(out_dir))]
+
+    before = snapshot_sources(exclude_dirs)
+    written = run_build(**build_options)
+    # Only the first build honours --force
+    build_options['force'] = False
+
+    while True:
+        # Files the build itself wrote are not edits; anything else that moved
+        # during the build is picked up on the next poll.
+        after = snapshot_sources(exclude_dirs)
+        previous = {path: (after[path] if path in written else stat) for path, stat in before.items() if path in after}
+        previous.update((path, after[path]) for path in written if path in after)
+        print(f"\nWatching {len(after)} pages for changes (Ctrl+C to stop)...")
+
+        try:
+            while True:
+                time.sleep(interval)
+                current = snapshot_sources(exclude_dirs)
+                if current != previous:
+                    break
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+            return
+
+        changed = {path for path, stat in current.items() if previous.get(path) != stat}
+        for path in sorted(changed | (set(previous) - set(current))):
+            print(f"Changed: {os.path.relpath(path, PROJECT_ROOT)}")
+        before = current
+        written = run_build(changed=changed, **build_options)
 
 if __name__ == '__main__':
-    run_build()
+    parser = argparse.ArgumentParser(description='Build the PokePay Guide static site.')
+    parser.add_argument('--force', action='store_true', help='Ignore the build manifest and rebuild every page')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of worker processes for page processing (0 = all cores)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser', help='HTML parser backend for pages')
+    parser.add_argument('--verify-parser', metavar='BACKEND', choices=PARSER_BACKENDS,
+                        help='Build in memory with --parser and BACKEND, report output differences and exit')
+    parser.add_argument('--out', nargs='?', const=DEFAULT_OUTPUT_DIR, metavar='DIR',
+                        help='Write the site to a separate output tree (default: dist/) instead of rewriting sources in place')
+    parser.add_argument('--watch', action='store_true', help='Rebuild affected pages whenever a source file changes')
+    parser.add_argument('--profile', nargs='?', const='build_trace.json', metavar='TRACE',
+                        help='Report stage and per-page timings and write a Chrome trace (default: build_trace.json)')
+    parser.add_argument('--minify', action='store_true', help='Minify the HTML of every page written (requires --out)')
+    parser.add_argument('--audit', action='store_true', help='Run the SEO audit (audit.py) in the same pass, on the pages as built')
+    args = parser.parse_args()
+    if args.minify and not args.out:
+        parser.error('--minify requires --out: in-place output is the next build\'s source')
+    if args.jobs <= 0:
+        args.jobs = multiprocessing.cpu_count()
+    if args.verify_parser:
+        differing = verify_parser_backends(args.parser, args.verify_parser)
+        raise SystemExit(0 if differing == [] else 1)
+    build_options = dict(force=args.force, jobs=args.jobs, parser=args.parser, out_dir=args.out, profile=args.profile,
+                         minify=args.minify, audit=args.audit)
+    if args.watch:
+        watch(**build_options)
+    else:
+        run_build(**build_options)
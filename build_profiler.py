@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Build profiling for build.run_build(profile=...)
+# - Stages: wall time, CPU time and peak traced memory (main process)
+#   tracemalloc slows every allocation several-fold, so it only runs inside the
+#   stages it measures, and never in the ones fanned out to worker processes
+#   (forked workers would inherit it, and their timings are what is reported).
+# - Pages: parse / per-transform / serialize time, DOM node count, bytes written
+# Output is a Chrome trace (chrome://tracing or https://ui.perfetto.dev) plus a console table.
+# Timestamps are wall-clock seconds (time.time_ns), which worker processes share
+# with the parent; perf_counter has no common epoch across processes, so it only
+# measures durations, counted from a wall-clock origin taken at the same moment.
+
+# Stages whose timings matter more than their memory: not traced
+UNTRACED_STAGES = ('pages', 'image variants', 'audit')
+
+class Clock:
+    """perf_counter precision on a wall-clock epoch shared by every process."""
+    def __init__(self):
+        self.wall = time.time_ns() / 1e9
+        self.perf = time.perf_counter()
+
+    def now(self):
+        return self.wall + (time.perf_counter() - self.perf)
+
+class PageClock:
+    """
+    Checkpoint timer for the per-page pipeline.
+    mark(name) records the time since the previous mark under name.
+    With timings=None every call is a no-op, so build_page pays nothing when not profiling.
+    """
+    def __init__(self, timings=None):
+        self.timings = timings
+        if timings is not None:
+            timings.setdefault('pid', os.getpid())
+            timings.setdefault('steps', [])
+            self.clock = Clock()
+            self.last = self.clock.now()
+            timings['start'] = self.last
+
+    def mark(self, name):
+        if self.timings is None:
+            return
+        now = self.clock.now()
+        self.timings['steps'].append((name, self.last, now - self.last))
+        self.last = now
+
+    def skip(self):
+        """Restart the clock without recording (keeps bookkeeping out of the next step)."""
+        if self.timings is not None:
+            self.last = self.clock.now()
+
+    def set(self, key, value):
+        if self.timings is not None:
+            self.timings[key] = value
+
+    @property
+    def enabled(self):
+        return self.timings is not None
+
+class BuildProfiler:
+    def __init__(self, trace_path, top_n=10):
+        self.trace_path = trace_path
+        self.top_n = top_n
+        self.pid = os.getpid()
+        self.clock = Clock()
+        self.t0 = self.clock.now()
+        self.stages = []
+        self.pages = []
+
+    def _us(self, t):
+        return round((t - self.t0) * 1e6, 1)
+
+    @contextmanager
+    def stage(self, name):
+        traced = name not in UNTRACED_STAGES
+        if traced:
+            tracemalloc.start()
+        wall_start = self.clock.now()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = self.clock.now() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = None
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.stages.append({
+                'name': name,
+                'start': wall_start,
+                'wall': wall,
+                'cpu': cpu,
+                'peak_bytes': peak
+            })
+
+    def add_page(self, rel_path, timings):
+        """timings: dict filled by PageClock inside build_page."""
+        steps = timings.get('steps', [])
+        self.pages.append({
+            'path': rel_path,
+            'pid': timings.get('pid', self.pid),
+            'start': timings.get('start', self.t0),
+            'steps': steps,
+            'total': sum(d for _, _, d in steps),
+            'parse': sum(d for n, _, d in steps if n == 'parse'),
+            'serialize': sum(d for n, _, d in steps if n == 'serialize'),
+            'nodes': timings.get('nodes', 0),
+            'bytes': timings.get('bytes', 0)
+        })
+
+    def trace_events(self):
+        events = []
+        for stage in self.stages:
+            args = {'cpu_s': round(stage['cpu'], 4)}
+            if stage['peak_bytes'] is not None:
+                args['peak_bytes'] = stage['peak_bytes']
+            events.append({
+                'name': stage['name'], 'cat': 'stage', 'ph': 'X',
+                'ts': self._us(stage['start']), 'dur': round(stage['wall'] * 1e6, 1),
+                'pid': self.pid, 'tid': 0,
+                'args': args
+            })
+        for page in self.pages:
+            # One row per worker process
+            events.append({
+                'name': page['path'], 'cat': 'page', 'ph': 'X',
+                'ts': self._us(page['start']), 'dur': round(page['total'] * 1e6, 1),
+                'pid': self.pid, 'tid': page['pid'],
+                'args': {'nodes': page['nodes'], 'bytes': page['bytes']}
+            })
+            for name, start, dur in page['steps']:
+                events.append({
+                    'name': name, 'cat': 'transform', 'ph': 'X',
+                    'ts': self._us(start), 'dur': round(dur * 1e6, 1),
+                    'pid': self.pid, 'tid': page['pid'],
+                    'args': {'page': page['path']}
+                })
+        return events
+
+    def finish(self):
+        with open(self.trace_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+        self.print_report()
+        print(f"Trace written to {self.trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+
+    def print_report(self):
+        print("\n=== BUILD PROFILE ===")
+        print(f"{'Stage':<28}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak MB':>10}")
+        for stage in self.stages:
+            peak = f"{stage['peak_bytes'] / 1048576:.1f}" if stage['peak_bytes'] is not None else '-'
+            print(f"{stage['name']:<28}{stage['wall']:>10.3f}{stage['cpu']:>10.3f}{peak:>10}")
+
+        if not self.pages:
+            return
+
+        # Cost per transform across all pages
+        totals = {}
+        for page in self.pages:
+            for name, _, dur in page['steps']:
+                totals[name] = totals.get(name, 0) + dur
+        print(f"\n{'Transform (all pages)':<28}{'Total (s)':>10}{'Avg (ms)':>10}")
+        for name, total in sorted(totals.items(), key=lambda x: x[1], reverse=True):
+            print(f"{name:<28}{total:>10.3f}{total / len(self.pages) * 1000:>10.2f}")
+
+        print(f"\nTop {self.top_n} slowest pages:")
+        print(f"{'Page':<52}{'Total ms':>10}{'Parse ms':>10}{'Ser. ms':>10}{'Nodes':>8}{'KB':>8}")
+        for page in sorted(self.pages, key=lambda p: p['total'], reverse=True)[:self.top_n]:
+            print(f"{page['path'][:51]:<52}{page['total'] * 1000:>10.1f}{page['parse'] * 1000:>10.1f}"
+                  f"{page['serialize'] * 1000:>10.1f}{page['nodes']:>8}{page['bytes'] / 1024:>8.1f}")
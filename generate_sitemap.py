@@ -106,25 +106,28 @@ def generate_index(sitemaps):
     xml.append('</sitemapindex>')
     return "\n".join(xml)
 
-def main():
+def main(root=None):
+    # root: site tree to scan and write into (defaults to PROJECT_ROOT)
+    root = root or PROJECT_ROOT
+
     # 1. Generate sitemap.xml (Simplified Chinese)
     sc_urls = []
     # Root files
-    sc_urls.extend(get_files(PROJECT_ROOT, ""))
+    sc_urls.extend(get_files(root, ""))
     # Articles
-    sc_urls.extend(get_files(os.path.join(PROJECT_ROOT, "articles"), "articles"))
+    sc_urls.extend(get_files(os.path.join(root, "articles"), "articles"))
     
     # Sort URLs: Priority (desc), LastMod (desc)
     # This ensures home page is top, and newer articles appear before older ones
     sc_urls.sort(key=lambda x: (float(x['priority']), x['lastmod']), reverse=True)
     
-    with open(os.path.join(PROJECT_ROOT, "sitemap.xml"), "w", encoding="utf-8") as f:
+    with open(os.path.join(root, "sitemap.xml"), "w", encoding="utf-8") as f:
         f.write(generate_xml(sc_urls))
     print("Generated sitemap.xml")
 
     # 3. Generate sitemap_index.xml
     index_content = generate_index(["sitemap.xml"])
-    with open(os.path.join(PROJECT_ROOT, "sitemap_index.xml"), "w", encoding="utf-8") as f:
+    with open(os.path.join(root, "sitemap_index.xml"), "w", encoding="utf-8") as f:
         f.write(index_content)
     print("Generated sitemap_index.xml")
 
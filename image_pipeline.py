@@ -0,0 +1,196 @@
+import os
+import re
+import hashlib
+import posixpath
+import multiprocessing
+import html as html_lib
+from urllib.parse import unquote, urlsplit
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# Responsive images: WebP/AVIF variants at several widths for every image a page
+# references, served through <picture>/srcset with the intrinsic width/height.
+# Variants are named after the source image's content hash, so an unchanged
+# image is never re-encoded and a changed one gets new URLs:
+#   /images/_derived/<stem>.<sha12>.<width>.<ext>
+# Pillow is optional; without it pages keep their plain <img> tags.
+
+IMAGES_DIR = 'images'
+DERIVED_DIR = 'images/_derived'
+SOURCE_EXTS = ('.png', '.jpg', '.jpeg')
+WIDTHS = [480, 960, 1440]
+# Best first: browsers take the first <source> they support
+FORMATS = [
+    ('avif', 'image/avif', {'quality': 50}),
+    ('webp', 'image/webp', {'quality': 80, 'method': 6}),
+]
+# Article images span the content column (max-w-3xl) on wide screens
+DEFAULT_SIZES = '(min-width: 768px) 768px, 100vw'
+EXIF_ORIENTATION = 0x0112
+IMG_SRC_RE = re.compile(r'<img\b[^>]*?\ssrc=(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+
+def available_formats():
+    """The FORMATS entries Pillow can encode here (none without Pillow)."""
+    if Image is None:
+        return []
+    formats = []
+    for ext, mime, options in FORMATS:
+        try:
+            supported = features.check(ext)
+        except ValueError:
+            supported = False
+        if supported:
+            formats.append((ext, mime, options))
+    return formats
+
+def hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def read_dimensions(path):
+    """Displayed (width, height): header only, swapped for EXIF-rotated photos."""
+    with Image.open(path) as img:
+        width, height = img.size
+        try:
+            orientation = img.getexif().get(EXIF_ORIENTATION)
+        except Exception:
+            orientation = None
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    return width, height
+
+def scan_images(project_root, previous=None):
+    """
+    {url: {"sha", "size", "mtime_ns", "width", "height"}} for every source image
+    under IMAGES_DIR. previous: the table from the last build; files with the
+    same size and mtime are not read again.
+    """
+    previous = previous or {}
+    table = {}
+    images_root = os.path.join(project_root, IMAGES_DIR)
+    derived_root = os.path.join(project_root, DERIVED_DIR)
+    for dirpath, dirs, files in os.walk(images_root):
+        dirs[:] = [d for d in dirs if os.path.join(dirpath, d) != derived_root]
+        for name in sorted(files):
+            if not name.lower().endswith(SOURCE_EXTS):
+                continue
+            path = os.path.join(dirpath, name)
+            url = '/' + os.path.relpath(path, project_root).replace('\\', '/')
+            st = os.stat(path)
+            entry = previous.get(url)
+            if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+                table[url] = entry
+                continue
+            try:
+                width, height = read_dimensions(path)
+            except Exception as e:
+                print(f"Warning: Cannot read image {url}: {e}")
+                continue
+            table[url] = {'sha': hash_file(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                          'width': width, 'height': height}
+    return table
+
+def resolve_image_url(src, page_url):
+    """Site path of a local image src relative to the page at page_url, else None."""
+    parts = urlsplit(src)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    base = page_url if page_url.endswith('/') else posixpath.dirname(page_url) + '/'
+    return posixpath.normpath(posixpath.join(base, unquote(parts.path)))
+
+def is_source_image(url):
+    return (url is not None and url.startswith(f'/{IMAGES_DIR}/') and not url.startswith(f'/{DERIVED_DIR}/')
+            and url.lower().endswith(SOURCE_EXTS))
+
+def find_image_refs(html, page_url, aliases=None):
+    """
+    Source images (site paths under IMAGES_DIR) the <img> tags of a built page point at.
+    aliases: {served URL: source URL} for images served under another name.
+    """
+    aliases = aliases or {}
+    refs = set()
+    for match in IMG_SRC_RE.finditer(html):
+        src = next(v for v in match.groups() if v is not None)
+        url = resolve_image_url(html_lib.unescape(src), page_url)
+        url = aliases.get(url, url)
+        if is_source_image(url):
+            refs.add(url)
+    return refs
+
+def variant_widths(width):
+    """WIDTHS below the image's own width, plus the full width (capped at the largest)."""
+    return sorted({w for w in WIDTHS if w < width} | {min(width, WIDTHS[-1])})
+
+def derived_url(url, entry, width, ext):
+    stem = os.path.splitext(posixpath.basename(url))[0]
+    return f"/{DERIVED_DIR}/{stem}.{entry['sha'][:12]}.{width}.{ext}"
+
+def picture_sources(url, entry, formats):
+    """[(mime, srcset)] for the <source> elements of one image, best format first."""
+    return [(mime, ', '.join(f'{derived_url(url, entry, w, ext)} {w}w' for w in variant_widths(entry['width'])))
+            for ext, mime, _ in formats]
+
+def variant_tasks(urls, table, formats):
+    """(source url, width, ext, options, derived url) for every variant of the given images."""
+    tasks = []
+    for url in sorted(urls):
+        entry = table.get(url)
+        if not entry:
+            continue
+        for ext, _, options in formats:
+            for width in variant_widths(entry['width']):
+                tasks.append((url, width, ext, options, derived_url(url, entry, width, ext)))
+    return tasks
+
+def encode_variant(task):
+    """Pool task: (source path, width, ext, options, destination) -> destination."""
+    source_path, width, ext, options, dest = task
+    with Image.open(source_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+        if img.width > width:
+            img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+        tmp = f'{dest}.{os.getpid()}.tmp'
+        img.save(tmp, format=ext.upper(), **options)
+    os.replace(tmp, dest)
+    return dest
+
+def ensure_variants(tasks, project_root, cache_dir, jobs=1):
+    """
+    Encodes the variants missing from cache_dir (files are named by content hash,
+    so an existing one is always current). Returns the number encoded.
+    """
+    missing = []
+    for url, width, ext, options, target_url in tasks:
+        dest = os.path.join(cache_dir, posixpath.basename(target_url))
+        if not os.path.exists(dest):
+            missing.append((os.path.join(project_root, url.lstrip('/')), width, ext, options, dest))
+    if missing:
+        os.makedirs(cache_dir, exist_ok=True)
+    if jobs > 1 and len(missing) > 1:
+        with multiprocessing.Pool(min(jobs, len(missing))) as pool:
+            for _ in pool.imap_unordered(encode_variant, missing):
+                pass
+    else:
+        for task in missing:
+            encode_variant(task)
+    return len(missing)
+
+def prune_variants(cache_dir, tasks):
+    """Removes derived files no page references any more. Returns the number removed."""
+    keep = {posixpath.basename(task[4]) for task in tasks}
+    removed = 0
+    if not os.path.isdir(cache_dir):
+        return removed
+    for name in os.listdir(cache_dir):
+        if name not in keep:
+            os.remove(os.path.join(cache_dir, name))
+            removed += 1
+    return removed
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from urllib.parse import urlparse, urljoin
+
+import requests
+
+# External link checker for the SEO audit (audit.py).
+# - asyncio schedules the checks: at most PER_HOST requests in flight per host,
+#   consecutive requests to a host spaced by HOST_DELAY, MAX_CONCURRENCY overall.
+#   The requests themselves run on worker threads (requests is blocking).
+# - HEAD first; servers that reject HEAD (405, 501, ...) are asked again with GET.
+# - Redirects are followed by hand, so every hop is recorded in "chain".
+# - Results persist in a JSON cache. Within its TTL a result is reused as is;
+#   past it, URLs that sent an ETag or Last-Modified are revalidated with a
+#   conditional request, and a 304 keeps the cached result.
+#
+# Cache entry: {"status": <final status or "Error">, "final_url", "method",
+#               "chain": [[url, status], ...], "etag", "last_modified",
+#               "error", "checked": <unix time>}
+
+USER_AGENT = 'Mozilla/5.0 (compatible; SEOAuditBot/1.0)'
+CACHE_VERSION = 1
+TIMEOUT = 10
+MAX_REDIRECTS = 10
+MAX_CONCURRENCY = 16
+PER_HOST = 2
+HOST_DELAY = 0.5
+# Working links are re-checked weekly, broken ones daily (they may come back)
+TTL_OK = 7 * 24 * 3600
+TTL_BROKEN = 24 * 3600
+# HEAD answers that may only mean "no HEAD here"
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 406, 501}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Longest Retry-After honoured for a 429 (seconds)
+MAX_RETRY_AFTER = 30
+
+def is_broken(result):
+    status = result.get('status')
+    return not isinstance(status, int) or status >= 400
+
+class LinkChecker:
+    def __init__(self, cache_path=None, ttl_ok=TTL_OK, ttl_broken=TTL_BROKEN, per_host=PER_HOST,
+                 host_delay=HOST_DELAY, max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT):
+        self.cache_path = cache_path
+        self.ttl_ok = ttl_ok
+        self.ttl_broken = ttl_broken
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = self.load_cache()
+        self.stats = {'cached': 0, 'revalidated': 0, 'checked': 0}
+        # requests.Session is not thread-safe: one per worker thread
+        self._local = threading.local()
+
+    # --- Cache ---
+
+    def load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"Warning: Link cache {self.cache_path} is unreadable, checking every link.")
+            return {}
+        if data.get('version') != CACHE_VERSION:
+            return {}
+        return data.get('links', {})
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'links': self.cache}, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def is_fresh(self, result, now):
+        ttl = self.ttl_broken if is_broken(result) else self.ttl_ok
+        return now - result.get('checked', 0) < ttl
+
+    # --- HTTP (worker threads) ---
+
+    def session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+            self._local.session.headers['User-Agent'] = USER_AGENT
+        return self._local.session
+
+    def request(self, method, url, headers=None):
+        """One request, no redirects followed. Returns the response with its body unread."""
+        response = self.session().request(method, url, headers=headers, timeout=self.timeout,
+                                          allow_redirects=False, stream=True)
+        response.close()
+        return response
+
+    # --- Scheduling ---
+
+    async def throttled(self, host, method, url, headers=None):
+        """Runs one request within the host's concurrency limit and politeness delay."""
+        if host not in self.host_limits:
+            self.host_limits[host] = asyncio.Semaphore(self.per_host)
+            self.host_locks[host] = asyncio.Lock()
+        async with self.host_limits[host]:
+            async with self.host_locks[host]:
+                wait = self.host_next.get(host, 0) - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self.host_next[host] = time.monotonic() + self.host_delay
+            # The delay is waited out before taking a global slot, so a slow host holds none
+            async with self.global_limit:
+                return await asyncio.to_thread(self.request, method, url, headers)
+
+    async def hop(self, method, url, headers=None):
+        """
+        One request to url, redirects not followed: waits out a 429 once and asks
+        again with GET when HEAD is refused. Returns (method used, response).
+        """
+        host = urlparse(url).netloc.lower()
+        response = await self.throttled(host, method, url, headers)
+        if response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            await asyncio.sleep(min(int(retry_after), MAX_RETRY_AFTER) if retry_after.isdigit() else self.host_delay)
+            response = await self.throttled(host, method, url, headers)
+        if method == 'HEAD' and response.status_code in HEAD_FALLBACK_STATUSES:
+            method = 'GET'
+            response = await self.throttled(host, method, url, headers)
+        return method, response
+
+    async def fetch(self, url, conditional=None):
+        """
+        Follows url hop by hop. Returns (status, final url, chain, method, response).
+        conditional: validators sent with the first request (If-None-Match...).
+        """
+        chain = []
+        method = 'HEAD'
+        current = url
+        headers = conditional
+        response = None
+        for _ in range(MAX_REDIRECTS + 1):
+            method, response = await self.hop(method, current, headers)
+            chain.append([current, response.status_code])
+            location = response.headers.get('Location')
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                return response.status_code, current, chain, method, response
+            current = urljoin(current, location)
+            headers = None
+            if any(hop[0] == current for hop in chain):
+                return 'Redirect loop', current, chain, method, response
+        return 'Too many redirects', current, chain, method, response
+
+    async def redirect_unchanged(self, url, cached):
+        """True when url still answers with the redirect that starts the cached chain."""
+        if len(cached['chain']) < 2:
+            return False
+        _, response = await self.hop('HEAD', url)
+        location = response.headers.get('Location')
+        return (response.status_code == cached['chain'][0][1] and location is not None
+                and urljoin(url, location) == cached['chain'][1][0])
+
+    async def check_one(self, url, now):
+        cached = self.cache.get(url)
+        if cached and self.is_fresh(cached, now):
+            self.stats['cached'] += 1
+            return url, cached
+
+        conditional = {}
+        if cached and not is_broken(cached):
+            if cached.get('etag'):
+                conditional['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                conditional['If-Modified-Since'] = cached['last_modified']
+        try:
+            fetched = None
+            # A redirected URL is revalidated at its final URL, but only once the
+            # source is seen to still redirect where it did: a source that now
+            # fails or points elsewhere has its whole chain fetched again
+            if conditional and (cached['final_url'] == url or await self.redirect_unchanged(url, cached)):
+                fetched = await self.fetch(cached['final_url'], conditional)
+                if fetched[0] == 304:
+                    self.stats['revalidated'] += 1
+                    return url, dict(cached, checked=now)
+                if cached['final_url'] != url:
+                    fetched = None
+            status, final_url, chain, method, response = fetched or await self.fetch(url)
+            result = {
+                'status': status, 'final_url': final_url, 'chain': chain, 'method': method,
+                'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+                'error': None, 'checked': now
+            }
+        except (requests.RequestException, ValueError) as e:
+            result = {'status': 'Error', 'final_url': url, 'chain': [], 'method': None,
+                      'etag': None, 'last_modified': None, 'error': str(e), 'checked': now}
+        self.stats['checked'] += 1
+        return url, result
+
+    async def check_async(self, urls):
+        self.global_limit = asyncio.Semaphore(self.max_concurrency)
+        self.host_limits = {}
+        self.host_locks = {}
+        self.host_next = {}
+        now = time.time()
+        results = dict(await asyncio.gather(*(self.check_one(url, now) for url in sorted(set(urls)))))
+        return results
+
+    def check(self, urls):
+        """
+        Checks urls (cache first). Returns {url: result} and rewrites the cache file
+        with them: links no longer on the site drop out.
+        """
+        results = asyncio.run(self.check_async(urls))
+        self.cache = results
+        self.save_cache()
+        return results
@@ -0,0 +1,227 @@
+import csv
+import json
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Internal link graph of the site, for the SEO audit (audit.py).
+# Links are collected as (source, target, anchor text) and frozen into CSR form:
+# the out-links of page i are indices[indptr[i]:indptr[i + 1]], one entry per
+# distinct target, with the number of links in weights and the distinct anchor
+# texts in anchors. PageRank and click depth then work on whole arrays (numpy),
+# so tens of thousands of pages cost a handful of vector operations per
+# iteration. Without numpy the same algorithms run on plain lists.
+
+DAMPING = 0.85
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 100
+# Pages more clicks than this away from the homepage are reported
+MAX_DEPTH = 3
+# Pages linked from this few other pages (but at least one) are near-orphans
+NEAR_ORPHAN_INBOUND = 1
+ROOT_URL = '/'
+
+class LinkGraph:
+    def __init__(self, urls):
+        self.urls = sorted(urls)
+        self.index = {url: i for i, url in enumerate(self.urls)}
+        self.link_sources = []
+        self.link_targets = []
+        self.link_anchors = []
+        self.indptr = self.indices = self.weights = self.anchors = None
+
+    def add_link(self, source, target, anchor=''):
+        """One <a> from page source to page target (clean URLs of audited pages)."""
+        self.link_sources.append(self.index[source])
+        self.link_targets.append(self.index[target])
+        self.link_anchors.append(anchor)
+
+    def freeze(self):
+        """Builds the CSR arrays from the collected links."""
+        n = len(self.urls)
+        if np is not None:
+            src = np.array(self.link_sources, dtype=np.int64)
+            dst = np.array(self.link_targets, dtype=np.int64)
+            order = np.lexsort((dst, src))
+            keys = src[order] * n + dst[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if keys.size else np.array([], dtype=np.int64)
+            ends = np.r_[starts[1:], keys.size]
+            edge_src = src[order][starts]
+            self.indices = dst[order][starts]
+            self.weights = (ends - starts).astype(np.float64)
+            self.indptr = np.r_[0, np.cumsum(np.bincount(edge_src, minlength=n))].astype(np.int64)
+            anchors = [self.link_anchors[k] for k in order.tolist()]
+            self.anchors = [[a for a in dict.fromkeys(anchors[start:end]) if a]
+                            for start, end in zip(starts.tolist(), ends.tolist())]
+            return self
+
+        grouped = {}
+        for source, target, anchor in zip(self.link_sources, self.link_targets, self.link_anchors):
+            edge = grouped.get((source, target))
+            if edge is None:
+                edge = grouped[(source, target)] = [0, []]
+            edge[0] += 1
+            if anchor and anchor not in edge[1]:
+                edge[1].append(anchor)
+        keys = sorted(grouped)
+        counts = [0] * n
+        for source, _ in keys:
+            counts[source] += 1
+        self.indptr = [0]
+        for count in counts:
+            self.indptr.append(self.indptr[-1] + count)
+        self.indices = [target for _, target in keys]
+        self.weights = [grouped[key][0] for key in keys]
+        self.anchors = [grouped[key][1] for key in keys]
+        return self
+
+    def sources(self):
+        """Source page of every CSR entry (the row index, expanded)."""
+        if np is not None:
+            return np.repeat(np.arange(len(self.urls)), np.diff(self.indptr))
+        return [i for i in range(len(self.urls)) for _ in range(self.indptr[i + 1] - self.indptr[i])]
+
+    # --- Metrics ---
+
+    def pagerank(self, damping=DAMPING, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+        """
+        Internal PageRank (sums to 1). Links are weighted by count, self-links
+        ignored; pages without out-links spread their rank over every page.
+        """
+        n = len(self.urls)
+        if n == 0:
+            return []
+        if np is not None:
+            src, dst, weights = self.sources(), self.indices, self.weights
+            keep = src != dst
+            src, dst, weights = src[keep], dst[keep], weights[keep]
+            out_weight = np.bincount(src, weights=weights, minlength=n)
+            dangling = out_weight == 0
+            share = weights / out_weight[src]
+            rank = np.full(n, 1.0 / n)
+            for _ in range(max_iterations):
+                new = np.bincount(dst, weights=rank[src] * share, minlength=n)
+                new = damping * (new + rank[dangling].sum() / n) + (1 - damping) / n
+                converged = np.abs(new - rank).sum() < tolerance
+                rank = new
+                if converged:
+                    break
+            return rank.tolist()
+
+        edges = [(s, d, w) for s, d, w in zip(self.sources(), self.indices, self.weights) if s != d]
+        out_weight = [0.0] * n
+        for s, _, w in edges:
+            out_weight[s] += w
+        dangling = [i for i in range(n) if out_weight[i] == 0]
+        shares = [(s, d, w / out_weight[s]) for s, d, w in edges]
+        rank = [1.0 / n] * n
+        for _ in range(max_iterations):
+            new = [0.0] * n
+            for s, d, share in shares:
+                new[d] += rank[s] * share
+            base = damping * sum(rank[i] for i in dangling) / n + (1 - damping) / n
+            new = [damping * value + base for value in new]
+            converged = sum(abs(a - b) for a, b in zip(new, rank)) < tolerance
+            rank = new
+            if converged:
+                break
+        return rank
+
+    def click_depth(self, root=ROOT_URL):
+        """Clicks from root to every page (breadth-first); None where unreachable."""
+        n = len(self.urls)
+        if root not in self.index:
+            return [None] * n
+        start = self.index[root]
+        if np is not None:
+            depth = np.full(n, -1, dtype=np.int64)
+            depth[start] = 0
+            frontier = np.array([start], dtype=np.int64)
+            level = 0
+            while frontier.size:
+                level += 1
+                # Gather all out-links of the frontier at once
+                starts = self.indptr[frontier]
+                lengths = self.indptr[frontier + 1] - starts
+                total = int(lengths.sum())
+                if total == 0:
+                    break
+                offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+                targets = self.indices[offsets]
+                frontier = np.unique(targets[depth[targets] < 0])
+                depth[frontier] = level
+            return [int(d) if d >= 0 else None for d in depth]
+
+        depth = [None] * n
+        depth[start] = 0
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                target = self.indices[k]
+                if depth[target] is None:
+                    depth[target] = depth[i] + 1
+                    queue.append(target)
+        return depth
+
+    def degrees(self):
+        """(distinct pages linking in, distinct pages linked to), self-links excluded."""
+        n = len(self.urls)
+        if np is not None:
+            src, dst = self.sources(), self.indices
+            keep = src != dst
+            return (np.bincount(dst[keep], minlength=n).tolist(), np.bincount(src[keep], minlength=n).tolist())
+        inbound = [0] * n
+        outbound = [0] * n
+        for s, d in zip(self.sources(), self.indices):
+            if s != d:
+                inbound[d] += 1
+                outbound[s] += 1
+        return inbound, outbound
+
+    def analyze(self, max_depth=MAX_DEPTH, root=ROOT_URL):
+        """Per-page metrics and the pages worth a look."""
+        ranks = self.pagerank()
+        depths = self.click_depth(root)
+        inbound, outbound = self.degrees()
+        pages = []
+        for i, url in enumerate(self.urls):
+            links = self.indptr[i + 1] - self.indptr[i]
+            self_only = links > 0 and outbound[i] == 0
+            pages.append({
+                'url': url, 'pagerank': ranks[i], 'depth': depths[i],
+                'inbound': inbound[i], 'outbound': outbound[i], 'self_only': bool(self_only)
+            })
+        candidates = [page for page in pages if page['url'] != root]
+        return {
+            'pages': pages,
+            'orphans': [page['url'] for page in candidates if page['inbound'] == 0],
+            'near_orphans': [page['url'] for page in candidates if 0 < page['inbound'] <= NEAR_ORPHAN_INBOUND],
+            'deep': [page['url'] for page in candidates if page['depth'] is not None and page['depth'] > max_depth],
+            'unreachable': [page['url'] for page in candidates if page['depth'] is None],
+            'self_only': [page['url'] for page in pages if page['self_only']],
+            'max_depth': max_depth
+        }
+
+    # --- Export ---
+
+    def edges(self):
+        """[{"source", "target", "links", "anchors"}] in CSR order."""
+        return [{'source': self.urls[s], 'target': self.urls[d], 'links': int(w), 'anchors': anchors}
+                for s, d, w, anchors in zip(self.sources(), self.indices, self.weights, self.anchors)]
+
+    def to_json(self, path, analysis):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(analysis, edges=self.edges()), f, ensure_ascii=False, indent=2)
+
+    def to_csv(self, path, analysis):
+        """One row per page."""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['url', 'pagerank', 'depth', 'inbound', 'outbound', 'self_only'])
+            for page in analysis['pages']:
+                writer.writerow([page['url'], f"{page['pagerank']:.6f}", '' if page['depth'] is None else page['depth'],
+                                 page['inbound'], page['outbound'], int(page['self_only'])])
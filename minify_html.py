@@ -0,0 +1,126 @@
+import re
+import json
+
+# HTML minifier for build output (build.py --minify).
+# Works on the serialized page with regexes, no second parse: BeautifulSoup
+# output is well-formed, so tags, comments and raw-text elements tokenize cleanly.
+# - whitespace is collapsed outside <pre>, <textarea> and <script>, and dropped
+#   next to block-level tags where it cannot render
+# - comments are dropped, except conditional comments and markers like MASTER_CSS_START
+# - attribute quotes are removed where the value cannot be misread
+# - inline JSON-LD is re-serialized without indentation
+
+TOKEN_RE = re.compile(r'<!--.*?-->|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>|<[^>]*>|[^<]+|<', re.S | re.I)
+TAG_RE = re.compile(r'<([a-zA-Z][\w:.-]*)(.*?)(/?)>$', re.S)
+TAG_NAME_RE = re.compile(r'</?([a-zA-Z][\w:.-]*)')
+ATTR_RE = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+RAW_TEXT_RE = re.compile(r'(<[^>]*>)(.*)(</[^>]*>)$', re.S)
+SPACE_RE = re.compile(r'\s+')
+# Comments kept: conditional comments and build markers (MASTER_CSS_START, ..._END)
+MARKER_RE = re.compile(r'^<!--\s*\[if|^<!--\s*<!\[endif\]|\b[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)*_(?:START|END)\b')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+CSS_DECLARATIONS_RE = re.compile(r'\{[^{}]*\}')
+UNQUOTED_SAFE_RE = re.compile(r'^[A-Za-z0-9_\-.:/#%+,;@]+$')
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+# Whitespace next to these never renders: document structure, block boxes, and
+# SVG shapes (whitespace between SVG elements is ignored outside <text>)
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'base', 'style', 'script', 'noscript', 'template',
+    'div', 'p', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'section', 'nav', 'header', 'footer', 'main', 'article',
+    'aside', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th',
+    'caption', 'colgroup', 'col', 'form', 'fieldset', 'legend', 'figure', 'figcaption', 'blockquote', 'hr',
+    'address', 'details', 'summary', 'pre', 'iframe', 'video', 'audio', 'source',
+    'path', 'g', 'circle', 'rect', 'line', 'polyline', 'polygon', 'ellipse', 'defs', 'lineargradient',
+    'radialgradient', 'stop', 'use', 'symbol', 'clippath', 'mask'
+}
+
+def minify_tag(tag):
+    """Re-serializes a start tag with collapsed spacing and minimal quoting."""
+    match = TAG_RE.match(tag)
+    if not match:
+        if tag.startswith('</'):
+            return SPACE_RE.sub('', tag)
+        return tag
+    name, attrs, self_closing = match.groups()
+    # In foreign content (SVG) "/>" matters, and an unquoted value would swallow the slash
+    keep_slash = self_closing and name.lower() not in VOID_TAGS
+    parts = [name]
+    for attr in ATTR_RE.finditer(attrs):
+        attr_name = attr.group(1)
+        value = next((v for v in attr.group(2, 3, 4) if v is not None), None)
+        if value is None or value == '':
+            parts.append(attr_name)
+            continue
+        if attr_name.lower() == 'class':
+            value = ' '.join(value.split())
+        # A trailing slash would read as a self-closing "/>"
+        if UNQUOTED_SAFE_RE.match(value) and not value.endswith('/') and not keep_slash:
+            parts.append(f'{attr_name}={value}')
+        elif '"' in value:
+            parts.append(f"{attr_name}='{value}'")
+        else:
+            parts.append(f'{attr_name}="{value}"')
+    if keep_slash:
+        return '<' + ' '.join(parts) + '/>'
+    return '<' + ' '.join(parts) + '>'
+
+def minify_raw_text(name, token):
+    """<script>/<style>/<pre>/<textarea>: only the start tag and JSON-LD/CSS bodies change."""
+    match = RAW_TEXT_RE.match(token)
+    if not match:
+        return token
+    start, body, end = match.groups()
+    start = minify_tag(start)
+    if name == 'script' and 'ld+json' in start:
+        try:
+            body = json.dumps(json.loads(body), ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+        except ValueError:
+            pass
+    elif name == 'style':
+        body = CSS_COMMENT_RE.sub(lambda m: m.group(0) if MARKER_RE.search(m.group(0)) else '', body)
+        body = CSS_PUNCTUATION_RE.sub(r'\1', SPACE_RE.sub(' ', body)).strip()
+        # "a :hover" differs from "a:hover", so colons are only tightened inside declaration blocks
+        body = CSS_DECLARATIONS_RE.sub(lambda m: re.sub(r'\s*:\s*', ':', m.group(0)), body)
+    return start + body + SPACE_RE.sub('', end)
+
+def tag_name(token):
+    if not token or token[0] != '<' or token.startswith('<!'):
+        return None
+    match = TAG_NAME_RE.match(token)
+    return match.group(1).lower() if match else None
+
+def minify_html(html):
+    """Minified copy of a serialized page."""
+    tokens = []
+    for match in TOKEN_RE.finditer(html):
+        token = match.group(0)
+        if token.startswith('<!--'):
+            if MARKER_RE.search(token):
+                tokens.append(token)
+        elif match.group(1):
+            tokens.append(minify_raw_text(match.group(1).lower(), token))
+        elif token.startswith('<') and len(token) > 1:
+            tokens.append(minify_tag(token))
+        elif tokens and not tokens[-1].startswith('<'):
+            # Text on both sides of a dropped comment
+            tokens[-1] += token
+        else:
+            tokens.append(token)
+
+    out = []
+    for i, token in enumerate(tokens):
+        if token.startswith('<') and len(token) > 1:
+            out.append(token)
+            continue
+        text = SPACE_RE.sub(' ', token)
+        prev_name = tag_name(tokens[i - 1]) if i > 0 else 'html'
+        next_name = tag_name(tokens[i + 1]) if i + 1 < len(tokens) else 'html'
+        if text.startswith(' ') and (prev_name in BLOCK_TAGS or (out and out[-1].startswith('<!DOCTYPE'))):
+            text = text[1:]
+        if text.endswith(' ') and next_name in BLOCK_TAGS:
+            text = text[:-1]
+        if text:
+            out.append(text)
+    return ''.join(out)
@@ -0,0 +1,103 @@
+import os
+import re
+import hashlib
+
+# Output writer for build.run_build.
+# Unchanged outputs are detected from a digest index kept in the build manifest
+# (sha256, size, mtime), so existing files are never read back for comparison.
+# Changed files are written to a temp file next to the target and renamed over
+# it, so readers never see a half-written page. Writes are queued and flushed
+# in batches.
+
+# Control characters that break HTML consumers (like \x01).
+# Newlines (\n, \r) and tabs (\t) are kept.
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+BATCH_FILES = 32
+BATCH_BYTES = 4 * 1024 * 1024
+
+def clean_control_chars(content):
+    # search() first: almost every page is clean, and sub() always builds a copy
+    if content and CONTROL_CHARS_RE.search(content):
+        return CONTROL_CHARS_RE.sub('', content)
+    return content
+
+def write_atomic(path, data):
+    """Writes bytes through a temp file in the same directory and renames it into place."""
+    tmp_path = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class OutputWriter:
+    def __init__(self, root, digests=None, batch_files=BATCH_FILES, batch_bytes=BATCH_BYTES):
+        """
+        root: output tree; digests are keyed by path relative to it.
+        digests: {rel_path: {"sha": <sha256>, "size": <bytes>, "mtime_ns": <int>}} from the last build.
+        """
+        self.root = root
+        self.digests = dict(digests or {})
+        self.batch_files = batch_files
+        self.batch_bytes = batch_bytes
+        self.queue = []
+        self.queued_bytes = 0
+        self.files_written = 0
+        self.bytes_written = 0
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+
+    def rel_path(self, path):
+        return os.path.relpath(path, self.root).replace('\\', '/')
+
+    def is_current(self, rel_path, sha, size):
+        """True if the file on disk is still the one recorded with this content."""
+        digest = self.digests.get(rel_path)
+        if not digest or digest['sha'] != sha or digest['size'] != size:
+            return False
+        try:
+            st = os.stat(os.path.join(self.root, rel_path))
+        except OSError:
+            return False
+        return st.st_size == size and st.st_mtime_ns == digest['mtime_ns']
+
+    def write(self, path, content, current=None):
+        """
+        Queues content for path unless the file already holds it.
+        current: what the file is known to contain, if already in memory
+        (in-place builds read every page before rewriting it).
+        Returns (content as written, sha256 of it).
+        """
+        content = clean_control_chars(content)
+        data = content.encode('utf-8', errors='replace')
+        sha = hashlib.sha256(data).hexdigest()
+        rel_path = self.rel_path(path)
+        if content == current or self.is_current(rel_path, sha, len(data)):
+            self.files_skipped += 1
+            self.bytes_skipped += len(data)
+            return content, sha
+
+        self.queue.append((path, rel_path, data, sha))
+        self.queued_bytes += len(data)
+        if len(self.queue) >= self.batch_files or self.queued_bytes >= self.batch_bytes:
+            self.flush()
+        return content, sha
+
+    def flush(self):
+        """Writes every queued file. Must run before anything reads the outputs back."""
+        for path, rel_path, data, sha in self.queue:
+            write_atomic(path, data)
+            st = os.stat(path)
+            self.digests[rel_path] = {'sha': sha, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+            self.files_written += 1
+            self.bytes_written += len(data)
+        self.queue = []
+        self.queued_bytes = 0
+
+    def report(self):
+        print(f"Output: {self.files_written} files written ({self.bytes_written / 1024:.1f} KB), "
+              f"{self.files_skipped} unchanged ({self.bytes_skipped / 1024:.1f} KB skipped)")
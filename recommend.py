@@ -0,0 +1,119 @@
+import math
+import json
+import hashlib
+from collections import Counter
+
+from site_text import tokenize, extract_article_parts
+
+# Recommended reading: article-to-article similarity computed once per build.
+# Each article is a TF-IDF vector over its title, description and body text;
+# the closest articles by cosine similarity are recommended. Everything is
+# derived from the content, so the output only changes when the content does.
+
+# Terms kept per article for matching (raw counts stored in the manifest, then weighted).
+# The search index takes every token (article_tokens), recounted from the page
+# when needed: only their digest is stored, so the manifest does not grow with the text.
+FEATURE_TERMS = 200
+VECTOR_TERMS = 64
+# Candidates considered per term: only the articles where the term weighs most.
+# Keeps matching near-linear on large sites, where common terms occur everywhere.
+POSTING_LIMIT = 64
+# Title and description terms count this many times over body terms
+TITLE_WEIGHT = 3
+DESC_WEIGHT = 2
+
+def count_tokens(parts):
+    """Weighted count of every token of an article, from extract_article_parts()."""
+    counts = Counter(tokenize(parts['text']))
+    for token in tokenize(parts['title']):
+        counts[token] += TITLE_WEIGHT
+    for token in tokenize(parts['desc']):
+        counts[token] += DESC_WEIGHT
+    return counts
+
+def article_tokens(html):
+    """{token: weighted count} for every token of an article, in token order."""
+    return dict(sorted(count_tokens(extract_article_parts(html)).items()))
+
+def tokens_digest(tokens):
+    return hashlib.sha256(json.dumps(tokens, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+def article_features(html, url):
+    """
+    Everything the engine needs to know about one article, JSON serializable
+    so the build manifest can cache it for unchanged pages.
+    """
+    parts = extract_article_parts(html)
+    counts = count_tokens(parts)
+    top = sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:FEATURE_TERMS]
+    return {
+        'url': url,
+        'title': parts['title'],
+        'desc': parts['desc'],
+        'date': parts['date'],
+        'terms': dict(top),
+        # Changes with any token, so the search index knows when to rebuild
+        'tokens_digest': tokens_digest(dict(sorted(counts.items())))
+    }
+
+def tiebreak(source_url, url):
+    """Stable per-page order among equally similar articles (spreads links across the site)."""
+    return hashlib.md5(f'{source_url}>{url}'.encode('utf-8')).hexdigest()
+
+class RecommendationEngine:
+    def __init__(self, articles):
+        """articles: iterable of article_features() dicts."""
+        self.articles = sorted(articles, key=lambda a: a['url'])
+        self.index = {a['url']: i for i, a in enumerate(self.articles)}
+
+        # Document frequency -> smoothed IDF
+        df = Counter()
+        for article in self.articles:
+            df.update(article['terms'].keys())
+        n = len(self.articles)
+        idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+
+        # Pruned, L2-normalized vectors and an inverted index over them
+        self.vectors = []
+        self.postings = {}
+        for i, article in enumerate(self.articles):
+            weights = {term: (1 + math.log(count)) * idf[term] for term, count in article['terms'].items()}
+            top = sorted(weights.items(), key=lambda x: (-x[1], x[0]))[:VECTOR_TERMS]
+            norm = math.sqrt(sum(w * w for _, w in top)) or 1.0
+            vector = {term: w / norm for term, w in top}
+            self.vectors.append(vector)
+            for term, w in vector.items():
+                self.postings.setdefault(term, []).append((i, w))
+        for term, posting in self.postings.items():
+            if len(posting) > POSTING_LIMIT:
+                posting.sort(key=lambda x: (-x[1], x[0]))
+                del posting[POSTING_LIMIT:]
+
+        # Fallback order for articles with too few similar ones: newest first
+        self.by_recency = sorted(range(n), key=lambda i: (self.articles[i]['date'], self.articles[i]['url']), reverse=True)
+
+    def similar(self, url, k):
+        """The k most similar articles to url, as article_features() dicts."""
+        i = self.index.get(url)
+        if i is None:
+            return []
+        scores = {}
+        for term, w in self.vectors[i].items():
+            for j, wj in self.postings[term]:
+                if j != i:
+                    scores[j] = scores.get(j, 0.0) + w * wj
+        ranked = sorted(scores, key=lambda j: (-round(scores[j], 9), tiebreak(url, self.articles[j]['url'])))[:k]
+        if len(ranked) < k:
+            for j in self.by_recency:
+                if len(ranked) >= k:
+                    break
+                if j != i and j not in scores:
+                    ranked.append(j)
+        return [self.articles[j] for j in ranked]
+
+    def recommend_all(self, k):
+        """{url: [(url, title, desc), ...]} for every article."""
+        return {
+            article['url']: [(a['url'], a['title'], a['desc']) for a in self.similar(article['url'], k)]
+            for article in self.articles
+        }
@@ -0,0 +1,202 @@
+import json
+import hashlib
+
+from site_text import CJK_CHARS, STOPWORDS
+
+# Client-side article search: a prebuilt inverted index served as static JSON.
+# Terms are every token recommend.article_tokens counts per article
+# (CJK bigrams and English words, title/description weighted), the same
+# tokenization recommendations use. Recommendations only use the top terms;
+# the search index keeps them all.
+#
+# Output (under SEARCH_DIR):
+#   index.json       {"v": version, "shards": n, "docs": count, "chunk": DOC_CHUNK}
+#   shard-XXX.json   {term: [df, doc, weight, doc, weight, ...]} (doc ids delta-encoded)
+#   docs-XXX.json    [[url, title, desc, date, category], ...] for doc ids chunk * DOC_CHUNK...
+# A term lives in shard fnv1a(term) % n. The widget fetches index.json on first
+# use, then only the shards of the terms typed and the doc chunks of the top
+# hits, so a search costs a few kilobytes whatever the size of the site.
+
+SEARCH_DIR = 'search'
+# Target shard size: the shard count grows with the index to stay around it
+SHARD_BYTES = 32 * 1024
+# Documents kept per term (the highest weighted); df still counts all of them
+POSTING_LIMIT = 200
+# Articles per docs-XXX.json
+DOC_CHUNK = 64
+RESULT_LIMIT = 10
+
+def shard_of(term, shards):
+    """FNV-1a over the UTF-16 code units of the term (same as the widget)."""
+    h = 0x811c9dc5
+    for ch in term:
+        h = ((h ^ ord(ch)) * 0x01000193) & 0xffffffff
+    return h % shards
+
+def shard_name(shard):
+    return f'shard-{shard:03x}.json'
+
+def docs_name(chunk):
+    return f'docs-{chunk:03x}.json'
+
+def dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+def build_search_index(articles, features):
+    """
+    articles: listing metadata dicts (title/desc/date/category/url), as gathered
+    for generate_articles_index.
+    features: {url: {term: weight}} for the same articles, every token of each.
+    Returns {file name: content} for everything under SEARCH_DIR.
+    """
+    # Doc ids follow the listing order (newest first), which the widget uses for ties
+    articles = sorted(articles, key=lambda x: (x['date'], x['url']), reverse=True)
+    postings = {}
+    for doc_id, art in enumerate(articles):
+        for term, weight in features.get(art['url'], {}).items():
+            postings.setdefault(term, []).append((doc_id, weight))
+
+    encoded = {}
+    total_bytes = 0
+    for term, posting in postings.items():
+        df = len(posting)
+        if df > POSTING_LIMIT:
+            posting = sorted(posting, key=lambda x: (-x[1], x[0]))[:POSTING_LIMIT]
+            posting.sort()
+        values = [df]
+        last = 0
+        for doc_id, weight in posting:
+            values += [doc_id - last, weight]
+            last = doc_id
+        encoded[term] = values
+        total_bytes += len(term) * 3 + len(dumps(values)) + 4
+
+    # Power of two so the count only changes when the index doubles or halves
+    shards = 1
+    while total_bytes / shards > SHARD_BYTES:
+        shards *= 2
+
+    shard_terms = {}
+    for term in sorted(encoded):
+        shard_terms.setdefault(shard_of(term, shards), {})[term] = encoded[term]
+    files = {shard_name(shard): dumps(terms) for shard, terms in sorted(shard_terms.items())}
+    for start in range(0, len(articles), DOC_CHUNK):
+        files[docs_name(start // DOC_CHUNK)] = dumps([
+            [art['url'], art['title'], art['desc'], art['date'], art['category']]
+            for art in articles[start:start + DOC_CHUNK]])
+
+    version = hashlib.sha256(''.join(files[name] for name in sorted(files)).encode('utf-8')).hexdigest()[:12]
+    files['index.json'] = dumps({'v': version, 'shards': shards, 'docs': len(articles), 'chunk': DOC_CHUNK})
+    return files
+
+SEARCH_WIDGET = '''
+        <div id="article-search" class="max-w-xl mx-auto mb-8">
+            <form role="search" class="relative" action="/articles/" onsubmit="return false;">
+                <label for="article-search-input" class="sr-only">搜索文章</label>
+                <input id="article-search-input" type="search" autocomplete="off" placeholder="搜索教程，如：充值、PayPal、ChatGPT" class="w-full px-5 py-3 rounded-full border border-slate-200 bg-white text-slate-700 focus:outline-none focus:border-emerald-500">
+            </form>
+            <div id="article-search-results" class="mt-4 space-y-3" aria-live="polite" hidden></div>
+        </div>
+        '''
+
+SEARCH_SCRIPT = '''
+(function () {
+    var BASE = '/%(dir)s/';
+    var STOPWORDS = %(stopwords)s;
+    var TOKEN_RE = /[%(cjk)s]+|[a-z0-9]+/g;
+    var CJK_RE = /^[%(cjk)s]/;
+    var input = document.getElementById('article-search-input');
+    var box = document.getElementById('article-search-results');
+    if (!input || !box || !window.fetch) return;
+    var index = null, files = {}, timer = null, seq = 0;
+
+    function tokenize(text) {
+        var tokens = [], runs = text.toLowerCase().match(TOKEN_RE) || [];
+        runs.forEach(function (run) {
+            if (CJK_RE.test(run)) {
+                if (run.length === 1) tokens.push(run);
+                for (var i = 0; i + 1 < run.length; i++) tokens.push(run.substr(i, 2));
+            } else if (run.length > 1 && STOPWORDS.indexOf(run) === -1) {
+                tokens.push(run);
+            }
+        });
+        return tokens.filter(function (t, i) { return tokens.indexOf(t) === i; });
+    }
+    function shardOf(term) {
+        var h = 0x811c9dc5;
+        for (var i = 0; i < term.length; i++) h = Math.imul(h ^ term.charCodeAt(i), 0x01000193) >>> 0;
+        return h %% index.shards;
+    }
+    function getJSON(url) {
+        return fetch(url).then(function (r) { return r.ok ? r.json() : {}; });
+    }
+    function load(prefix, n) {
+        var name = prefix + '-' + ('00' + n.toString(16)).slice(-3) + '.json';
+        if (!files[name]) {
+            files[name] = getJSON(BASE + name + '?v=' + index.v).catch(function () { delete files[name]; return {}; });
+        }
+        return files[name];
+    }
+    function loadDoc(id) {
+        return load('docs', Math.floor(id / index.chunk)).then(function (docs) { return docs[id %% index.chunk]; });
+    }
+    function escapeHtml(s) {
+        return String(s).replace(/[&<>"']/g, function (c) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+        });
+    }
+    function render(hits, query) {
+        if (!hits.length) {
+            box.innerHTML = '<p class="text-center text-sm text-slate-500">没有找到与「' + escapeHtml(query) + '」相关的文章</p>';
+            return;
+        }
+        box.innerHTML = hits.map(function (doc) {
+            return '<a href="' + escapeHtml(doc[0]) + '" class="block bg-white p-4 rounded-xl border border-slate-200 hover:border-emerald-500 transition">' +
+                '<div class="font-bold text-slate-900">' + escapeHtml(doc[1]) + '</div>' +
+                '<div class="text-sm text-slate-500 line-clamp-2">' + escapeHtml(doc[2]) + '</div></a>';
+        }).join('');
+    }
+    function search(query) {
+        var terms = tokenize(query), run = ++seq;
+        if (!terms.length) { box.hidden = true; box.innerHTML = ''; return; }
+        (index ? Promise.resolve(index) : getJSON(BASE + 'index.json').then(function (data) { index = data; return data; }))
+        .then(function () {
+            return Promise.all(terms.map(function (t) { return load('shard', shardOf(t)); }));
+        }).then(function (loaded) {
+            var n = index.docs, scores = {}, matched = {};
+            terms.forEach(function (term, i) {
+                var p = loaded[i][term];
+                if (!p) return;
+                var idf = Math.log(1 + n / p[0]), doc = 0;
+                for (var j = 1; j < p.length; j += 2) {
+                    doc += p[j];
+                    scores[doc] = (scores[doc] || 0) + (1 + Math.log(p[j + 1])) * idf;
+                    matched[doc] = (matched[doc] || 0) + 1;
+                }
+            });
+            var ids = Object.keys(scores).map(Number).sort(function (a, b) {
+                return (matched[b] - matched[a]) || (scores[b] - scores[a]) || (a - b);
+            });
+            return Promise.all(ids.slice(0, %(limit)d).map(loadDoc));
+        }).then(function (hits) {
+            if (run !== seq) return;
+            render(hits.filter(Boolean), query);
+            box.hidden = false;
+        }).catch(function () { box.hidden = true; });
+    }
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () { search(input.value); }, 150);
+    });
+})();
+'''
+
+def render_search_widget():
+    """(form HTML, script source) of the search box on the articles index."""
+    script = SEARCH_SCRIPT % {
+        'dir': SEARCH_DIR,
+        'stopwords': json.dumps(sorted(STOPWORDS)),
+        'cjk': CJK_CHARS,
+        'limit': RESULT_LIMIT
+    }
+    return SEARCH_WIDGET, script
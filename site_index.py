@@ -0,0 +1,72 @@
+import os
+import posixpath
+
+# In-memory snapshot of a site tree, for resolving links without touching the disk.
+# The tree is walked once; afterwards "does /images/x.png exist?" or "which file
+# serves /articles/foo?" is a dict lookup, not a stat call (which is what costs
+# on network filesystems). Every file is indexed (HTML, images, videos, XML...),
+# so a link to any of them resolves.
+
+# Never part of the site: tooling, plus the build's own output (dist is a symlink
+# into .dist-builds, which holds the published trees) and the audit caches.
+# Shared with build.py (BUILD_EXCLUDE_DIRS) and audit.py (IGNORE_PATHS).
+PRUNE_DIRS = ('.git', 'node_modules', '__pycache__', 'dist', '.dist-builds', '.audit-cache')
+
+def clean_url(rel_path):
+    """
+    Clean URL (relative to domain root) of a file, from its path relative to
+    the site root. Example: articles/foo.html -> /articles/foo
+    """
+    rel_path = rel_path.replace('\\', '/')
+
+    if rel_path == 'index.html':
+        return '/'
+
+    if rel_path.endswith('index.html'):
+        return '/' + posixpath.dirname(rel_path) + '/'
+
+    base, ext = posixpath.splitext(rel_path)
+    if ext == '.html':
+        return '/' + base
+    return '/' + rel_path
+
+class SiteIndex:
+    def __init__(self, root, ignore_dirs=PRUNE_DIRS):
+        """
+        root: site root directory.
+        ignore_dirs: directory names not descended into.
+        """
+        self.root = os.path.abspath(root)
+        self.files = {}  # Relative path (posix separators) -> full path, in walk order
+        for dirpath, dirs, names in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+            for name in names:
+                full_path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(full_path, self.root).replace('\\', '/')
+                self.files[rel_path] = full_path
+
+    def __len__(self):
+        return len(self.files)
+
+    def html_files(self):
+        """(relative path, full path) of every HTML file, in walk order."""
+        return [(rel, full) for rel, full in self.files.items() if rel.endswith('.html')]
+
+    def get(self, rel_path):
+        """Full path of a file given relative to the root, or None."""
+        rel_path = posixpath.normpath(rel_path.replace('\\', '/'))
+        return self.files.get(rel_path)
+
+    def resolve(self, url_path):
+        """
+        Full path of the file a root-relative URL path serves, or None. Tried in order:
+        1. url_path + .html
+        2. url_path + /index.html
+        3. url_path itself (sitemap.xml, images...)
+        """
+        relative = url_path.lstrip('/')
+        for candidate in (relative + '.html', posixpath.join(relative, 'index.html'), relative):
+            full_path = self.get(candidate)
+            if full_path:
+                return full_path
+        return None
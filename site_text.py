@@ -0,0 +1,86 @@
+import re
+import html as html_lib
+
+# Plain-text helpers shared by the build-time text features
+# (recommended reading, search index). Regex based: no DOM parse needed.
+
+# CJK Unified Ideographs (+ Extension A and compatibility ideographs)
+CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+TOKEN_RE = re.compile(f'[{CJK_CHARS}]+|[a-z0-9]+')
+CJK_RE = re.compile(f'[{CJK_CHARS}]')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'the', 'to', 'with', 'www', 'https', 'http', 'com'
+}
+
+H1_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.S | re.I)
+DESC_RE = re.compile(r'<meta\s+[^>]*name=["\']description["\'][^>]*>', re.I)
+CONTENT_ATTR_RE = re.compile(r'content=(["\'])(.*?)\1', re.S | re.I)
+DATE_MODIFIED_RE = re.compile(r'["\']dateModified["\']\s*:\s*["\'](\d{4}-\d{2}-\d{2})["\']')
+DATE_PUBLISHED_RE = re.compile(r'["\']datePublished["\']\s*:\s*["\'](\d{4}-\d{2}-\d{2})["\']')
+ARTICLE_RE = re.compile(r'<article\b[^>]*>(.*?)(?:</article>|$)', re.S | re.I)
+NON_TEXT_RE = re.compile(r'<(script|style|template)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+def tokenize(text):
+    """
+    Lowercased search terms: English words and numbers, and overlapping
+    character bigrams for runs of CJK text (no word segmentation needed).
+    """
+    tokens = []
+    for run in TOKEN_RE.findall(text.lower()):
+        if CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif len(run) > 1 and run not in STOPWORDS:
+            tokens.append(run)
+    return tokens
+
+def html_to_text(fragment):
+    """Visible text of an HTML fragment, whitespace collapsed."""
+    fragment = NON_TEXT_RE.sub(' ', fragment)
+    fragment = TAG_RE.sub(' ', fragment)
+    return SPACE_RE.sub(' ', html_lib.unescape(fragment)).strip()
+
+def clean_title(text):
+    """
+    Article title as listed: whitespace collapsed, leading numbering ("1. ") removed.
+    text: the h1's text, its tags dropped without adding spaces (as get_text does).
+    """
+    return re.sub(r'^\d+\.?\s*', '', SPACE_RE.sub(' ', text).strip())
+
+def extract_article_parts(html):
+    """
+    Title (h1), description, date and body text of an article page.
+    The body is the <article> element up to the automated recommended-reading
+    block, so text injected by a previous build does not feed back into it.
+    """
+    h1 = H1_RE.search(html)
+    # Same text as the listings take from the parsed h1 (see build.extract_article_meta)
+    title = clean_title(html_lib.unescape(TAG_RE.sub('', NON_TEXT_RE.sub('', h1.group(1))))) if h1 else ''
+
+    desc = ''
+    desc_tag = DESC_RE.search(html)
+    if desc_tag:
+        content = CONTENT_ATTR_RE.search(desc_tag.group(0))
+        if content:
+            desc = html_lib.unescape(content.group(2)).strip()
+
+    date = DATE_MODIFIED_RE.search(html) or DATE_PUBLISHED_RE.search(html)
+
+    article = ARTICLE_RE.search(html)
+    body = article.group(1) if article else html
+    cut = body.find('id="recommended-reading"')
+    if cut != -1:
+        body = body[:body.rfind('<', 0, cut)]
+
+    return {
+        'title': title,
+        'desc': desc,
+        'date': date.group(1) if date else '',
+        'text': html_to_text(body)
+    }
@@ -2,7 +2,8 @@ import os
 import re
 
 # Configuration
-PROJECT_ROOT = '/Users/xiaxingyu/Desktop/网站项目/PokePay'
+# POKEPAY_ROOT overrides the site location (used by benchmark.py for synthetic corpora)
+PROJECT_ROOT = os.environ.get('POKEPAY_ROOT', '/Users/xiaxingyu/Desktop/网站项目/PokePay')
 INDEX_PATH = os.path.join(PROJECT_ROOT, 'index.html')
 ARTICLES_DIR = os.path.join(PROJECT_ROOT, 'articles')
 
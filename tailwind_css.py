@@ -0,0 +1,167 @@
+import os
+import re
+import shlex
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+from sync_layout import extract_tailwind_config
+
+# Build-time Tailwind: replaces the cdn.tailwindcss.com runtime (which compiles
+# CSS in the browser on every page view) with one static, content-hashed
+# stylesheet holding only the utilities the built pages use.
+# The standalone Tailwind CLI (v3) does the compiling; without it pages keep
+# the CDN script. The tailwind.config of the master layout is kept in each page
+# as an inert <script type="text/tailwind-config">, so in-place builds can
+# still read it back on the next run.
+# First-party plugins a page asks the CDN for (?plugins=typography) are compiled
+# into the stylesheet too; the link that replaces the script remembers them in
+# data-tailwind-plugins, for the same reason.
+
+STYLESHEET_DIR = 'assets/css'
+# Quotes are optional: minified pages (see minify_html.py) may drop them
+STYLESHEET_RE = re.compile(r'<link\b[^>]*\bhref=["\']?/assets/css/tailwind\.[0-9a-f]+\.css\b["\']?[^>]*>')
+CDN_SCRIPT_RE = re.compile(r'<script\b[^>]*\bsrc=["\']?https://cdn\.tailwindcss\.com[^"\'\s>]*["\']?[^>]*>\s*</script>', re.I)
+LIVE_CONFIG_RE = re.compile(r'<script>(\s*tailwind\.config\s*=)')
+INERT_CONFIG_RE = re.compile(r'<script type="text/tailwind-config">\s*(tailwind\.config\s*=.*?)</script>', re.S)
+CDN_PLUGINS_RE = re.compile(r'cdn\.tailwindcss\.com\?[^"\'\s>]*\bplugins=([\w,.-]+)', re.I)
+PLUGINS_ATTR_RE = re.compile(r'\bdata-tailwind-plugins=["\']?([\w,.-]+)')
+# Plugins the CDN runtime offers, by the name ?plugins= uses
+PLUGINS = {
+    'typography': '@tailwindcss/typography',
+    'forms': '@tailwindcss/forms',
+    'aspect-ratio': '@tailwindcss/aspect-ratio',
+    'line-clamp': '@tailwindcss/line-clamp',
+    'container-queries': '@tailwindcss/container-queries',
+}
+# (class prefix, selector): a stylesheet compiled with the plugin must contain
+# the selector once the pages use classes with the prefix
+PLUGIN_RULES = {
+    'typography': ('prose', '.prose'),
+}
+# CLI override, e.g. TAILWINDCSS="npx tailwindcss@3"
+CLI_ENV = 'TAILWINDCSS'
+CLI_TIMEOUT = 300
+
+TAILWIND_INPUT = '@tailwind base;\n@tailwind components;\n@tailwind utilities;\n'
+
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*(?:(["\'])(.*?)\1|([^\s"\'=<>`]+))', re.S | re.I)
+SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.S | re.I)
+STRING_RE = re.compile(r'"([^"\\\n]*)"|\'([^\'\\\n]*)\'|`([^`\\]*)`')
+CLASS_TOKEN_RE = re.compile(r'^!?-?[A-Za-z0-9][\w:/.\[\]()#%,-]*$')
+
+def find_tailwind_config(html):
+    """The tailwind.config script of a page, live (source layout) or inert (built)."""
+    config = extract_tailwind_config(html)
+    if config:
+        return re.sub(r'^<script>|</script>$', '', config).strip()
+    match = INERT_CONFIG_RE.search(html)
+    return match.group(1).strip() if match else None
+
+def find_tailwind_plugins(html):
+    """Plugins a page uses: from its CDN script (?plugins=a,b) or the link that replaced it."""
+    plugins = set()
+    for match in list(CDN_PLUGINS_RE.finditer(html)) + list(PLUGINS_ATTR_RE.finditer(html)):
+        plugins.update(name for name in match.group(1).split(',') if name in PLUGINS)
+    return plugins
+
+def missing_plugin_rules(css, plugins, classes):
+    """Plugins whose rules are missing from css although the class set uses them."""
+    missing = []
+    for name in sorted(plugins):
+        if name not in PLUGIN_RULES:
+            continue
+        prefix, selector = PLUGIN_RULES[name]
+        if any(c.split(':')[-1].lstrip('!-').startswith(prefix) for c in classes) and selector not in css:
+            missing.append(name)
+    return missing
+
+def extract_classes(html):
+    """
+    Candidate utility classes of a page: class attributes (including those in
+    inline script templates), plus string literals in inline scripts
+    (classList.add('hidden'), className = '...').
+    Over-collecting is harmless, Tailwind ignores what is not a utility.
+    """
+    classes = set()
+    for match in CLASS_ATTR_RE.finditer(html):
+        classes.update((match.group(2) if match.group(1) else match.group(3)).split())
+    for attrs, body in SCRIPT_RE.findall(html):
+        if 'src=' in attrs or 'json' in attrs or 'tailwind-config' in attrs:
+            continue
+        for groups in STRING_RE.findall(body):
+            for literal in groups:
+                classes.update(literal.split())
+    return {c for c in classes if len(c) < 80 and CLASS_TOKEN_RE.match(c)}
+
+def link_stylesheet(html, href):
+    """
+    Points a page at the compiled stylesheet: the CDN script becomes a <link>
+    (and the config script inert), or an older stylesheet link gets the new href.
+    """
+    def link(plugins):
+        # Serialized the way BeautifulSoup writes it, so re-parsed pages come out the same
+        attr = f' data-tailwind-plugins="{",".join(sorted(plugins))}"' if plugins else ''
+        return f'<link{attr} href="{href}" rel="stylesheet"/>'
+    if CDN_SCRIPT_RE.search(html):
+        plugins = {name for match in CDN_SCRIPT_RE.finditer(html) for name in find_tailwind_plugins(match.group(0))}
+        html = CDN_SCRIPT_RE.sub(lambda m: link(plugins), html, count=1)
+        html = re.sub(CDN_SCRIPT_RE.pattern + r'\n?', '', html, flags=re.I)
+        return LIVE_CONFIG_RE.sub(r'<script type="text/tailwind-config">\1', html)
+    return STYLESHEET_RE.sub(lambda m: link(find_tailwind_plugins(m.group(0))), html)
+
+def get_stylesheet_key(config, classes, plugins=()):
+    """Cache key of a compiled stylesheet: same config, plugins and class set, same CSS."""
+    payload = '\n'.join([TAILWIND_INPUT, config or '', ','.join(sorted(plugins))] + sorted(classes))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_stylesheet_href(css):
+    return f"/{STYLESHEET_DIR}/tailwind.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+
+def find_tailwind_cli(project_root):
+    """Command line of the Tailwind CLI: $TAILWINDCSS, then PATH, then node_modules. None if absent."""
+    if os.environ.get(CLI_ENV):
+        return shlex.split(os.environ[CLI_ENV])
+    cli = shutil.which('tailwindcss')
+    if cli:
+        return [cli]
+    local = os.path.join(project_root, 'node_modules', '.bin', 'tailwindcss')
+    if os.path.exists(local):
+        return [local]
+    return None
+
+def compile_stylesheet(cli, config, classes, plugins=(), project_root=None):
+    """
+    Runs the Tailwind CLI over the class set with the site config, plus the
+    given plugins (names from PLUGINS). The standalone CLI bundles them; an npm
+    install resolves them from project_root's node_modules.
+    Returns the minified CSS. Raises RuntimeError if the CLI fails.
+    """
+    with tempfile.TemporaryDirectory(prefix='tailwind-') as tmp:
+        content_path = os.path.join(tmp, 'classes.html')
+        config_path = os.path.join(tmp, 'tailwind.config.js')
+        input_path = os.path.join(tmp, 'input.css')
+        output_path = os.path.join(tmp, 'output.css')
+        with open(content_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(sorted(classes)))
+        with open(config_path, 'w', encoding='utf-8') as f:
+            # The page script assigns the global the CDN runtime reads
+            f.write('const tailwind = {};\n')
+            f.write((config or 'tailwind.config = {}') + ';\n')
+            f.write('const plugin = (name) => { try { return require(name); } catch (e) { '
+                    f'return require(require.resolve(name, {{ paths: [{(project_root or tmp)!r}] }})); }} }};\n')
+            requires = ''.join(f'plugin({PLUGINS[name]!r}), ' for name in sorted(plugins))
+            f.write(f'module.exports = Object.assign({{}}, tailwind.config, {{ content: [{content_path!r}], '
+                    f'plugins: [...(tailwind.config.plugins || []), {requires}] }});\n')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.write(TAILWIND_INPUT)
+        try:
+            result = subprocess.run(cli + ['-c', config_path, '-i', input_path, '-o', output_path, '--minify'],
+                                    cwd=tmp, capture_output=True, text=True, timeout=CLI_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise RuntimeError(str(e))
+        if result.returncode != 0 or not os.path.exists(output_path):
+            raise RuntimeError(result.stderr.strip() or f'exit code {result.returncode}')
+        with open(output_path, 'r', encoding='utf-8') as f:
+            return f.read()
@@ -0,0 +1,141 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from link_checker import LinkChecker, is_broken
+
+# Longer than the checker's timeout in these tests
+SLOW_DELAY = 2
+ETAG = '"v1"'
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /ok, /ok2: 200 with an ETag (304 when it is sent back)
+    /moved: 301 to the server's "moved" target (None: 404)
+    /missing: 404
+    /slow: answers after SLOW_DELAY
+    """
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.server.requests.append((self.command, self.path))
+        if self.path in ('/ok', '/ok2'):
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+            else:
+                self.send_response(200)
+                self.send_header('ETag', ETAG)
+        elif self.path == '/moved' and self.server.moved:
+            self.send_response(301)
+            self.send_header('Location', self.server.moved)
+        elif self.path == '/slow':
+            time.sleep(SLOW_DELAY)
+            self.send_response(200)
+        else:
+            self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+class LinkCheckerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.requests = []
+        cls.server.moved = '/ok2'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='link-checker-')
+        self.cache_path = os.path.join(self.tmp, 'links.json')
+        self.server.requests = []
+        self.server.moved = '/ok2'
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def checker(self, **kwargs):
+        # No politeness delay; ttl 0 makes every cached result due for revalidation
+        options = dict(cache_path=self.cache_path, host_delay=0, ttl_ok=0, ttl_broken=0, timeout=0.5)
+        options.update(kwargs)
+        return LinkChecker(**options)
+
+    def check(self, path, **kwargs):
+        checker = self.checker(**kwargs)
+        url = self.base + path
+        return checker, checker.check([url])[url]
+
+    def test_ok(self):
+        _, result = self.check('/ok')
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['method'], 'HEAD')
+        self.assertEqual(result['etag'], ETAG)
+        self.assertFalse(is_broken(result))
+
+    def test_redirect(self):
+        _, result = self.check('/moved')
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['final_url'], self.base + '/ok2')
+        self.assertEqual(result['chain'], [[self.base + '/moved', 301], [self.base + '/ok2', 200]])
+
+    def test_not_found(self):
+        _, result = self.check('/missing')
+        self.assertEqual(result['status'], 404)
+        self.assertTrue(is_broken(result))
+        # HEAD refused with 404 is asked again with GET
+        self.assertEqual(result['method'], 'GET')
+
+    def test_timeout(self):
+        _, result = self.check('/slow')
+        self.assertEqual(result['status'], 'Error')
+        self.assertTrue(result['error'])
+        self.assertTrue(is_broken(result))
+
+    def test_fresh_result_from_cache(self):
+        self.check('/ok')
+        self.server.requests = []
+        checker, result = self.check('/ok', ttl_ok=3600)
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(checker.stats['cached'], 1)
+        self.assertEqual(self.server.requests, [])
+
+    def test_revalidate_redirect_from_source(self):
+        self.check('/moved')
+        self.server.requests = []
+        checker, result = self.check('/moved')
+        # Source asked first, then the final URL conditionally
+        self.assertEqual(self.server.requests, [('HEAD', '/moved'), ('HEAD', '/ok2')])
+        self.assertEqual(checker.stats['revalidated'], 1)
+        self.assertEqual(result['status'], 200)
+
+    def test_revalidate_redirect_source_now_broken(self):
+        self.check('/moved')
+        self.server.moved = None
+        checker, result = self.check('/moved')
+        self.assertEqual(checker.stats['revalidated'], 0)
+        self.assertEqual(result['status'], 404)
+        self.assertTrue(is_broken(result))
+
+    def test_revalidate_redirect_source_retargeted(self):
+        self.check('/moved')
+        self.server.moved = '/missing'
+        checker, result = self.check('/moved')
+        self.assertEqual(checker.stats['revalidated'], 0)
+        self.assertEqual(result['status'], 404)
+        self.assertEqual(result['final_url'], self.base + '/missing')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import re
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE_IGNORE = ['.git', 'node_modules', '__pycache__', 'dist', '.dist-builds', '.audit-cache', '.benchmarks',
+               'tests', 'videos', '.build_manifest.json']
+
+# Stand-in for the Tailwind CLI: emits .prose rules only when the config loads the typography plugin
+STUB_CLI = '''
+import sys
+args = sys.argv[1:]
+config = open(args[args.index('-c') + 1], encoding='utf-8').read()
+css = '.flex{display:flex}'
+if '@tailwindcss/typography' in config:
+    css += '.prose{color:#333}'
+open(args[args.index('-o') + 1], 'w', encoding='utf-8').write(css)
+'''
+
+CDN_SCRIPT = '<script src="https://cdn.tailwindcss.com"></script>'
+STYLESHEET_LINK_RE = re.compile(r'<link\b[^>]*href="(/[^"]*tailwind\.[0-9a-f]+\.css)"')
+
+class TypographyStylesheetTest(unittest.TestCase):
+    """A page loading the typography plugin keeps its rules across incremental --out builds."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix='tailwind-build-')
+        self.site = os.path.join(self.tmp, 'site')
+        self.out = os.path.join(self.tmp, 'dist')
+        shutil.copytree(SOURCE_ROOT, self.site, ignore=shutil.ignore_patterns(*SITE_IGNORE))
+        stub = os.path.join(self.tmp, 'tailwind_stub.py')
+        with open(stub, 'w', encoding='utf-8') as f:
+            f.write(STUB_CLI)
+        self.env = dict(os.environ, POKEPAY_ROOT=self.site, TAILWINDCSS=f'{sys.executable} {stub}')
+
+        self.prose_page = 'articles/pokepay-fees-and-limits.html'
+        self.edited_page = 'articles/okx-usdt-topup-trc20.html'
+        # The article already styles its body with .prose
+        self.edit(self.prose_page, lambda html: html.replace(
+            CDN_SCRIPT, '<script src="https://cdn.tailwindcss.com?plugins=typography"></script>', 1))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def edit(self, rel_path, change):
+        path = os.path.join(self.site, rel_path)
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(change(html))
+
+    def build(self):
+        result = subprocess.run([sys.executable, os.path.join(self.site, 'build.py'), '--out', self.out],
+                                cwd=self.site, env=self.env, capture_output=True, text=True, timeout=300)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+    def stylesheet_of(self, rel_path):
+        with open(os.path.join(self.out, rel_path), 'r', encoding='utf-8') as f:
+            match = STYLESHEET_LINK_RE.search(f.read())
+        self.assertIsNotNone(match, f'{rel_path} links no compiled stylesheet')
+        with open(os.path.join(self.out, match.group(1).lstrip('/')), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_typography_rules_survive_incremental_build(self):
+        self.build()
+        self.assertIn('.prose', self.stylesheet_of(self.prose_page))
+
+        # Second build: only an unrelated article changed
+        self.edit(self.edited_page, lambda html: html.replace('</p>', ' Updated.</p>', 1))
+        self.build()
+        for rel_path in (self.prose_page, self.edited_page, 'index.html'):
+            self.assertIn('.prose', self.stylesheet_of(rel_path))
+
+if __name__ == '__main__':
+    unittest.main()